@@ -1,4 +1,5 @@
-from . import advancedSearchDataset, customReportService, dataset_utils, dbPtmDataset, dbSnpDataset, drugBankDataset, g2sDataset, jpredDataset, myVariantDataset, \
-    pdbjMineDataset, pdbPtmDataset, pdbToUniProt, polymerSequenceExtractor, secondaryStructureElementExtractor, \
-    secondaryStructureExtractor, secondaryStructureSegmentExtractor, swissModelDataset, uniProt
+from . import advancedSearchDataset, customReportService, dataset_utils, dbPtmDataset, dbSnpDataset, drugBankDataset, g2sDataset, groupNameIndex, jpredDataset, metadataIndex, myVariantDataset, \
+    pdbjMineDataset, pdbPtmDataset, pdbToUniProt, polymerSequenceExtractor, residueContactMapExtractor, \
+    secondaryStructureElementExtractor, secondaryStructureExtractor, secondaryStructureSegmentExtractor, sequenceClusters, sequenceMotifIndex, sequenceSimilaritySearch, \
+    solventAccessibilityExtractor, swissModelDataset, uniProt
 from .groupInteractionExtractor import groupInteractionExtractor
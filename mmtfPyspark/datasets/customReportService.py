@@ -24,9 +24,10 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
+import io
 import tempfile
 import urllib
-from urllib import request
+from mmtfPyspark.webservices import httpCache
 
 from pyspark.sql import SparkSession
 
@@ -127,8 +128,7 @@ def _post_query(service, query):
     """
 
     encodedQuery = urllib.parse.quote(query).encode('utf-8')
-    url = request.Request(service)
-    stream = urllib.request.urlopen(url, data=encodedQuery)
+    stream = io.BytesIO(httpCache.get(service, data=encodedQuery))
 
     return stream
 
@@ -0,0 +1,159 @@
+#!/user/bin/env python
+'''groupNameIndex.py
+
+Creates an inverted index of the groups (residues, ligands, ions) in a set of
+PDB structures, e.g., of an MMTF-Hadoop sequence file. The index maps group
+names (e.g. "HEM", "ATP", "ZN") to the entries and chains that contain them,
+with the number of groups per chain. The index is calculated from the group
+types of the structures (group_list and group_type_list) and is written once
+in the Parquet format.
+
+The index answers the first question of ligand-centric queries, which entries
+contain a group, without decoding any structures. It can be used by the
+ContainsGroup filter.
+
+Examples
+--------
+build the index once:
+
+>>> pdb = mmtfReader.read_full_sequence_file()
+>>> groupNameIndex.write(pdb, "group_index.parquet")
+
+find entries with heme or ATP groups:
+
+>>> index = groupNameIndex.read("group_index.parquet")
+>>> pdbIds = groupNameIndex.get_ids(index, ["HEM", "ATP"])
+>>> pdb = mmtfReader.read_full_sequence_file(pdbId=pdbIds)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+from pyspark.sql import Row, SparkSession
+from pyspark.sql.types import StructType, StructField, StringType, IntegerType
+import numpy as np
+
+
+def get_dataset(structures):
+    '''Returns an inverted index of the group names in a set of PDB structures.
+    All models of a structure are indexed, the count of a chain is the
+    maximum count over the models.
+
+    The dataset contains the following columns:
+    - groupName - group name as defined in the PDB Chemical Component Dictionary
+    - structureId - PDB ID
+    - chainName - chain name (author chain id)
+    - count - number of groups with this name in the chain
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+
+    Returns
+    -------
+    dataset
+       dataset with one row per group name and chain
+    '''
+    rows = structures.flatMap(_get_index_rows)
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_schema())
+
+
+def write(structures, path):
+    '''Scans a set of PDB structures and writes the group name index in the
+    Parquet format.
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+    path : str
+       path of the Parquet file
+    '''
+    get_dataset(structures).write.mode('overwrite').parquet(path)
+
+
+def read(path):
+    '''Reads a group name index
+
+    Parameters
+    ----------
+    path : str
+       path of the Parquet file
+
+    Returns
+    -------
+    dataset
+       group name index
+    '''
+    spark = SparkSession.builder.getOrCreate()
+    return spark.read.parquet(path)
+
+
+def get_ids(index, group_names):
+    '''Returns the sorted ids of the entries that contain at least one of
+    the specified groups
+
+    Parameters
+    ----------
+    index : dataset
+       group name index
+    group_names : list
+       group names, e.g., ["HEM", "ATP"]
+
+    Returns
+    -------
+    list
+       sorted structure ids
+    '''
+    rows = index.filter(index.groupName.isin(list(group_names))) \
+                .select('structureId') \
+                .distinct() \
+                .collect()
+
+    return sorted(row.structureId for row in rows)
+
+
+def _get_index_rows(t):
+    '''Returns the index rows of a structure'''
+    structure_id, structure = t
+
+    # chain index of each group and model index of each chain of all models
+    num_chains = structure.num_chains
+    groups_per_chain = np.asarray(structure.groups_per_chain[:num_chains], dtype=np.int64)
+    chain_of_group = np.repeat(np.arange(num_chains), groups_per_chain)
+    model_of_chain = np.repeat(np.arange(len(structure.chains_per_model)),
+                               structure.chains_per_model)[:num_chains]
+    group_types = np.asarray(structure.group_type_list[:len(chain_of_group)], dtype=np.int64)
+
+    # number of groups of each group type per chain
+    num_types = len(structure.group_list)
+    pairs, counts = np.unique(chain_of_group * num_types + group_types, return_counts=True)
+
+    # group types with the same name are counted together, chains with
+    # the same name in different models are counted once (maximum count)
+    chain_names = structure.chain_name_list
+    model_counts = {}
+    for chain, group_type, count in zip((pairs // num_types).tolist(), (pairs % num_types).tolist(),
+                                        counts.tolist()):
+        key = (structure.group_list[group_type]['groupName'], str(chain_names[chain]), model_of_chain[chain])
+        model_counts[key] = model_counts.get(key, 0) + count
+
+    index = {}
+    for (group_name, chain_name, _), count in model_counts.items():
+        index[(group_name, chain_name)] = max(index.get((group_name, chain_name), 0), count)
+
+    return [Row(group_name, structure_id, chain_name, count)
+            for (group_name, chain_name), count in sorted(index.items())]
+
+
+def _get_schema():
+    nullable = False
+
+    return StructType([StructField("groupName", StringType(), nullable),
+                       StructField("structureId", StringType(), nullable),
+                       StructField("chainName", StringType(), nullable),
+                       StructField("count", IntegerType(), nullable)])
@@ -0,0 +1,273 @@
+#!/user/bin/env python
+'''metadataIndex.py
+
+Creates a compact metadata index of a set of PDB structures, e.g., of an
+MMTF-Hadoop sequence file, with one row per entry. The index is written
+once in the Parquet format. The metadata filters (e.g. Resolution,
+ReleaseDate, ExperimentalMethods) can then be evaluated against the index to
+select entries without decoding any structures, and the selected entries are
+read with an indexed read of the MMTF-Hadoop sequence file. The chain-level
+filters (e.g. ContainsLProteinChain, PolymerComposition, SecondaryStructure)
+and ContainsGroup are evaluated on the per-chain columns and group names.
+
+The metadata columns use the field names of the MMTF format. The per-chain
+columns describe the chains of the first model.
+
+Examples
+--------
+build the index once:
+
+>>> pdb = mmtfReader.read_full_sequence_file()
+>>> metadataIndex.write(pdb, "pdb_index.parquet")
+
+select and read entries:
+
+>>> index = metadataIndex.read("pdb_index.parquet")
+>>> pdbIds = metadataIndex.get_ids(index, [Resolution(0.0, 1.5), ReleaseDate("2018-01-01", "2018-12-31")])
+>>> pdbIds = metadataIndex.get_ids(index, [ContainsDnaChain(), SecondaryStructure(0.5, 1.0)])
+>>> pdb = metadataIndex.read_sequence_file(mmtfReader.get_mmtf_full_path(), index,
+...                                        [Resolution(0.0, 1.5), ReleaseDate("2018-01-01", "2018-12-31")])
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import hashlib
+import numpy as np
+from pyspark.sql import Row, SparkSession
+from pyspark.sql.types import StructType, StructField, StringType, IntegerType, FloatType, ArrayType
+from mmtfPyspark.filters import FilterPipeline
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.utils import ChainSummary, MmtfMetadata
+from mmtfPyspark.utils.mmtfMetadata import METADATA_FIELDS, is_metadata_filter
+
+
+def get_dataset(structures):
+    '''Returns a metadata index of a set of PDB structures.
+
+    The dataset contains the following columns:
+    - structureId - PDB ID
+    - resolution, rFree, rWork - resolution and R-factors (null if not available)
+    - depositionDate, releaseDate - dates (YYYY-MM-DD)
+    - experimentalMethods - list of experimental methods
+    - numAtoms, numGroups, numChains, numModels - counts of all models
+    - chainNames - chain names
+    - chainTypes - entity type of the chains (polymer, non-polymer, water)
+    - chainChemCompTypes - sorted chem comp types of the groups of each chain
+    - chainHelix, chainSheet, chainCoil - DSSP Q3 fractions of each chain
+      (NaN for chains without groups)
+    - chainSequenceHashes - MD5 hash of the entity sequence of each chain
+    - chainGroupNames - sorted names of the groups of each chain
+    - groupNames - sorted names of the groups in the structure
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+
+    Returns
+    -------
+    dataset
+       metadata index with one row per entry
+    '''
+    rows = structures.map(_get_index_row)
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_schema())
+
+
+def write(structures, path):
+    '''Scans a set of PDB structures and writes the metadata index in the
+    Parquet format.
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+    path : str
+       path of the Parquet file
+    '''
+    get_dataset(structures).write.mode('overwrite').parquet(path)
+
+
+def read(path):
+    '''Reads a metadata index
+
+    Parameters
+    ----------
+    path : str
+       path of the Parquet file
+
+    Returns
+    -------
+    dataset
+       metadata index
+    '''
+    spark = SparkSession.builder.getOrCreate()
+    return spark.read.parquet(path)
+
+
+def get_ids(index, filters):
+    '''Returns the ids of the entries in the index that pass all filters.
+    Filters that read metadata fields (see MmtfMetadata) are evaluated on
+    the metadata columns, filters with a filter_index_row method (e.g. the
+    chain-level filters and ContainsGroup) on the index row.
+
+    Parameters
+    ----------
+    index : dataset
+       metadata index
+    filters : list
+       list of filters or a FilterPipeline
+
+    Returns
+    -------
+    list
+       structure ids
+
+    Raises
+    ------
+    ValueError
+       if a filter cannot be evaluated against the index
+    '''
+    if isinstance(filters, FilterPipeline):
+        filters = filters.filters
+    elif not isinstance(filters, (list, tuple)):
+        filters = [filters]
+
+    fields = []
+    columns = []
+    for f in filters:
+        if is_metadata_filter(f):
+            fields += [field for field in f.fields if field not in fields]
+        elif hasattr(f, 'filter_index_row'):
+            columns += [column for column in f.index_columns if column not in columns]
+        else:
+            raise ValueError("Filter cannot be evaluated against the index: " + type(f).__name__)
+
+    columns += [METADATA_FIELDS[field] for field in fields if METADATA_FIELDS[field] not in columns]
+    for column in columns:
+        if column not in index.columns:
+            raise ValueError("Field not in the index: " + column)
+
+    def passes(row):
+        metadata = (row.structureId, MmtfMetadata(row.asDict(), fields))
+        return all(f(metadata) if is_metadata_filter(f) else f.filter_index_row(row) for f in filters)
+
+    return index.select(['structureId'] + columns).rdd \
+                .filter(passes) \
+                .map(lambda row: row.structureId) \
+                .collect()
+
+
+def read_sequence_file(path, index, filters, first_model=False):
+    '''Reads the entries of an MMTF-Hadoop sequence file that pass all
+    filters, evaluated against the metadata index.
+
+    Parameters
+    ----------
+    path : str
+       path to the MMTF-Hadoop sequence file
+    index : dataset
+       metadata index of the sequence file
+    filters : list
+       list of filters or a FilterPipeline
+    first_model : bool
+       if true, only read the first model
+
+    Returns
+    -------
+    PythonRDD
+       structures that pass the filters
+    '''
+    pdbIds = get_ids(index, filters)
+
+    return mmtfReader.read_sequence_file(path, pdbId=pdbIds, first_model=first_model)
+
+
+def _get_index_row(t):
+    '''Returns the index row of a structure'''
+    structure_id, structure = t
+
+    # chains and groups of the first model
+    summary = ChainSummary(structure)
+    num_chains = summary.num_chains
+
+    chain_names = [str(name) for name in structure.chain_name_list[:num_chains]]
+
+    # entity type and sequence hash of the chains
+    chain_types = [''] * num_chains
+    chain_hashes = [''] * num_chains
+    for entity in structure.entity_list:
+        sequence_hash = hashlib.md5(entity['sequence'].encode('utf-8')).hexdigest()
+        for index in entity['chainIndexList']:
+            if index < num_chains:
+                chain_types[index] = entity['type']
+                chain_hashes[index] = sequence_hash
+
+    # unique chem comp types and group names per chain
+    group_list = structure.group_list
+    chem_comp_types = [set() for _ in range(num_chains)]
+    chain_group_names = [set() for _ in range(num_chains)]
+    chains, group_types, _ = summary.get_group_type_counts()
+    for chain, group_type in zip(chains.tolist(), group_types.tolist()):
+        chem_comp_types[chain].add(group_list[group_type]['chemCompType'])
+        chain_group_names[chain].add(group_list[group_type]['groupName'])
+    chem_comp_types = [sorted(types) for types in chem_comp_types]
+    chain_group_names = [sorted(names) for names in chain_group_names]
+
+    # DSSP Q3 fractions per chain
+    fractions = summary.get_q3_fractions().T.tolist()
+
+    group_names = sorted({group_list[g]['groupName'] for g in np.unique(structure.group_type_list)})
+
+    return Row(structure_id,
+               _to_float(structure.resolution),
+               _to_float(structure.r_free),
+               _to_float(structure.r_work),
+               structure.deposition_date,
+               structure.release_date,
+               list(structure.experimental_methods),
+               int(structure.num_atoms),
+               int(structure.num_groups),
+               int(structure.num_chains),
+               int(structure.num_models),
+               chain_names,
+               chain_types,
+               chem_comp_types,
+               fractions[0],
+               fractions[1],
+               fractions[2],
+               chain_hashes,
+               chain_group_names,
+               group_names)
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+def _get_schema():
+    nullable = True
+
+    return StructType([StructField("structureId", StringType(), False),
+                       StructField("resolution", FloatType(), nullable),
+                       StructField("rFree", FloatType(), nullable),
+                       StructField("rWork", FloatType(), nullable),
+                       StructField("depositionDate", StringType(), nullable),
+                       StructField("releaseDate", StringType(), nullable),
+                       StructField("experimentalMethods", ArrayType(StringType()), nullable),
+                       StructField("numAtoms", IntegerType(), nullable),
+                       StructField("numGroups", IntegerType(), nullable),
+                       StructField("numChains", IntegerType(), nullable),
+                       StructField("numModels", IntegerType(), nullable),
+                       StructField("chainNames", ArrayType(StringType()), nullable),
+                       StructField("chainTypes", ArrayType(StringType()), nullable),
+                       StructField("chainChemCompTypes", ArrayType(ArrayType(StringType())), nullable),
+                       StructField("chainHelix", ArrayType(FloatType()), nullable),
+                       StructField("chainSheet", ArrayType(FloatType()), nullable),
+                       StructField("chainCoil", ArrayType(FloatType()), nullable),
+                       StructField("chainSequenceHashes", ArrayType(StringType()), nullable),
+                       StructField("chainGroupNames", ArrayType(ArrayType(StringType())), nullable),
+                       StructField("groupNames", ArrayType(StringType()), nullable)])
@@ -2,9 +2,11 @@
 __author__ = "Peter Rose"
 __version__ = "0.2.0"
 
+import os
 from pyspark import SparkFiles
 from pyspark.sql import SparkSession
 from pyspark.sql.functions import concat, explode, lit, split, upper
+from mmtfPyspark.webservices import httpCache
 
 # location of dbPTM data
 URL = "https://cdn.rcsb.org/resources/protmod/protmod.tsv.gz"
@@ -44,15 +46,16 @@ def get_ptm_dataset():
     """
     spark = SparkSession.builder.getOrCreate()
 
-    # download dataset
-    spark.sparkContext.addFile(URL)
+    # download dataset, or use the cached copy
+    path = httpCache.get_path(URL)
+    spark.sparkContext.addFile(path)
 
     # read dataset
     ds = spark.read \
         .option('comment', '#') \
         .option('inferSchema', 'true') \
         .option('delimiter', '\t') \
-        .csv(SparkFiles.get(FILE_NAME))
+        .csv(SparkFiles.get(os.path.basename(path)))
 
     # add column names
     ds = ds.toDF('pdbId', 'chainId', 'modificationId', 'category', 'ccId', 'psimodId', 'residId', 'unused', 'residues')
@@ -23,6 +23,7 @@ from pyspark.sql import SparkSession
 from pyspark.sql.functions import col, lit, upper, concat
 from urllib.request import urlretrieve
 import requests
+from mmtfPyspark.webservices import httpCache
 
 
 def get_dataset(sqlQuery):
@@ -43,10 +44,10 @@ def get_dataset(sqlQuery):
     URL = "https://pdbj.org/rest/mine2_sql"
 
     # Download results to file
-    infile = urllib.request.urlopen(URL + "?format=csv&q=" + encodedSQL, context=ctx)
+    content = httpCache.get(URL + "?format=csv&q=" + encodedSQL, context=ctx)
     tmp = tempfile.NamedTemporaryFile(delete=False)
     with open(tmp.name, 'wb') as output:
-        output.write(infile.read())
+        output.write(content)
 
     spark = SparkSession.builder.getOrCreate()
 
@@ -0,0 +1,237 @@
+#!/user/bin/env python
+'''residueContactMapExtractor.py
+
+Creates a dataset of residue-residue contact maps for the polymer chains in
+a set of PDB structures. Two residues are in contact if any pair of their
+selected atoms (CA, CB, or any heavy atom) is within a distance cutoff.
+The residues are identified by their zero-based index in the polymer
+sequence (SEQRES), so that contact maps align with the sequence.
+
+Each contact map is stored in sparse coordinate (COO) format as two binary
+columns of little-endian int32 row and column indices. Intra-chain contact
+maps are symmetric and only store contacts with row < column. Optionally,
+inter-chain contact maps for all pairs of chains that are in contact are
+included as well. Only the first model of a structure is used.
+
+Examples
+--------
+get a dataset of C-beta contact maps with an 8 Angstrom cutoff:
+
+>>> contacts = residueContactMapExtractor.get_dataset(pdb, 'CB', 8.0)
+>>> contacts.show(10)
+>>> matrix = residueContactMapExtractor.to_coo_matrix(contacts.first())
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.spatial import cKDTree
+from pyspark.sql import Row, SparkSession
+from pyspark.sql.types import StructType, StructField, StringType, IntegerType, BinaryType
+from mmtfPyspark.utils import ColumnarStructure
+
+ATOM_SELECTIONS = ('CA', 'CB', 'heavy')
+
+
+def get_dataset(structures, atom_selection='CA', cutoff=8.0, inter_chain=False):
+    '''Returns a dataset of residue-residue contact maps of polymer chains.
+
+    The dataset contains the following columns:
+    - structureChainId - pdbId.chainName of the chain that indexes the rows
+    - targetChainId - chain name of the chain that indexes the columns
+    - numRows - length of the polymer sequence of the row chain
+    - numColumns - length of the polymer sequence of the column chain
+    - numContacts - number of residue-residue contacts
+    - rowIndices - sequence indices of the contacts in the row chain (int32)
+    - columnIndices - sequence indices of the contacts in the column chain (int32)
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+    atom_selection : str
+       atoms used to calculate contacts: 'CA', 'CB' (CA for glycine),
+       or 'heavy' for all non-hydrogen atoms ['CA']
+    cutoff : float
+       maximum distance between selected atoms of residues in contact [8.0]
+    inter_chain : bool
+       if True, include contact maps between pairs of chains [False]
+
+    Returns
+    -------
+    dataset
+       dataset with sparse contact maps
+    '''
+
+    rows = get_python_rdd(structures, atom_selection, cutoff, inter_chain)
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_schema())
+
+
+def get_python_rdd(structures, atom_selection='CA', cutoff=8.0, inter_chain=False):
+    '''Returns a pythonRDD of residue-residue contact maps of polymer chains.
+    See get_dataset for a description of the parameters and rows.
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+    atom_selection : str
+       atoms used to calculate contacts: 'CA', 'CB', or 'heavy' ['CA']
+    cutoff : float
+       maximum distance between selected atoms of residues in contact [8.0]
+    inter_chain : bool
+       if True, include contact maps between pairs of chains [False]
+    '''
+
+    if atom_selection not in ATOM_SELECTIONS:
+        raise ValueError(f"atom_selection must be one of {ATOM_SELECTIONS}, but was: {atom_selection}")
+
+    return structures.flatMap(lambda t: _get_contact_maps(t, atom_selection, cutoff, inter_chain))
+
+
+def to_coo_matrix(row):
+    '''Converts a contact map row into a sparse matrix. The upper triangular
+    intra-chain contact maps are expanded into symmetric matrices.
+
+    Parameters
+    ----------
+    row : Row
+       row of a contact map dataset
+
+    Returns
+    -------
+    :obj:`coo_matrix <scipy.sparse.coo_matrix>`
+       sparse contact map
+    '''
+
+    structure_chain_id, target_chain_id, num_rows, num_columns = row[0], row[1], row[2], row[3]
+    i = np.frombuffer(row[5], dtype='<i4')
+    j = np.frombuffer(row[6], dtype='<i4')
+
+    if structure_chain_id.split('.')[-1] == target_chain_id:
+        i, j = np.concatenate((i, j)), np.concatenate((j, i))
+
+    data = np.ones(len(i), dtype=np.int8)
+    return coo_matrix((data, (i, j)), shape=(num_rows, num_columns))
+
+
+def _get_schema():
+    nullable = False
+    return StructType([StructField("structureChainId", StringType(), nullable),
+                       StructField("targetChainId", StringType(), nullable),
+                       StructField("numRows", IntegerType(), nullable),
+                       StructField("numColumns", IntegerType(), nullable),
+                       StructField("numContacts", IntegerType(), nullable),
+                       StructField("rowIndices", BinaryType(), nullable),
+                       StructField("columnIndices", BinaryType(), nullable)
+                       ])
+
+
+def _get_contact_maps(t, atom_selection, cutoff, inter_chain):
+    '''Returns rows of contact maps for the polymer chains of a structure
+    '''
+
+    structure_id = t[0].split('.')[0]
+    structure = t[1]
+
+    arrays = ColumnarStructure(structure, True)
+    chain_to_atom = arrays.get_chain_to_atom_indices()
+    chain_to_entity = arrays.get_chain_to_entity_index()
+
+    selected = _get_atom_selection(arrays, atom_selection) \
+        & arrays.is_polymer() & (arrays.get_sequence_positions() >= 0)
+
+    coords = np.stack((arrays.get_x_coords(), arrays.get_y_coords(), arrays.get_z_coords()), axis=-1)
+    sequence_positions = arrays.get_sequence_positions()
+
+    # collect the selected atoms of each polymer chain
+    chains = []
+    for i in range(arrays.get_num_chains()):
+        start, end = chain_to_atom[i], chain_to_atom[i + 1]
+        atoms = start + np.flatnonzero(selected[start:end])
+        if len(atoms) == 0:
+            continue
+
+        xyz = coords[atoms]
+        center = xyz.mean(axis=0)
+        chains.append({'name': structure.chain_name_list[i],
+                       'length': len(structure.entity_list[chain_to_entity[i]]['sequence']),
+                       'positions': sequence_positions[atoms],
+                       'coords': xyz,
+                       'center': center,
+                       'radius': np.linalg.norm(xyz - center, axis=1).max(),
+                       'tree': cKDTree(xyz)})
+
+    rows = []
+    for chain in chains:
+        # one neighbor search per chain for all pairs of selected atoms
+        pairs = chain['tree'].query_pairs(cutoff, output_type='ndarray')
+        pi = chain['positions'][pairs[:, 0]]
+        pj = chain['positions'][pairs[:, 1]]
+        ri, rj = np.minimum(pi, pj), np.maximum(pi, pj)
+        keep = ri != rj
+        ri, rj = _unique_contacts(ri[keep], rj[keep], chain['length'])
+
+        rows.append(_get_row(structure_id, chain, chain, ri, rj))
+
+    if inter_chain:
+        for m in range(len(chains) - 1):
+            for n in range(m + 1, len(chains)):
+                a, b = chains[m], chains[n]
+
+                # skip chains whose bounding spheres are not within the cutoff
+                d = np.linalg.norm(a['center'] - b['center'])
+                if d > a['radius'] + b['radius'] + cutoff:
+                    continue
+
+                sparse_dm = a['tree'].sparse_distance_matrix(b['tree'], cutoff, output_type='ndarray')
+                if len(sparse_dm) == 0:
+                    continue
+
+                ri = a['positions'][sparse_dm['i']]
+                rj = b['positions'][sparse_dm['j']]
+                ri, rj = _unique_contacts(ri, rj, b['length'])
+
+                rows.append(_get_row(structure_id, a, b, ri, rj))
+
+    return rows
+
+
+def _get_atom_selection(arrays, atom_selection):
+    '''Returns a mask of the atoms used to calculate contacts
+    '''
+
+    atom_names = arrays.get_atom_names()
+    elements = arrays.get_elements()
+
+    if atom_selection == 'CA':
+        return (atom_names == 'CA') & (elements == 'C')
+    elif atom_selection == 'CB':
+        glycine = arrays.get_group_names() == 'GLY'
+        return ((atom_names == 'CB') | (glycine & (atom_names == 'CA'))) & (elements == 'C')
+    else:
+        return (elements != 'H') & (elements != 'D')
+
+
+def _unique_contacts(ri, rj, num_columns):
+    '''Returns unique residue index pairs sorted by row and column
+    '''
+
+    keys = np.unique(ri.astype(np.int64) * num_columns + rj)
+    return keys // num_columns, keys % num_columns
+
+
+def _get_row(structure_id, row_chain, column_chain, ri, rj):
+    return Row(structure_id + "." + row_chain['name'],  # structureChainId
+               column_chain['name'],  # targetChainId
+               row_chain['length'],  # numRows
+               column_chain['length'],  # numColumns
+               len(ri),  # numContacts
+               bytearray(ri.astype('<i4').tobytes()),  # rowIndices
+               bytearray(rj.astype('<i4').tobytes())  # columnIndices
+               )
@@ -22,6 +22,7 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
+import numpy as np
 from mmtfPyspark.ml import pythonRDDToDataset
 from mmtfPyspark.utils import DsspSecondaryStructure
 from pyspark.sql import Row
@@ -72,49 +73,30 @@ def _get_sec_struct_fractions(t):
         raise Exception(
             "This method can only be applied to single polyer chain.")
 
-    dsspQ8, dsspQ3 = '', ''
-
-    helix = 0
-    sheet = 0
-    coil = 0
-    dsspIndex = 0
-    structureIndex = 0
-
-    for code in structure.sec_struct_list:
-
-        seqIndex = structure.sequence_index_list[structureIndex]
-
-        while dsspIndex < seqIndex:
-            dsspQ3 += "X"
-            dsspQ8 += "X"
-            dsspIndex += 1
-
-        structureIndex += 1
-        dsspQ8 += DsspSecondaryStructure.get_dssp_code(
-            code).get_one_letter_code()
-        dsspIndex += 1
-
-        q3 = DsspSecondaryStructure.get_q3_code(code).name
-        if q3 == "ALPHA_HELIX":
-            helix += 1
-            dsspQ3 += "H"
-        elif q3 == "EXTENDED":
-            sheet += 1
-            dsspQ3 += "E"
-        elif q3 == "COIL":
-            coil += 1
-            dsspQ3 += "C"
-
-    while dsspIndex < len(structure.entity_list[0]['sequence']):
-        dsspQ8 += "X"
-        dsspQ3 += "X"
-        dsspIndex += 1
-
-    n = len(structure.sec_struct_list)
-
-    helix /= n
-    sheet /= n
-    coil /= n
-
-    return Row(key, structure.entity_list[0]['sequence'], helix, sheet,
-               coil, dsspQ8, dsspQ3)
+    sequence = structure.entity_list[0]['sequence']
+    codes = np.asarray(structure.sec_struct_list)
+    n = len(codes)
+
+    # position of each group in the DSSP strings: its sequence index, or the
+    # position after the previous group if the sequence index is not increasing
+    order = np.arange(n)
+    offsets = np.asarray(structure.sequence_index_list, dtype=np.int64)[:n] - order
+    positions = order + np.maximum.accumulate(np.maximum(offsets, 0))
+    length = max(len(sequence), int(positions.max(initial=-1)) + 1)
+
+    # gaps in the DSSP strings are marked with X
+    q8 = np.full(length, b'X', dtype='S1')
+    q3 = np.full(length, b'X', dtype='S1')
+    q8[positions] = DsspSecondaryStructure.get_q8_codes(codes)
+    q3_codes = DsspSecondaryStructure.get_q3_codes(codes)
+    q3[positions] = q3_codes
+    dsspQ8 = q8.tobytes().decode('ascii')
+    dsspQ3 = q3.tobytes().decode('ascii')
+
+    # fractions of alpha helix (H), extended (E), and coil (C) residues
+    counts = np.bincount(np.frombuffer(q3_codes.tobytes(), dtype=np.uint8), minlength=128)
+    helix = counts[ord('H')].item() / n
+    sheet = counts[ord('E')].item() / n
+    coil = counts[ord('C')].item() / n
+
+    return Row(key, sequence, helix, sheet, coil, dsspQ8, dsspQ3)
@@ -0,0 +1,340 @@
+#!/user/bin/env python
+'''sequenceClusters.py
+
+Clusters the polymer chains of a set of PDB structures by sequence identity
+and selects a representative chain for each cluster, similar to the
+BlastClust clusters and PISCES culled sets, but calculated locally, e.g.,
+for private structures or the latest PDB release.
+
+The clusters are calculated in four steps:
+
+1. the entity sequences of the first model are collected and identical
+   sequences are merged, the chains of a sequence are ranked by resolution
+2. candidate pairs of similar sequences are found by locality-sensitive
+   hashing of MinHash sketches of the k-mers of the sequences. Each sequence
+   is compared with the best ranked members of a bucket, so that the number
+   of comparisons grows linearly with the size of a bucket
+3. the sequence identity of the candidate pairs is verified with a banded
+   alignment (see :mod:`sequenceAlignment <mmtfPyspark.utils.sequenceAlignment>`)
+4. the sequences are clustered greedily in the order of decreasing length
+   and increasing resolution of their best chain: a sequence joins the
+   cluster of the most similar representative that was selected before,
+   or becomes the representative of a new cluster.
+
+The candidate pairs and their verification are distributed with Spark, only
+the verified pairs are clustered on the driver.
+
+The sequence identity is defined as 1 - edit distance / length of the
+longer sequence. Each member of a cluster is similar to its representative,
+so the representatives form a culled set, similar to PISCES: a sequence that
+is only similar to another member of a cluster remains a representative.
+
+The number of bands and hash functions per band are derived from the
+sequence identity threshold, so that a pair of sequences at the threshold
+shares a band with a probability of 99%, assuming random substitutions.
+Thresholds that require more than MAX_HASHES hash functions, below about
+50% sequence identity for 5-mers, are rejected; shorter k-mers support
+lower thresholds at a higher cost.
+
+Examples
+--------
+>>> pdb = mmtfReader.read_full_sequence_file()
+>>> clusters = sequenceClusters.get_dataset(pdb, sequenceIdentity=90)
+>>> representatives = sequenceClusters.get_representative_chains(pdb, sequenceIdentity=90)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import math
+import numpy as np
+from pyspark.sql import Row, SparkSession
+from pyspark.sql.types import StructType, StructField, StringType, IntegerType, FloatType
+from mmtfPyspark.utils.sequenceAlignment import get_sequence_identity
+
+# default length of the k-mers of the MinHash sketches
+KMER_LENGTH = 5
+
+# probability that a pair of sequences at the threshold shares a band
+RECALL = 0.99
+
+# maximum number of hash functions and of hash functions per band
+MAX_HASHES = 256
+MAX_ROWS = 4
+
+# maximum number of better ranked members of a bucket that a sequence is
+# compared with
+MAX_COMPARISONS = 32
+
+
+def get_dataset(structures, sequenceIdentity=90, kmer_length=KMER_LENGTH, seed=1):
+    '''Returns the sequence clusters of the polymer chains of a set of
+    PDB structures.
+
+    The dataset contains the following columns:
+    - structureChainId - chain id (structureId.chainName)
+    - clusterId - cluster number, in the order of the representatives
+    - representativeChainId - chain id of the representative of the cluster
+    - sequenceIdentity - sequence identity with the representative
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+    sequenceIdentity : int
+       sequence identity threshold in percent
+    kmer_length : int
+       length of the k-mers of the MinHash sketches (<= 8)
+    seed : int
+       seed of the hash functions
+
+    Returns
+    -------
+    dataset
+       dataset with one row per chain
+
+    Raises
+    ------
+    ValueError
+       if the sequence identity threshold is too low for the k-mer length
+    '''
+    rows = _get_clusters(structures, sequenceIdentity, kmer_length, seed)
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_schema())
+
+
+def get_representative_chains(structures, sequenceIdentity=90, kmer_length=KMER_LENGTH, seed=1):
+    '''Returns the representative chains of the sequence clusters of a set of
+    PDB structures. See :func:`get_dataset` for the parameters.
+
+    Returns
+    -------
+    list
+       sorted chain ids (structureId.chainName)
+    '''
+    rows = _get_clusters(structures, sequenceIdentity, kmer_length, seed)
+    representatives = rows.filter(lambda row: row[0] == row[2]).map(lambda row: row[0]).collect()
+    rows.unpersist()
+
+    return sorted(representatives)
+
+
+def _get_clusters(structures, sequenceIdentity, kmer_length, seed):
+    '''Returns a cached RDD of the cluster rows of the chains'''
+    # unique sequences and their chains ranked by resolution: (index, (sequence, chains))
+    sequences = structures.flatMap(_get_sequence_chains) \
+                          .reduceByKey(lambda a, b: a + b) \
+                          .map(lambda t: (t[0], sorted(t[1]))) \
+                          .zipWithIndex() \
+                          .map(lambda t: (t[1], t[0])) \
+                          .cache()
+
+    rows = _cluster_sequences(sequences, sequenceIdentity, kmer_length, seed)
+    sequences.unpersist()
+
+    return rows
+
+
+def _cluster_sequences(sequences, sequenceIdentity, kmer_length, seed):
+    '''Returns a cached RDD of the cluster rows of the chains of an RDD of
+    (index, (sequence, [(resolution, chainId)])) pairs'''
+    if not 1 <= kmer_length <= 8:
+        raise ValueError("kmer_length must be between 1 and 8")
+
+    min_identity = sequenceIdentity / 100.0
+    rows_per_band, num_bands = _get_lsh_parameters(min_identity, kmer_length)
+
+    # candidate pairs of sequences with identical bands of their MinHash sketches
+    hashes = _get_hash_functions(rows_per_band * num_bands, seed)
+
+    def band_keys(t):
+        index, (sequence, chains) = t
+        sketch = _get_min_hash(sequence, kmer_length, hashes)
+        if sketch is None:
+            return []
+        bands = sketch.reshape(num_bands, rows_per_band)
+        rank = _get_rank(index, sequence, chains)
+        return [((b, int.from_bytes(bands[b].tobytes(), 'little')), (rank, len(sequence)))
+                for b in range(num_bands)]
+
+    def bucket_pairs(members):
+        # each member is compared with the best ranked members of the bucket
+        members = sorted(members)
+        pairs = []
+        for i, (rank2, length2) in enumerate(members):
+            for rank1, length1 in members[:min(i, MAX_COMPARISONS)]:
+                # the edit distance is at least the difference in length
+                if length2 >= min_identity * length1:
+                    pairs.append((rank1[-1], rank2[-1]))
+        return pairs
+
+    candidates = sequences.flatMap(band_keys) \
+                          .groupByKey() \
+                          .flatMap(lambda t: bucket_pairs(t[1])) \
+                          .distinct()
+
+    # verify the sequence identity of the candidate pairs: (index1, index2, identity)
+    sequence_only = sequences.mapValues(lambda v: v[0])
+
+    def verify(t):
+        index2, ((index1, sequence1), sequence2) = t
+        return index1, index2, get_sequence_identity(sequence1, sequence2, min_identity)
+
+    edges = candidates.join(sequence_only) \
+                      .map(lambda t: (t[1][0], (t[0], t[1][1]))) \
+                      .join(sequence_only) \
+                      .map(verify) \
+                      .filter(lambda e: e[2] is not None) \
+                      .collect()
+
+    # greedy clustering in the order of the ranks
+    ranks = sequences.map(lambda t: (t[0], _get_rank(t[0], *t[1]))).collectAsMap()
+    clusters = _cluster(ranks, edges)
+
+    def chain_rows(t):
+        index, ((sequence, chains), (representative_chain, identity, cluster_id)) = t
+        return [Row(chain_id, cluster_id, representative_chain,
+                    1.0 if chain_id == representative_chain else float(identity))
+                for _, chain_id in chains]
+
+    rows = sequences.join(sequences.context.parallelize(list(clusters.items()))) \
+                    .flatMap(chain_rows) \
+                    .cache()
+    rows.count()
+
+    return rows
+
+
+def _cluster(ranks, edges):
+    '''Greedily assigns each sequence to the most similar representative of a
+    previous cluster. The sequences are processed in the order of their
+    ranks; a sequence that is not similar to any representative starts a new
+    cluster. All members of a cluster are therefore similar to its
+    representative.
+
+    Parameters
+    ----------
+    ranks : dict
+       sequence index -> rank (see _get_rank)
+    edges : list
+       (index1, index2, sequence identity) of the similar sequences
+
+    Returns
+    -------
+    dict
+       sequence index -> (representative chain id, sequence identity, cluster id)
+    '''
+    # similar sequences that are processed earlier
+    neighbors = {}
+    for index1, index2, identity in edges:
+        if ranks[index1] > ranks[index2]:
+            index1, index2 = index2, index1
+        neighbors.setdefault(index2, []).append((index1, identity))
+
+    clusters = {}
+    num_clusters = 0
+    for index in sorted(ranks, key=ranks.get):
+        best = None
+        for neighbor, identity in neighbors.get(index, []):
+            if clusters[neighbor][0] == neighbor and \
+                    (best is None or (identity, ranks[best[0]]) > (best[1], ranks[neighbor])):
+                best = (neighbor, identity)
+
+        if best is None:
+            clusters[index] = (index, 1.0, num_clusters)
+            num_clusters += 1
+        else:
+            clusters[index] = (best[0], best[1], clusters[best[0]][2])
+
+    # the representative chain is the best ranked chain of a sequence
+    return {index: (ranks[representative][1][1], identity, cluster_id)
+            for index, (representative, identity, cluster_id) in clusters.items()}
+
+
+def _get_rank(index, sequence, chains):
+    '''Returns the rank of a sequence: longer sequences and sequences with a
+    chain of better resolution are ranked first. The last element of the
+    rank is the index of the sequence.'''
+    return -len(sequence), chains[0], index
+
+
+def _get_lsh_parameters(min_identity, k):
+    '''Returns the number of hash functions per band and the number of bands
+    such that two sequences at the threshold share a band with probability
+    RECALL. The expected Jaccard similarity of the k-mer sets of two
+    sequences with random substitutions at sequence identity t is
+    t^k / (2 - t^k).'''
+    conserved = min(max(min_identity, 0.0), 1.0) ** k
+    jaccard = conserved / (2.0 - conserved)
+
+    for rows in range(MAX_ROWS, 0, -1):
+        collision = jaccard ** rows
+        if collision >= 1.0:
+            return rows, 1
+        if collision > 0.0:
+            bands = int(math.ceil(math.log(1.0 - RECALL) / math.log(1.0 - collision)))
+            if rows * bands <= MAX_HASHES:
+                return rows, bands
+
+    raise ValueError("sequenceIdentity " + str(round(min_identity * 100, 2))
+                     + " is too low for MinHash sketches of " + str(k) + "-mers, use a shorter kmer_length")
+
+
+def _get_sequence_chains(t):
+    '''Returns (sequence, [(resolution, chainId)]) pairs of the polymer
+    entities of the first model of a structure'''
+    structure_id, structure = t
+
+    resolution = structure.resolution if structure.resolution is not None else float('inf')
+    num_chains = structure.chains_per_model[0]
+    chain_names = structure.chain_name_list
+
+    pairs = []
+    for entity in structure.entity_list:
+        sequence = entity['sequence']
+        if entity['type'] == 'polymer' and len(sequence) > 0:
+            chain_ids = {structure_id + '.' + str(chain_names[i]) for i in entity['chainIndexList']
+                         if i < num_chains}
+            pairs.append((sequence, [(float(resolution), chain_id) for chain_id in sorted(chain_ids)]))
+
+    return pairs
+
+
+def _get_hash_functions(num_hashes, seed):
+    '''Returns the odd multipliers and the offsets of multiply-shift hash functions'''
+    random = np.random.RandomState(seed)
+    multipliers = random.randint(0, 2 ** 62, size=num_hashes, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+    offsets = random.randint(0, 2 ** 62, size=num_hashes, dtype=np.int64).astype(np.uint64)
+
+    return multipliers, offsets
+
+
+def _get_min_hash(sequence, k, hashes):
+    '''Returns the MinHash sketch of the k-mers of a sequence, or None if the
+    sequence is shorter than k'''
+    codes = np.frombuffer(sequence.encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+    if len(codes) < k:
+        return None
+
+    # k-mers packed into 64 bit integers
+    kmers = np.zeros(len(codes) - k + 1, dtype=np.uint64)
+    for j in range(k):
+        kmers |= codes[j:len(codes) - k + 1 + j] << np.uint64(8 * j)
+    kmers = np.unique(kmers)
+
+    multipliers, offsets = hashes
+    with np.errstate(over='ignore'):
+        values = (kmers[:, np.newaxis] * multipliers + offsets) >> np.uint64(32)
+
+    return values.min(axis=0)
+
+
+def _get_schema():
+    nullable = False
+
+    return StructType([StructField("structureChainId", StringType(), nullable),
+                       StructField("clusterId", IntegerType(), nullable),
+                       StructField("representativeChainId", StringType(), nullable),
+                       StructField("sequenceIdentity", FloatType(), nullable)])
@@ -0,0 +1,336 @@
+#!/user/bin/env python
+'''sequenceMotifIndex.py
+
+Creates a sequence motif index of a set of PDB structures, e.g., of an
+MMTF-Hadoop sequence file. Many entity sequences occur in many entries (e.g.
+hundreds of copies of lysozyme), therefore the index stores each unique
+entity sequence once, with the ids of the chains that have this sequence,
+and an inverted index of the k-mers (substrings of length k) of the unique
+sequences. The index is written once in the Parquet format.
+
+A regular expression query (see ContainsSequenceRegex) is answered in three
+steps:
+
+1. the literal substrings that every match must contain are extracted from
+   the regular expression, e.g., "GK" from "[AG].{4}GK[ST]"
+2. the k-mer index and the literals select the candidate sequences
+3. the compiled regular expression is only run on the candidate sequences
+
+The matching sequences are mapped back to the entries and chains.
+
+Examples
+--------
+build the index once:
+
+>>> pdb = mmtfReader.read_full_sequence_file()
+>>> sequenceMotifIndex.write(pdb, "motif_index")
+
+find the chains with a zinc finger motif:
+
+>>> index = sequenceMotifIndex.read("motif_index")
+>>> hits = sequenceMotifIndex.search(index, "C.{2,4}C.{12}H.{3,5}H")
+>>> pdbIds = sequenceMotifIndex.get_ids(index, "C.{2,4}C.{12}H.{3,5}H")
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import hashlib
+import re
+from pyspark.sql import Row, SparkSession
+from pyspark.sql.types import StructType, StructField, StringType, ArrayType
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+# default length of the indexed k-mers
+KMER_LENGTH = 3
+
+
+def get_dataset(structures):
+    '''Returns the unique entity sequences of a set of PDB structures.
+
+    The dataset contains the following columns:
+    - sequenceId - MD5 hash of the sequence
+    - sequence - entity sequence (one-letter codes)
+    - chainIds - ids of the chains with this sequence (structureId.chainName)
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+
+    Returns
+    -------
+    dataset
+       dataset with one row per unique sequence
+    '''
+    rows = structures.flatMap(_get_sequence_chains) \
+                     .reduceByKey(lambda a, b: a + b) \
+                     .map(lambda t: Row(_get_sequence_id(t[0]), t[0], sorted(t[1])))
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_sequence_schema())
+
+
+def get_kmer_dataset(sequences, k=KMER_LENGTH):
+    '''Returns an inverted index of the k-mers of unique sequences.
+
+    The dataset contains the following columns:
+    - kmer - substring of length k
+    - sequenceIds - ids of the sequences that contain the k-mer
+
+    Parameters
+    ----------
+    sequences : dataset
+       unique sequences, see get_dataset
+    k : int
+       length of the k-mers
+
+    Returns
+    -------
+    dataset
+       dataset with one row per k-mer
+    '''
+    rows = sequences.rdd \
+                    .flatMap(lambda row: [(kmer, row.sequenceId) for kmer in _get_kmers(row.sequence, k)]) \
+                    .groupByKey() \
+                    .map(lambda t: Row(t[0], sorted(t[1])))
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_kmer_schema())
+
+
+def write(structures, path, k=KMER_LENGTH):
+    '''Scans a set of PDB structures and writes the unique sequences and the
+    k-mer index in the Parquet format to the subdirectories "sequences" and
+    "kmers" of a directory.
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+    path : str
+       path of the index directory
+    k : int
+       length of the k-mers
+    '''
+    sequences = get_dataset(structures)
+    sequences.write.mode('overwrite').parquet(path + '/sequences')
+
+    sequences = _read_parquet(path + '/sequences')
+    get_kmer_dataset(sequences, k).write.mode('overwrite').parquet(path + '/kmers')
+
+
+def read(path):
+    '''Reads a sequence motif index
+
+    Parameters
+    ----------
+    path : str
+       path of the index directory
+
+    Returns
+    -------
+    tuple
+       (sequences, kmers) datasets
+    '''
+    return _read_parquet(path + '/sequences'), _read_parquet(path + '/kmers')
+
+
+def search(index, regularExpression):
+    '''Returns the chains with a sequence that matches a regular expression.
+
+    Parameters
+    ----------
+    index : tuple
+       (sequences, kmers) datasets, see read
+    regularExpression : str
+       regular expression of a sequence motif
+
+    Returns
+    -------
+    dataset
+       dataset with the columns structureId, chainName, and sequenceId
+    '''
+    pattern = re.compile(regularExpression)
+
+    hits = _get_candidates(index, regularExpression).rdd \
+               .filter(lambda row: pattern.search(row.sequence) is not None) \
+               .flatMap(lambda row: [Row(*chain_id.split('.', 1), row.sequenceId)
+                                     for chain_id in row.chainIds])
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(hits, _get_hit_schema())
+
+
+def get_ids(index, regularExpression):
+    '''Returns the sorted ids of the entries with at least one sequence that
+    matches a regular expression.
+
+    Parameters
+    ----------
+    index : tuple
+       (sequences, kmers) datasets, see read
+    regularExpression : str
+       regular expression of a sequence motif
+
+    Returns
+    -------
+    list
+       sorted structure ids
+    '''
+    rows = search(index, regularExpression).select('structureId') \
+                                           .distinct() \
+                                           .collect()
+
+    return sorted(row.structureId for row in rows)
+
+
+def get_literals(regularExpression):
+    '''Returns the literal substrings that every match of a regular
+    expression contains, e.g., ["GK"] for "[AG].{4}GK[ST]". The literals
+    are necessary, but not sufficient conditions for a match.
+
+    Parameters
+    ----------
+    regularExpression : str
+       regular expression
+
+    Returns
+    -------
+    list
+       literal substrings
+    '''
+    parsed = sre_parse.parse(regularExpression)
+
+    state = getattr(parsed, 'state', None) or getattr(parsed, 'pattern', None)
+    if state is not None and state.flags & re.IGNORECASE:
+        return []
+
+    literals = []
+    _add_literals(parsed, literals)
+
+    return [literal for literal in literals if len(literal) > 0]
+
+
+def _add_literals(parsed, literals):
+    '''Adds the required literals of a parsed regular expression'''
+    run = ''
+    for op, value in parsed:
+        name = str(op)
+
+        if name == 'LITERAL':
+            run += chr(value)
+            continue
+
+        if name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            low, high, item = value
+
+            # a repeated literal, e.g., H{6}, extends the current run, and
+            # ends it if the number of repetitions is variable
+            if low > 0 and len(item) == 1 and str(item[0][0]) == 'LITERAL':
+                run += chr(item[0][1]) * low
+                if high != low:
+                    literals.append(run)
+                    run = ''
+                continue
+
+        literals.append(run)
+        run = ''
+
+        if name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            if value[0] > 0:
+                _add_literals(value[2], literals)
+
+        elif name == 'SUBPATTERN':
+            add_flags = value[1]
+            if not add_flags & re.IGNORECASE:
+                _add_literals(value[-1], literals)
+
+        elif name == 'ATOMIC_GROUP':
+            _add_literals(value, literals)
+
+    literals.append(run)
+
+
+def _get_candidates(index, regularExpression):
+    '''Returns the sequences that contain all required literals of a regular
+    expression, selected with the k-mer index'''
+    sequences, kmers = index
+
+    literals = get_literals(regularExpression)
+
+    first = kmers.select('kmer').first()
+    k = len(first.kmer) if first is not None else KMER_LENGTH
+
+    query = {kmer for literal in literals for kmer in _get_kmers(literal, k)}
+    if len(query) > 0:
+        rows = kmers.filter(kmers.kmer.isin(sorted(query))).collect()
+        if len(rows) < len(query):
+            return sequences.limit(0)
+
+        sequence_ids = set.intersection(*[set(row.sequenceIds) for row in rows])
+        sequences = sequences.filter(sequences.sequenceId.isin(sorted(sequence_ids)))
+
+    # literals shorter than k are checked directly
+    for literal in literals:
+        if len(literal) < k:
+            sequences = sequences.filter(sequences.sequence.contains(literal))
+
+    return sequences
+
+
+def _get_sequence_chains(t):
+    '''Returns (sequence, [chainIds]) pairs of the entities of a structure'''
+    structure_id, structure = t
+
+    chain_names = structure.chain_name_list
+    pairs = []
+    for entity in structure.entity_list:
+        sequence = entity['sequence']
+        if len(sequence) > 0:
+            chain_ids = {structure_id + '.' + str(chain_names[i]) for i in entity['chainIndexList']
+                         if i < len(chain_names)}
+            pairs.append((sequence, sorted(chain_ids)))
+
+    return pairs
+
+
+def _get_sequence_id(sequence):
+    return hashlib.md5(sequence.encode('utf-8')).hexdigest()
+
+
+def _get_kmers(sequence, k):
+    return {sequence[i:i + k] for i in range(len(sequence) - k + 1)}
+
+
+def _read_parquet(path):
+    spark = SparkSession.builder.getOrCreate()
+    return spark.read.parquet(path)
+
+
+def _get_sequence_schema():
+    nullable = False
+
+    return StructType([StructField("sequenceId", StringType(), nullable),
+                       StructField("sequence", StringType(), nullable),
+                       StructField("chainIds", ArrayType(StringType()), nullable)])
+
+
+def _get_kmer_schema():
+    nullable = False
+
+    return StructType([StructField("kmer", StringType(), nullable),
+                       StructField("sequenceIds", ArrayType(StringType()), nullable)])
+
+
+def _get_hit_schema():
+    nullable = False
+
+    return StructType([StructField("structureId", StringType(), nullable),
+                       StructField("chainName", StringType(), nullable),
+                       StructField("sequenceId", StringType(), nullable)])
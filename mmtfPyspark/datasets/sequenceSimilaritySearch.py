@@ -0,0 +1,306 @@
+#!/user/bin/env python
+'''sequenceSimilaritySearch.py
+
+Searches the unique entity sequences of a set of PDB structures (see
+:mod:`sequenceMotifIndex <mmtfPyspark.datasets.sequenceMotifIndex>`) for
+sequences that are similar to one or many query sequences, without a web
+service. The search works like BLAST in two steps:
+
+1. seeding: the k-mers of the query sequences are looked up in a table that
+   is broadcast to the executors. A database sequence is a candidate for a
+   query if it has two non-overlapping k-mer hits on the same diagonal within
+   a window of residues (two-hit method), and the best ungapped segment of
+   the diagonal around the hits scores at least a seed score.
+2. alignment: the candidates of each query are aligned with the query by the
+   Smith-Waterman algorithm with the BLOSUM62 matrix and affine gap costs
+   (see :mod:`sequenceAlignment <mmtfPyspark.utils.sequenceAlignment>`),
+   many candidates at a time.
+
+The E value, or Expect value, is the number of hits with at least the same
+score that one can expect to see by chance when searching a database of
+this size. It is estimated with the Karlin-Altschul parameters of gapped
+BLAST, without corrections of the sequence lengths, and is therefore only
+comparable to, but not identical with, a BLAST E value. The sequence
+identity is the fraction of identical residues in the columns of the local
+alignment. Low complexity regions are not masked.
+
+All queries are searched in one pass over the database sequences, so a
+batch of thousands of queries is much faster than searching them one by one.
+
+Examples
+--------
+>>> pdb = mmtfReader.read_full_sequence_file()
+>>> sequences = sequenceMotifIndex.get_dataset(pdb)
+>>> hits = sequenceSimilaritySearch.get_dataset(sequences, "NLVQFGVMIEKMTGKSALQYNDYGCYCGIGGSHWPVDQ",
+...                                             eValueCutoff=0.001, sequenceIdentityCutoff=40)
+
+search a batch of queries:
+
+>>> queries = {"P69905": "VLSPADKTNVKAAWGKVGAHAGEYGAEALERMF...", ...}
+>>> hits = sequenceSimilaritySearch.get_dataset(sequences, queries, eValueCutoff=1e-10)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import numpy as np
+from pyspark import SparkContext
+from pyspark.sql import Row, SparkSession
+from pyspark.sql.types import StructType, StructField, StringType, IntegerType, FloatType, DoubleType
+from mmtfPyspark.utils.sequenceAlignment import encode, get_local_alignments, \
+    get_local_alignment_scores, get_bit_score, get_e_value, get_scoring_matrix
+
+# default seeding parameters, the seed score is about the gap trigger of
+# BLAST (22 bits)
+KMER_LENGTH = 3
+WINDOW = 40
+SEED_SCORE = 41
+
+# maximum number of candidates that are aligned with a query at a time
+BATCH_SIZE = 256
+
+# number of amino acids of the substitution matrix, k-mers with other
+# residues are not used as seeds
+_NUM_RESIDUES = 20
+
+
+def get_dataset(sequences, queries, eValueCutoff=10.0, sequenceIdentityCutoff=0,
+                kmer_length=KMER_LENGTH, window=WINDOW, seed_score=SEED_SCORE):
+    '''Returns the chains with a sequence that is similar to a query sequence.
+
+    The dataset contains the following columns:
+    - queryId - id of the query
+    - structureId - structure id
+    - chainName - chain name
+    - sequenceId - id of the sequence of the chain
+    - score - alignment score
+    - bitScore - bit score
+    - eValue - E value
+    - sequenceIdentity - fraction of identical residues in the alignment
+    - alignmentLength - number of alignment columns, including gaps
+    - queryStart, queryEnd - aligned region of the query (1-based)
+    - subjectStart, subjectEnd - aligned region of the sequence (1-based)
+
+    Parameters
+    ----------
+    sequences : dataset
+       unique sequences, see sequenceMotifIndex.get_dataset and sequenceMotifIndex.read
+    queries : str or dict
+       query sequence, or dictionary of queryId -> query sequence
+    eValueCutoff : float
+       maximum E value
+    sequenceIdentityCutoff : int
+       minimum sequence identity in percent
+    kmer_length : int
+       length of the seed k-mers (1 - 5)
+    window : int
+       maximum distance of two k-mer hits on the same diagonal
+    seed_score : int
+       minimum score of the best ungapped segment around two k-mer hits
+
+    Returns
+    -------
+    dataset
+       dataset with one row per query and chain
+    '''
+    rows = _search(sequences, queries, eValueCutoff, sequenceIdentityCutoff, kmer_length, window, seed_score)
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_schema())
+
+
+def get_chain_ids(sequences, queries, eValueCutoff=10.0, sequenceIdentityCutoff=0,
+                  kmer_length=KMER_LENGTH, window=WINDOW, seed_score=SEED_SCORE):
+    '''Returns the sorted ids of the chains (structureId.chainName) with a
+    sequence that is similar to a query sequence. See :func:`get_dataset`
+    for the parameters.
+
+    Returns
+    -------
+    list
+       sorted chain ids
+    '''
+    rows = _search(sequences, queries, eValueCutoff, sequenceIdentityCutoff, kmer_length, window, seed_score)
+
+    return sorted(set(rows.map(lambda row: row[1] + '.' + row[2]).collect()))
+
+
+def _search(sequences, queries, eValueCutoff, sequenceIdentityCutoff, kmer_length, window, seed_score):
+    '''Returns an RDD of the hit rows'''
+    if not 1 <= kmer_length <= 5:
+        raise ValueError("kmer_length must be between 1 and 5")
+
+    if isinstance(queries, str):
+        queries = {'query': queries}
+    queries = sorted(queries.items())
+
+    for query_id, query in queries:
+        if len(query) < kmer_length:
+            raise ValueError("the query sequence " + query_id + " must be at least "
+                             + str(kmer_length) + " residues long")
+
+    database_size = sequences.rdd.map(lambda row: len(row.sequence)).sum()
+    min_identity = sequenceIdentityCutoff / 100.0
+
+    sc = SparkContext.getOrCreate()
+    broadcast = sc.broadcast((queries, _get_lookup_table(queries, kmer_length)))
+
+    def align(rows):
+        query_list, lookup_table = broadcast.value
+
+        # candidate sequences of each query
+        candidates = {}
+        for row in rows:
+            for index in _get_seed_hits(encode(row.sequence), lookup_table, kmer_length, window, seed_score):
+                candidates.setdefault(index, []).append(row)
+
+        for index, targets in candidates.items():
+            query_id, query = query_list[index]
+            targets.sort(key=lambda row: len(row.sequence))
+
+            for start in range(0, len(targets), BATCH_SIZE):
+                batch = targets[start:start + BATCH_SIZE]
+                scores = get_local_alignment_scores(query, [row.sequence for row in batch])
+                e_values = get_e_value(scores, len(query), database_size)
+
+                # the alignments are only traced back for the hits
+                hits = [(row, e_value) for row, score, e_value in zip(batch, scores, e_values)
+                        if score > 0 and e_value <= eValueCutoff]
+                alignments = get_local_alignments(query, [row.sequence for row, _ in hits])
+
+                for (row, e_value), alignment in zip(hits, alignments):
+                    score, identity, length, start1, end1, start2, end2 = alignment
+                    if identity < min_identity:
+                        continue
+
+                    for chain_id in row.chainIds:
+                        structure_id, chain_name = chain_id.split('.', 1)
+                        yield Row(query_id, structure_id, chain_name, row.sequenceId, int(score),
+                                  float(get_bit_score(score)), float(e_value), float(identity),
+                                  length, start1 + 1, end1, start2 + 1, end2)
+
+    return sequences.rdd.mapPartitions(align)
+
+
+def _get_lookup_table(queries, k):
+    '''Returns a lookup table of the k-mers of the query sequences: the query
+    indices and positions of the k-mers, sorted by k-mer, and the start of
+    each k-mer in these arrays'''
+    kmers, indices, positions = [], [], []
+    for index, (_, query) in enumerate(queries):
+        codes, valid = _get_kmer_codes(encode(query), k)
+        position = np.nonzero(valid)[0]
+        kmers.append(codes[position])
+        indices.append(np.full(len(position), index, dtype=np.int32))
+        positions.append(position)
+
+    kmers = np.concatenate(kmers)
+    order = np.argsort(kmers, kind='stable')
+    starts = np.searchsorted(kmers[order], np.arange(_NUM_RESIDUES ** k + 1))
+
+    # encoded queries, concatenated
+    codes = [encode(query) for _, query in queries]
+    lengths = np.array([len(c) for c in codes])
+    offsets = np.cumsum(lengths) - lengths
+
+    return starts, np.concatenate(indices)[order], np.concatenate(positions)[order], \
+        np.concatenate(codes), offsets, lengths
+
+
+def _get_seed_hits(codes, lookup_table, k, window, seed_score):
+    '''Returns the indices of the queries with two k-mer hits on the same
+    diagonal of an encoded sequence within a window of residues, and an
+    ungapped segment around the hits with at least the seed score'''
+    starts, query_indices, query_positions, query_codes, query_offsets, query_lengths = lookup_table
+
+    kmers, valid = _get_kmer_codes(codes, k)
+    positions = np.nonzero(valid)[0]
+    kmers = kmers[positions]
+
+    # all (query, query position) entries of the k-mers of the sequence
+    begin = starts[kmers]
+    counts = starts[kmers + 1] - begin
+    total = counts.sum()
+    if total < 2:
+        return []
+
+    offsets = np.repeat(begin - np.cumsum(counts) + counts, counts) + np.arange(total)
+    indices = query_indices[offsets]
+    target_positions = np.repeat(positions, counts)
+    diagonals = target_positions - query_positions[offsets]
+
+    order = np.lexsort((target_positions, diagonals, indices))
+    indices, diagonals, target_positions = indices[order], diagonals[order], target_positions[order]
+
+    # hits sorted by diagonal and position, the diagonals are spaced apart
+    # so that hits on different diagonals are never within the window
+    new_diagonal = (indices[1:] != indices[:-1]) | (diagonals[1:] != diagonals[:-1])
+    diagonal_ids = np.concatenate(([0], np.cumsum(new_diagonal)))
+    keys = diagonal_ids * (len(codes) + window + k + 1) + target_positions
+
+    # the next hit on the same diagonal that does not overlap a hit
+    following = np.searchsorted(keys, keys + k)
+    has_next = following < len(keys)
+    second = np.zeros(len(keys), dtype=bool)
+    second[has_next] = keys[following[has_next]] - keys[has_next] <= window
+
+    first = np.nonzero(second)[0]
+    if len(first) == 0:
+        return []
+
+    # diagonal regions from window residues before the first hit to window
+    # residues after the second hit
+    indices, diagonals = indices[first], diagonals[first]
+    begin = np.maximum(target_positions[first] - window, np.maximum(diagonals, 0))
+    end = np.minimum(target_positions[following[first]] + k + window,
+                     np.minimum(len(codes), query_lengths[indices] + diagonals))
+
+    columns = begin[:, np.newaxis] + np.arange(3 * window + k)
+    inside = columns < end[:, np.newaxis]
+    columns = np.where(inside, columns, 0)
+    rows = np.where(inside, columns - diagonals[:, np.newaxis] + query_offsets[indices, np.newaxis], 0)
+
+    scores = np.where(inside, get_scoring_matrix()[query_codes[rows], codes[columns]], 0)
+
+    # score of the best ungapped segment (maximum subarray)
+    prefix = np.cumsum(scores, axis=1)
+    prefix = np.concatenate((np.zeros((len(first), 1), dtype=prefix.dtype), prefix), axis=1)
+    best = (prefix - np.minimum.accumulate(prefix, axis=1)).max(axis=1)
+
+    return np.unique(indices[best >= seed_score]).tolist()
+
+
+def _get_kmer_codes(codes, k):
+    '''Returns the codes of the k-mers of an encoded sequence and whether the
+    k-mers consist of amino acids of the substitution matrix only'''
+    length = len(codes) - k + 1
+    if length < 1:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    kmers = np.zeros(length, dtype=np.int64)
+    for j in range(k):
+        kmers = kmers * _NUM_RESIDUES + codes[j:j + length]
+
+    unknown = np.concatenate(([0], np.cumsum(codes >= _NUM_RESIDUES)))
+    valid = unknown[k:] == unknown[:length]
+
+    return np.where(valid, kmers, 0), valid
+
+
+def _get_schema():
+    nullable = False
+
+    return StructType([StructField("queryId", StringType(), nullable),
+                       StructField("structureId", StringType(), nullable),
+                       StructField("chainName", StringType(), nullable),
+                       StructField("sequenceId", StringType(), nullable),
+                       StructField("score", IntegerType(), nullable),
+                       StructField("bitScore", FloatType(), nullable),
+                       StructField("eValue", DoubleType(), nullable),
+                       StructField("sequenceIdentity", FloatType(), nullable),
+                       StructField("alignmentLength", IntegerType(), nullable),
+                       StructField("queryStart", IntegerType(), nullable),
+                       StructField("queryEnd", IntegerType(), nullable),
+                       StructField("subjectStart", IntegerType(), nullable),
+                       StructField("subjectEnd", IntegerType(), nullable)])
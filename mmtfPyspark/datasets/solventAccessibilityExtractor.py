@@ -0,0 +1,75 @@
+#!/user/bin/env python
+'''solventAccessibilityExtractor.py
+
+Creates a dataset of solvent accessible surface areas (SASA) of the chains,
+groups, or atoms in a set of PDB structures. The surface areas are
+calculated with the Shrake-Rupley algorithm (see SolventAccessibleSurface).
+
+Examples
+--------
+get the surface area of all residues:
+
+>>> sasa = solventAccessibilityExtractor.get_dataset(pdb, level='group')
+>>> sasa.show(10)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+from pyspark.sql import SparkSession
+from pyspark.sql.types import StructType, StructField, StringType, FloatType
+from mmtfPyspark.mappers import StructureToSolventAccessibleSurface
+
+
+def get_dataset(structures, level='group', probe_radius=1.4, num_points=100):
+    '''Returns a dataset of solvent accessible surface areas.
+
+    The dataset contains some or all of the following columns depending on the specified level.
+    - structureChainId - pdbId.chainName, chains with the same chain name are
+      aggregated at the chain level
+    - groupName - id of the group (residue) from the PDB chemical component dictionary
+    - groupNumber - group number of the group (residue) including insertion code (e.g. 101A)
+    - atomName - atom name
+    - element - element symbol
+    - sasa - solvent accessible surface area in square Angstroms
+
+    Parameters
+    ----------
+    structures : PythonRDD
+       a set of PDB structures
+    level : str
+       'chain', 'group', or 'atom' level to aggregate the surface area ['group']
+    probe_radius : float
+       radius of the solvent probe in Angstroms [1.4]
+    num_points : int
+       number of sphere points per atom [100]
+
+    Returns
+    -------
+    dataset
+       dataset with solvent accessible surface areas
+    '''
+
+    rows = structures.flatMap(StructureToSolventAccessibleSurface(level, probe_radius, num_points))
+
+    spark = SparkSession.builder.getOrCreate()
+    return spark.createDataFrame(rows, _get_schema(level))
+
+
+def _get_schema(level):
+    nullable = False
+
+    fields = [StructField("structureChainId", StringType(), nullable)]
+
+    if level != 'chain':
+        fields.append(StructField("groupName", StringType(), nullable))
+        fields.append(StructField("groupNumber", StringType(), nullable))
+
+        if level == 'atom':
+            fields.append(StructField("atomName", StringType(), nullable))
+            fields.append(StructField("element", StringType(), nullable))
+
+    fields.append(StructField("sasa", FloatType(), nullable))
+
+    return StructType(fields)
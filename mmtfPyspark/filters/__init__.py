@@ -17,3 +17,6 @@ from .releaseDate import ReleaseDate
 from .polymerComposition import PolymerComposition
 from .orFilter import OrFilter
 from .notFilter import NotFilter
+from .filterPipeline import FilterPipeline
+from .representativeChains import RepresentativeChains
+from .localSequenceSimilarity import LocalSequenceSimilarity
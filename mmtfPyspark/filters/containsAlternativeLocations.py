@@ -11,9 +11,14 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
+from mmtfPyspark.filters.filterPipeline import ATOM_SCAN
+
 
 class ContainsAlternativeLocations(object):
 
+    # cost level used by FilterPipeline
+    cost = ATOM_SCAN
+
     def __call__(self, t):
         structure = t[1]
 
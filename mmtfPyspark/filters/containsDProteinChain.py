@@ -16,6 +16,7 @@ __version__ = "0.2.0"
 __status__ = "Done"
 
 from mmtfPyspark.filters import ContainsPolymerChainType
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
 
 
 class ContainsDProteinChain(object):
@@ -32,6 +33,10 @@ class ContainsDProteinChain(object):
        if true, only return entries that are exclusively contain D-protein chains
     '''
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+    index_columns = ContainsPolymerChainType.index_columns
+
     def __init__(self, exclusive=False):
         self.filter = ContainsPolymerChainType([
             ContainsPolymerChainType.D_PEPTIDE_LINKING,
@@ -39,3 +44,6 @@ class ContainsDProteinChain(object):
 
     def __call__(self, t):
         return self.filter(t)
+
+    def filter_index_row(self, row):
+        return self.filter.filter_index_row(row)
@@ -23,6 +23,7 @@ __status__ = "Done"
 
 
 from mmtfPyspark.filters import ContainsPolymerChainType
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
 
 
 class ContainsDSaccharideChain(object):
@@ -41,6 +42,10 @@ class ContainsDSaccharideChain(object):
 
     '''
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+    index_columns = ContainsPolymerChainType.index_columns
+
     def __init__(self, exclusive=False):
         self.filter = ContainsPolymerChainType([
             ContainsPolymerChainType.D_SACCHARIDE,
@@ -51,3 +56,6 @@ class ContainsDSaccharideChain(object):
 
     def __call__(self, t):
         return self.filter(t)
+
+    def filter_index_row(self, row):
+        return self.filter.filter_index_row(row)
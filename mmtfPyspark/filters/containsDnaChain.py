@@ -14,6 +14,7 @@ __version__ = "0.2.0"
 __status__ = "Done"
 
 from mmtfPyspark.filters import ContainsPolymerChainType
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
 
 
 class ContainsDnaChain(object):
@@ -29,8 +30,15 @@ class ContainsDnaChain(object):
        if true, only return entries that contain Dna chains
     '''
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+    index_columns = ContainsPolymerChainType.index_columns
+
     def __init__(self, exclusive=False):
         self.filter = ContainsPolymerChainType(ContainsPolymerChainType.DNA_LINKING, exclusive)
 
     def __call__(self, t):
         return self.filter(t)
+
+    def filter_index_row(self, row):
+        return self.filter.filter_index_row(row)
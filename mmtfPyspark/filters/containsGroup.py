@@ -17,26 +17,68 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
+import re
+import numpy as np
+from mmtfPyspark.filters.filterPipeline import METADATA, GROUP_SCAN
+
 
 class ContainsGroup(object):
-    '''Returns entries that contain at least one of the specified groups
+    '''Returns entries that contain at least one of the specified groups.
+
+    If a group name index (see :mod:`groupNameIndex <mmtfPyspark.datasets.groupNameIndex>`)
+    is specified, the filter only checks the structure id (e.g. PDB ID) of an
+    entry. It does not read any fields of the structure and can be evaluated
+    before a structure is decoded (see FilterPipeline). Chains and
+    bioassemblies (e.g. "4HHB.A", "4HHB-BioAssembly1") of the indexed
+    entries are still checked for the groups.
 
     Attributes
     ----------
     groupQuery : list
        list of group names
+    index : dataset, optional
+       group name index
     '''
 
-    def __init__(self, *args):
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+
+    # metadata index columns read by filter_index_row
+    index_columns = ['groupNames']
+
+    def __init__(self, *args, index=None):
         groups = [a for a in args]
         self.groupQuery = set(groups)
+        self.structureIds = None
 
-    def __call__(self, t):
-        groups = [t[1].group_list[idx]['groupName']
-                  for idx in t[1].group_type_list]
+        if index is not None:
+            from mmtfPyspark.datasets import groupNameIndex
+            self.structureIds = set(groupNameIndex.get_ids(index, groups))
 
-        for group in self.groupQuery:
-            if group in groups:
+            # the structure id is available without decoding the structure
+            self.fields = []
+            self.cost = METADATA
+
+    def filter_index_row(self, row):
+        '''Evaluates the filter on a row of a metadata index (see metadataIndex)'''
+        return not self.groupQuery.isdisjoint(row.groupNames)
+
+    def __call__(self, t):
+        if self.structureIds is not None:
+            # structure id of a chain or bioassembly key
+            structure_id = re.split('[.:-]', t[0], maxsplit=1)[0]
+            if structure_id not in self.structureIds:
+                return False
+            if t[0] == structure_id:
                 return True
 
-        return False
+        structure = t[1]
+
+        # group types with matching names, the group list is much
+        # smaller than the list of groups
+        group_types = [i for i, group in enumerate(structure.group_list)
+                       if group['groupName'] in self.groupQuery]
+        if len(group_types) == 0:
+            return False
+
+        return bool(np.isin(structure.group_type_list, group_types).any())
@@ -15,6 +15,7 @@ __version__ = "0.2.0"
 __status__ = "Done"
 
 from mmtfPyspark.filters import ContainsPolymerChainType
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
 
 
 class ContainsLProteinChain(object):
@@ -31,6 +32,10 @@ class ContainsLProteinChain(object):
        if true, only return entries that are exclusively contain L-protein chains
     '''
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+    index_columns = ContainsPolymerChainType.index_columns
+
     def __init__(self, exclusive=False):
         self.filter = ContainsPolymerChainType([
             ContainsPolymerChainType.L_PEPTIDE_LINKING,
@@ -38,3 +43,6 @@ class ContainsLProteinChain(object):
 
     def __call__(self, t):
         return self.filter(t)
+
+    def filter_index_row(self, row):
+        return self.filter.filter_index_row(row)
@@ -14,6 +14,9 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
+from mmtfPyspark.utils import ChainSummary, IndexChainSummary
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
+
 
 class ContainsPolymerChainType(object):
     '''Default constructor matches any entry that contains a chain with only
@@ -49,6 +52,12 @@ class ContainsPolymerChainType(object):
     OTHER = "OTHER"
     SACCHARIDE = "SACCHARIDE"
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+
+    # metadata index columns read by filter_index_row
+    index_columns = IndexChainSummary.INDEX_COLUMNS
+
     def __init__(self, monomer_type, exclusive=False):
         if type(monomer_type) == str:
             monomer_type = monomer_type.split(',')
@@ -57,38 +66,13 @@ class ContainsPolymerChainType(object):
         self.monomer_type = monomer_type
 
     def __call__(self, t):
-        structure = t[1]
-        contains_polymer = False
-        global_match = False
-        # get number of chains in first model, nessary?
-        num_chains = structure.chains_per_model[0]
-        group_counter = 0
-
-        for i in range(num_chains):
-            match = True
-            chain_type = [chain['type'] for chain in structure.entity_list
-                          if i in chain['chainIndexList']][0]
-            polymer = chain_type == "polymer"
-
-            if polymer:
-                contains_polymer = True
-            else:
-                match = False
-
-            for j in range(structure.groups_per_chain[i]):
-                if match and polymer:
-                    group_idx = structure.group_type_list[group_counter]
-                    group_type = structure.group_list[group_idx]['chemCompType']
-                    match = (group_type in self.monomer_type)
-                group_counter += 1
-
-            if (polymer and match and not self.exclusive):
-                return True
-
-            if (polymer and not match and self.exclusive):
-                return False
-
-            if match:
-                global_match = True
-
-        return global_match and contains_polymer
+        return self._matches(ChainSummary(t[1]))
+
+    def filter_index_row(self, row):
+        '''Evaluates the filter on a row of a metadata index (see metadataIndex)'''
+        return self._matches(IndexChainSummary(row))
+
+    def _matches(self, summary):
+        match = summary.all_groups_in('chemCompType', self.monomer_type)
+
+        return summary.any_polymer_chain(match, self.exclusive)
@@ -13,6 +13,7 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 from mmtfPyspark.filters import ContainsPolymerChainType
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
 
 
 class ContainsRnaChain(object):
@@ -29,9 +30,16 @@ class ContainsRnaChain(object):
        if true, only return entries that contain RNA chains
     '''
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+    index_columns = ContainsPolymerChainType.index_columns
+
     def __init__(self, exclusive=False):
         self.filter = ContainsPolymerChainType(
             ContainsPolymerChainType.RNA_LINKING, exclusive)
 
     def __call__(self, t):
         return self.filter(t)
+
+    def filter_index_row(self, row):
+        return self.filter.filter_index_row(row)
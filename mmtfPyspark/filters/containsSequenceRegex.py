@@ -50,28 +50,51 @@ __version__ = "0.2.0"
 __status__ = "Done"
 
 import re
+from mmtfPyspark.filters.filterPipeline import METADATA, ENTITY_SCAN
 
 
 class ContainsSequenceRegex(object):
     '''This filter returns true if the polymer sequence motif matches the
     specified regular expression.
 
+    If a sequence motif index (see :mod:`sequenceMotifIndex <mmtfPyspark.datasets.sequenceMotifIndex>`)
+    is specified, the matching entries are looked up in the index and the
+    filter only checks the structure id (e.g. PDB ID) of an entry. It can be
+    evaluated before a structure is decoded (see FilterPipeline).
+
     Attributes
     ----------
     regularExpression : str
        The regular expression of protein sequence
+    index : tuple, optional
+       sequence motif index
     '''
 
-    def __init__(self, regularExpression):
+    # cost level used by FilterPipeline
+    cost = ENTITY_SCAN
+
+    def __init__(self, regularExpression, index=None):
         self.regex = regularExpression
+        self.pattern = re.compile(regularExpression)
+        self.structureIds = None
+
+        if index is not None:
+            from mmtfPyspark.datasets import sequenceMotifIndex
+            self.structureIds = set(sequenceMotifIndex.get_ids(index, regularExpression))
+
+            # the structure id is available without decoding the structure
+            self.fields = []
+            self.cost = METADATA
 
     def __call__(self, t):
+        if self.structureIds is not None:
+            return t[0] in self.structureIds
+
         structure = t[1]
-        entity_list = [b['sequence'] for b in structure.entity_list]
 
         # This filter passes only single chains and the sequence cannot be empty
-        for entity in entity_list:
-            if len(entity) > 0:
-                if len(re.findall(self.regex, entity)) > 0:
-                    return True
+        for entity in structure.entity_list:
+            sequence = entity['sequence']
+            if len(sequence) > 0 and self.pattern.search(sequence) is not None:
+                return True
         return False
@@ -16,6 +16,9 @@ from dateutil.parser import parse
 
 class DepositionDate(object):
 
+    # fields read by this filter, used to evaluate it before a full decode
+    fields = ['deposition_date']
+
     def __init__(self, startdate, enddate):
         '''This filter return True if the deposition date of this structure is
         within the specified range
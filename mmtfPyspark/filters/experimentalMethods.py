@@ -41,6 +41,9 @@ class ExperimentalMethods(object):
     THEORETICAL_MODEL = "THEORETICAL MODEL"
     X_RAY_DIFFRACTION = "X-RAY DIFFRACTION"
 
+    # fields read by this filter, used to evaluate it before a full decode
+    fields = ['experimental_methods']
+
     def __init__(self, *experimentalMethods):
         self.experimental_methods = experimentalMethods
 
@@ -0,0 +1,285 @@
+#!/user/bin/env python
+'''filterPipeline.py
+
+This filter combines a set of filters and returns true if all filters pass.
+The filters are evaluated in the order of their cost and the evaluation stops
+at the first filter that fails. The cost of a filter is given by its cost
+attribute (METADATA < ENTITY_SCAN < GROUP_SCAN < ATOM_SCAN). Filters that
+only read metadata fields have metadata cost, filters without a cost
+attribute are assumed to scan atoms. Within a cost level, the filters can be
+ordered by their observed cost and selectivity, sampled on the first
+partitions of an RDD (see FilterPipeline.apply).
+
+Filters that declare the fields they read (e.g. Resolution declares
+fields = ['resolution']) and only read metadata fields can be evaluated on
+a partially decoded record by the MMTF readers, so that only the structures
+that pass these filters are fully decoded. Filters without field declarations
+are evaluated on the fully decoded structure.
+
+Examples
+--------
+Apply a pipeline while reading, only structures with a resolution better
+than 2.0 A are fully decoded:
+
+>>> pipeline = FilterPipeline().filter(Resolution(0.0, 2.0)) \\
+...                            .filter(ContainsLProteinChain())
+>>> pdb = mmtfReader.read_mmtf_files(path, filters=pipeline)
+
+Apply a pipeline to decoded structures, order the filters by the pass rates
+sampled on the first partition, and report the pass rates and time spent:
+
+>>> pipeline = FilterPipeline(ContainsSequenceRegex("N[^P][ST]"), ContainsLProteinChain())
+>>> pdb = pipeline.apply(pdb)
+>>> pdb.count()
+>>> pipeline.get_statistics()
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import time
+import numpy as np
+import pandas as pd
+from pyspark.accumulators import AccumulatorParam
+from mmtfPyspark.utils import MmtfStructure, MmtfMetadata
+from mmtfPyspark.utils.mmtfMetadata import is_metadata_filter
+
+# cost levels of filters
+METADATA = 0
+ENTITY_SCAN = 1
+GROUP_SCAN = 2
+ATOM_SCAN = 3
+
+
+def get_cost(filter_function):
+    '''Returns the cost level of a filter
+
+    Parameters
+    ----------
+    filter_function : filter
+       filter with an optional cost attribute
+
+    Returns
+    -------
+    int
+       METADATA, ENTITY_SCAN, GROUP_SCAN, or ATOM_SCAN
+    '''
+    cost = getattr(filter_function, 'cost', None)
+    if cost is not None:
+        return cost
+    elif is_metadata_filter(filter_function):
+        return METADATA
+    else:
+        return ATOM_SCAN
+
+
+class FilterPipeline(object):
+    '''Constructor takes an optional list of filters
+
+    Attributes
+    ----------
+    filters : list
+       filters that are applied in the order of their cost
+    '''
+
+    def __init__(self, *filters):
+        self.filters = []
+        self.order = []
+        self.statistics = np.zeros((0, 3))
+        self._accumulator = None
+
+        for f in filters:
+            self.filter(f)
+
+    def filter(self, filter_function):
+        '''Adds a filter to the pipeline
+
+        Parameters
+        ----------
+        filter_function : filter
+           filter that takes a (structureId, structure) tuple
+
+        Returns
+        -------
+        FilterPipeline
+           this pipeline
+        '''
+        self.filters.append(filter_function)
+        self.order = sorted(range(len(self.filters)), key=lambda i: (get_cost(self.filters[i]), i))
+
+        # number of evaluations, number of passes, and time spent per filter
+        self.statistics = np.zeros((len(self.filters), 3))
+        self._accumulator = None
+
+        return self
+
+    def get_metadata_fields(self):
+        '''Returns the metadata fields read by the metadata filters of this pipeline'''
+        fields = []
+        for f in self.filters:
+            if is_metadata_filter(f):
+                fields += [field for field in f.fields if field not in fields]
+
+        return fields
+
+    def calibrate(self, rdd, num_partitions=1):
+        '''Orders filters of the same cost level by their observed cost per
+        rejected structure. All filters are evaluated on the structures in the
+        first partitions of an RDD.
+
+        Parameters
+        ----------
+        rdd : PythonRDD
+           (structureId, structure) pairs
+        num_partitions : int
+           number of partitions to sample
+
+        Returns
+        -------
+        FilterPipeline
+           this pipeline
+        '''
+        filters = self.filters
+
+        def sample(iterator):
+            statistics = np.zeros((len(filters), 3))
+            for t in iterator:
+                for i, f in enumerate(filters):
+                    start = time.time()
+                    passed = bool(f(t))
+                    statistics[i] += (1, passed, time.time() - start)
+
+            yield statistics
+
+        partitions = list(range(min(num_partitions, rdd.getNumPartitions())))
+        statistics = np.sum(rdd.context.runJob(rdd, sample, partitions), axis=0)
+
+        # expected time spent per rejected structure
+        evaluated = np.maximum(statistics[:, 0], 1)
+        rejection_rate = np.maximum(1.0 - statistics[:, 1] / evaluated, 1e-6)
+        rank = statistics[:, 2] / evaluated / rejection_rate
+
+        self.order = sorted(range(len(filters)), key=lambda i: (get_cost(filters[i]), rank[i]))
+
+        return self
+
+    def apply(self, rdd, sample_partitions=1):
+        '''Applies the pipeline to an RDD and collects the number of
+        evaluations, passes, and the time spent per filter, see
+        :func:`get_statistics() <mmtfPyspark.filters.FilterPipeline.get_statistics>`.
+
+        Parameters
+        ----------
+        rdd : PythonRDD
+           (structureId, structure) pairs
+        sample_partitions : int
+           number of partitions used to calibrate the order of the filters,
+           the filters are not calibrated if 0
+
+        Returns
+        -------
+        PythonRDD
+           (structureId, structure) pairs that pass all filters
+        '''
+        if sample_partitions > 0:
+            self.calibrate(rdd, sample_partitions)
+
+        self._accumulator = rdd.context.accumulator(np.zeros((len(self.filters), 3)),
+                                                    _StatisticsAccumulatorParam())
+
+        return rdd.mapPartitions(self._filter_partition, preservesPartitioning=True)
+
+    def get_statistics(self):
+        '''Returns the number of evaluations, passes, pass rate, and the time
+        spent in seconds per filter, in the order of evaluation. For a pipeline
+        applied with :func:`apply() <mmtfPyspark.filters.FilterPipeline.apply>`,
+        the statistics are collected once the RDD has been evaluated.
+
+        Returns
+        -------
+        DataFrame
+           pandas DataFrame with one row per filter
+        '''
+        if self._accumulator is not None:
+            statistics = self._accumulator.value
+        else:
+            statistics = self.statistics
+
+        rows = []
+        for i in self.order:
+            evaluated, passed, seconds = statistics[i]
+            rows.append((type(self.filters[i]).__name__, get_cost(self.filters[i]),
+                         int(evaluated), int(passed),
+                         passed / evaluated if evaluated > 0 else None, seconds))
+
+        return pd.DataFrame(rows, columns=['filter', 'cost', 'evaluated', 'passed', 'passRate', 'time'])
+
+    def decode(self, structure_id, input_data, first_model=False):
+        '''Applies the metadata filters to a partially decoded record and
+        decodes the record only if it passes them. The remaining filters are
+        applied to the decoded structure.
+
+        Parameters
+        ----------
+        structure_id : str
+           structure id, e.g., PDB ID
+        input_data : dict
+           msgpack unpacked MMTF data
+        first_model : bool
+           if true, only decode the first model
+
+        Returns
+        -------
+        tuple
+           (structureId, MmtfStructure) if all filters pass, otherwise None
+        '''
+        metadata_filters = [i for i in self.order if is_metadata_filter(self.filters[i])]
+        other_filters = [i for i in self.order if i not in metadata_filters]
+
+        if len(metadata_filters) > 0:
+            metadata = (structure_id, MmtfMetadata(input_data, self.get_metadata_fields()))
+            if not self._evaluate(metadata, metadata_filters, self.statistics):
+                return None
+
+        t = (structure_id, MmtfStructure(input_data, first_model))
+        if not self._evaluate(t, other_filters, self.statistics):
+            return None
+
+        return t
+
+    def _evaluate(self, t, indices, statistics):
+        '''Evaluates filters until the first filter fails'''
+        for i in indices:
+            start = time.time()
+            passed = bool(self.filters[i](t))
+            statistics[i] += (1, passed, time.time() - start)
+
+            if not passed:
+                return False
+
+        return True
+
+    def _filter_partition(self, iterator):
+        statistics = np.zeros((len(self.filters), 3))
+        try:
+            for t in iterator:
+                if self._evaluate(t, self.order, statistics):
+                    yield t
+        finally:
+            if self._accumulator is not None:
+                self._accumulator.add(statistics)
+
+    def __call__(self, t):
+        return self._evaluate(t, self.order, self.statistics)
+
+
+class _StatisticsAccumulatorParam(AccumulatorParam):
+    '''Adds up the filter statistics of the partitions'''
+
+    def zero(self, value):
+        return np.zeros_like(value)
+
+    def addInPlace(self, value1, value2):
+        value1 += value2
+        return value1
@@ -0,0 +1,51 @@
+#!/user/bin/env python
+'''localSequenceSimilarity.py
+
+This filter passes through PDB structures or polymer chains with a sequence
+that is similar to a query sequence. Unlike the SequenceSimilarity
+webfilter, the sequences are searched locally with a BLAST-like search of
+the unique entity sequences of a set of PDB structures (see
+:mod:`sequenceSimilaritySearch <mmtfPyspark.datasets.sequenceSimilaritySearch>`).
+
+Examples
+--------
+Find the chains that are similar to a query sequence:
+
+>>> pdb = mmtfReader.read_full_sequence_file()
+>>> sequences = sequenceMotifIndex.get_dataset(pdb)
+>>> similar = LocalSequenceSimilarity(sequences, "NLVQFGVMIEKMTGKSALQYNDYGCYCGIGGSHWPVDQ",
+...                                   eValueCutoff=0.001, sequenceIdentityCutoff=40)
+>>> chains = pdb.flatMap(StructureToPolymerChains()).filter(similar)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+from mmtfPyspark.webfilters.broadcastIdSet import BroadcastIdSet, BroadcastIdFilter
+
+
+class LocalSequenceSimilarity(BroadcastIdFilter):
+    '''Filters PDB structures and polymer chains by sequence similarity
+    with a local sequence search
+
+    Attributes
+    ----------
+    sequences : dataset
+       unique sequences that are searched, see sequenceMotifIndex
+    sequence : str or dict
+       query sequence, or dictionary of queryId -> query sequence
+    eValueCutoff : float
+       maximum E value
+    sequenceIdentityCutoff : int
+       minimum sequence identity in percent
+    '''
+
+    def __init__(self, sequences, sequence, eValueCutoff=10.0, sequenceIdentityCutoff=0, **kwargs):
+        from mmtfPyspark.datasets import sequenceSimilaritySearch
+
+        chains = sequenceSimilaritySearch.get_chain_ids(sequences, sequence, eValueCutoff,
+                                                        sequenceIdentityCutoff, **kwargs)
+
+        # chain ids, shipped once per executor
+        self.idSet = BroadcastIdSet(chains)
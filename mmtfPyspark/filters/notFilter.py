@@ -10,6 +10,8 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "done"
 
+from mmtfPyspark.filters.filterPipeline import get_cost
+
 
 class NotFilter(object):
     '''Constructor takes another filter as input
@@ -25,5 +27,16 @@ class NotFilter(object):
     def __init__(self, filter_function):
         self.filter = filter_function
 
+    @property
+    def fields(self):
+        '''Fields read by the wrapped filter, or None if the wrapped filter
+        does not declare its fields'''
+        return getattr(self.filter, 'fields', None)
+
+    @property
+    def cost(self):
+        '''Cost level of the wrapped filter'''
+        return get_cost(self.filter)
+
     def __call__(self, t):
         return not self.filter(t)
@@ -10,6 +10,8 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "done"
 
+from mmtfPyspark.filters.filterPipeline import get_cost
+
 
 class OrFilter(object):
     '''Constructor takes another filter as input
@@ -26,5 +28,21 @@ class OrFilter(object):
         self.filter1 = filter1
         self.filter2 = filter2
 
+    @property
+    def fields(self):
+        '''Fields read by the wrapped filters, or None if a wrapped filter
+        does not declare its fields'''
+        fields1 = getattr(self.filter1, 'fields', None)
+        fields2 = getattr(self.filter2, 'fields', None)
+        if fields1 is None or fields2 is None:
+            return None
+
+        return list(fields1) + [f for f in fields2 if f not in fields1]
+
+    @property
+    def cost(self):
+        '''Cost level of the most expensive wrapped filter'''
+        return max(get_cost(self.filter1), get_cost(self.filter2))
+
     def __call__(self, t):
         return self.filter1(t) or self.filter2(t)
@@ -11,6 +11,9 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "done"
 
+from mmtfPyspark.utils import ChainSummary, IndexChainSummary
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
+
 
 class PolymerComposition(object):
     '''The default constructor returns entries that contain at least
@@ -37,6 +40,12 @@ class PolymerComposition(object):
     DNA_STD_NUCLEOTIDES = ["DA", "DC", "DG", "DT"]
     RNA_STD_NUCLEOTIDES = ["A", "C", "G", "U"]
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+
+    # metadata index columns read by filter_index_row
+    index_columns = IndexChainSummary.INDEX_COLUMNS
+
     def __init__(self, monomer_type, exclusive=False):
         if type(monomer_type) == str:
             monomer_type = monomer_type.split(",")
@@ -45,40 +54,13 @@ class PolymerComposition(object):
         self.residues = monomer_type
 
     def __call__(self, t):
-        structure = t[1]
-        contains_polymer = False
-        global_match = False
-        # get number of chains in first model, nessary?
-        num_chains = structure.chains_per_model[0]
-        # chain types in entity as key, enetity from entity_list
-        group_counter = 0
-
-        for i in range(num_chains):
-            match = True
-            chain_type = [chain['type'] for chain in structure.entity_list
-                          if i in chain['chainIndexList']][0]
-            polymer = chain_type == "polymer"
-
-            if polymer:
-                contains_polymer = True
-            else:
-                match = False
-            # group_type_list
-
-            for j in range(structure.groups_per_chain[i]):
-                if match and polymer:
-                    group_idx = structure.group_type_list[group_counter]
-                    group_type = structure.group_list[group_idx]['groupName']
-                    match = (group_type in self.residues)
-                group_counter += 1
-
-            if (polymer and match and not self.exclusive):
-                return True
-
-            if (polymer and not match and self.exclusive):
-                return False
-
-            if match:
-                global_match = True
-
-        return global_match and contains_polymer
+        return self._matches(ChainSummary(t[1]))
+
+    def filter_index_row(self, row):
+        '''Evaluates the filter on a row of a metadata index (see metadataIndex)'''
+        return self._matches(IndexChainSummary(row))
+
+    def _matches(self, summary):
+        match = summary.all_groups_in('groupName', self.residues)
+
+        return summary.any_polymer_chain(match, self.exclusive)
@@ -28,6 +28,9 @@ class RFree(object):
        The upper bound r_free value
     '''
 
+    # fields read by this filter, used to evaluate it before a full decode
+    fields = ['r_free']
+
     def __init__(self, minRfree, maxRfree):
         self.min_Rfree = minRfree
         self.max_Rfree = maxRfree
@@ -24,6 +24,9 @@ class RWork(object):
        The upper bound r_work value
     '''
 
+    # fields read by this filter, used to evaluate it before a full decode
+    fields = ['r_work']
+
     def __init__(self, minRwork, maxRwork):
         self.min_Rwork = minRwork
         self.max_Rwork = maxRwork
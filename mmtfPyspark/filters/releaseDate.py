@@ -16,6 +16,9 @@ from dateutil.parser import parse
 
 class ReleaseDate(object):
 
+    # fields read by this filter, used to evaluate it before a full decode
+    fields = ['release_date']
+
     def __init__(self, startDate, endDate):
         '''This filter retuns true if the release date for the structure is
         within the specified range.
@@ -0,0 +1,45 @@
+#!/user/bin/env python
+'''representativeChains.py
+
+This filter passes through representative structures or protein chains of
+sequence clusters calculated locally from a set of PDB structures, without
+downloading precomputed BlastClust clusters or PISCES culled sets (see
+:mod:`sequenceClusters <mmtfPyspark.datasets.sequenceClusters>`). The
+representative of a cluster is its longest sequence, with the chain of the
+best resolution.
+
+Examples
+--------
+Find representative chains at 90% sequence identity:
+
+>>> pdb = mmtfReader.read_full_sequence_file()
+>>> representatives = RepresentativeChains(pdb, sequenceIdentity=90)
+>>> chains = pdb.flatMap(StructureToPolymerChains()).filter(representatives)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+from mmtfPyspark.webfilters.broadcastIdSet import BroadcastIdSet, BroadcastIdFilter
+
+
+class RepresentativeChains(BroadcastIdFilter):
+    '''Filters representative PDB structures and polymer chains of locally
+    calculated sequence clusters
+
+    Attributes
+    ----------
+    structures : PythonRDD
+       structures that are clustered
+    sequenceIdentity : int
+       sequence identity threshold in percent
+    '''
+
+    def __init__(self, structures, sequenceIdentity=90, **kwargs):
+        from mmtfPyspark.datasets import sequenceClusters
+
+        chains = sequenceClusters.get_representative_chains(structures, sequenceIdentity, **kwargs)
+
+        # chain ids, shipped once per executor
+        self.idSet = BroadcastIdSet(chains)
@@ -28,6 +28,9 @@ class Resolution(object):
        The upper bound resolution
 
     '''
+    # fields read by this filter, used to evaluate it before a full decode
+    fields = ['resolution']
+
     def __init__(self, minResolution, maxResolution):
         self.min_Resolution = minResolution
         self.max_Resolution = maxResolution
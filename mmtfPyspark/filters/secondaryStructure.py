@@ -13,7 +13,8 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
-from mmtfPyspark.utils import DsspSecondaryStructure
+from mmtfPyspark.utils import ChainSummary, IndexChainSummary
+from mmtfPyspark.filters.filterPipeline import GROUP_SCAN
 
 
 class SecondaryStructure(object):
@@ -40,6 +41,12 @@ class SecondaryStructure(object):
        exclusive flag [False]
     '''
 
+    # cost level used by FilterPipeline
+    cost = GROUP_SCAN
+
+    # metadata index columns read by filter_index_row
+    index_columns = IndexChainSummary.INDEX_COLUMNS
+
     def __init__(self, helixFractionMin=0.0, helixFractionMax=1.0,
                  sheetFractionMin=0.0, sheetFractionMax=1.0,
                  coilFractionMin=0.0, coilFractionMax=1.0, exclusive=False):
@@ -53,67 +60,17 @@ class SecondaryStructure(object):
         self.exclusive = exclusive
 
     def __call__(self, t):
-        structure = t[1]
-        contains_polymer = False
-        global_match = False
-        num_chains = structure.chains_per_model[0]
-        sec_struct = structure.sec_struct_list
-        group_counter = 0
-
-        for i in range(num_chains):
-            helix = 0.0
-            sheet = 0.0
-            coil = 0.0
-            other = 0.0
-            match = True
-
-            chain_type = [chain['type'] for chain in structure.entity_list
-                          if i in chain['chainIndexList']][0]
-            polymer = chain_type == 'polymer'
-
-            if polymer:
-                contains_polymer = True
-            else:
-                match = False
-
-            for j in range(structure.groups_per_chain[i]):
-
-                if match and polymer:
-                    code = sec_struct[group_counter]
-                    secondary_structure = DsspSecondaryStructure.get_q3_code(
-                        code)
-
-                    if secondary_structure == DsspSecondaryStructure.ALPHA_HELIX:
-                        helix += 1
-                    elif secondary_structure == DsspSecondaryStructure.EXTENDED:
-                        sheet += 1
-                    elif secondary_structure == DsspSecondaryStructure.COIL:
-                        coil += 1
-                    else:
-                        other += 1
-
-                group_counter += 1
-
-            if match and polymer:
-                n = structure.groups_per_chain[i] - other
-                helix /= n
-                sheet /= n
-                coil /= n
-
-                match = helix >= self.helixFractionMin and \
-                    helix <= self.helixFractionMax and \
-                    sheet >= self.sheetFractionMin and \
-                    sheet <= self.sheetFractionMax and \
-                    coil >= self.coilFractionMin and \
-                    coil <= self.coilFractionMax
+        return self._matches(ChainSummary(t[1]))
 
-            if (polymer and match and not self.exclusive):
-                return True
+    def filter_index_row(self, row):
+        '''Evaluates the filter on a row of a metadata index (see metadataIndex)'''
+        return self._matches(IndexChainSummary(row))
 
-            if (polymer and not match and self.exclusive):
-                return False
+    def _matches(self, summary):
+        helix, sheet, coil = summary.get_q3_fractions().T
 
-            if match:
-                global_match = True
+        match = (helix >= self.helixFractionMin) & (helix <= self.helixFractionMax) & \
+                (sheet >= self.sheetFractionMin) & (sheet <= self.sheetFractionMax) & \
+                (coil >= self.coilFractionMin) & (coil <= self.coilFractionMax)
 
-        return global_match and contains_polymer
+        return summary.any_polymer_chain(match, self.exclusive)
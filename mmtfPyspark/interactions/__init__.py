@@ -1,8 +1,11 @@
+from .compiledInteractionFilter import CompiledInteractionFilter
 from .interactionFilter import InteractionFilter
 from .interaction_extractor import InteractionExtractor
+from .polarInteractionExtractor import PolarInteractionExtractor
 from .interaction_extractor_pd import InteractionExtractorPd
+from .interactionCache import InteractionCache
 from .interactionCenter import InteractionCenter
-from .coordinationGeometry import CoordinateGeometry
+from .coordinationGeometry import CoordinateGeometry, BatchCoordinateGeometry
 from .atomInteraction import AtomInteraction
 from .structureToAtomInteractions import StructureToAtomInteractions
 from .groupInteractionExtractor import GroupInteractionExtractor
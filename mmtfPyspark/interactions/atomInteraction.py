@@ -15,7 +15,7 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "done"
 
-from mmtfPyspark.interactions import CoordinateGeometry, InteractionCenter
+from mmtfPyspark.interactions import BatchCoordinateGeometry, InteractionCenter
 from pyspark.sql import Row
 from pyspark.sql.types import *
 import numpy as np
@@ -128,33 +128,47 @@ class AtomInteraction(object):
            maximum number of interaction
 
         '''
-        neighborPoints = [n.get_coordinates() for n in self.neighbors
-                          if n.get_coordinates() is not None]
-
-        geom = CoordinateGeometry(
-            self.center.get_coordinates(), neighborPoints)
-
-        # calculate distances to the central atom
-        #self.distances = np.empty(maxInteraction)
-        self.distances = [0.0] * maxInteraction
-        for i, dist in enumerate(geom.get_distance()):
-            self.distances[i] = dist
-
-        # calculate angles among all interacting atoms with the central atom
-        numInteraction = int(maxInteraction * (maxInteraction - 1) / 2)
-        ang = geom.get_angles()
-        self.angles = [np.NaN] * numInteraction
-        self.angles[:len(ang[:numInteraction])] = ang[:numInteraction]
-
-        # TODO: points or neighbor points
-        if len(neighborPoints) > 2:
-            self.q3 = geom.q3()
-        if len(neighborPoints) > 3:
-            self.q4 = geom.q4()
-        if len(neighborPoints) > 4:
-            self.q5 = geom.q5()
-        if len(neighborPoints) > 5:
-            self.q6 = geom.q6()
+        AtomInteraction.calc_coordination_geometries([self], maxInteraction)
+
+    @staticmethod
+    def calc_coordination_geometries(interactions, maxInteraction):
+        '''Calculates geometric properties of the coordination spheres of
+        a list of atom interactions in a single batch.
+
+        Parameters
+        ----------
+        interactions : list
+           list of AtomInteraction
+        maxInteraction : int
+           maximum number of interaction
+
+        '''
+        if len(interactions) == 0:
+            return
+
+        # pack center and neighbor coordinates into padded arrays
+        centers = np.empty((len(interactions), 3))
+        neighbors = np.full((len(interactions), maxInteraction, 3), np.nan)
+
+        for i, interaction in enumerate(interactions):
+            centers[i] = interaction.center.get_coordinates()
+            points = [n.get_coordinates() for n in interaction.neighbors
+                      if n.get_coordinates() is not None]
+            if len(points) > 0:
+                neighbors[i, :len(points)] = np.array(points)[:maxInteraction]
+
+        geom = BatchCoordinateGeometry(centers, neighbors)
+
+        distances = np.nan_to_num(geom.get_distances()).tolist()
+        angles = geom.get_angles().tolist()
+        q = [geom.q3(), geom.q4(), geom.q5(), geom.q6()]
+        q = [[None if np.isnan(v) else float(v) for v in values] for values in q]
+
+        for i, interaction in enumerate(interactions):
+            interaction.distances = distances[i]
+            interaction.angles = angles[i]
+            interaction.q3, interaction.q4, interaction.q5, interaction.q6 = \
+                q[0][i], q[1][i], q[2][i], q[3][i]
 
     def get_multiple_interactions_as_row(self, maxInteractions):
         '''Returns interactions and geometric information in a single row
@@ -170,7 +184,9 @@ class AtomInteraction(object):
 
         self.length = InteractionCenter.get_length()
 
-        self.calc_coordination_geometry(maxInteractions)
+        # the geometry may have been calculated in a batch
+        if self.distances is None:
+            self.calc_coordination_geometry(maxInteractions)
 
         data = [self.structureId, self._get_number_of_polymer_chains(),
                 self.q3, self.q4, self.q5, self.q6]
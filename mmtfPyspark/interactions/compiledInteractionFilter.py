@@ -0,0 +1,151 @@
+#!/user/bin/env python
+'''compiledInteractionFilter.py
+
+An InteractionFilter that has been evaluated against the group list of a
+structure. The group list contains each unique group type (residue template)
+only once, therefore the filter criteria are evaluated once per group type
+and once per atom slot of a group type. Masks for the atoms of the structure
+are then obtained by a single lookup through the group type list.
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import numpy as np
+
+
+class CompiledInteractionFilter(object):
+    '''Query and target criteria of an InteractionFilter compiled for a
+    specific structure
+
+    Attributes
+    ----------
+    interaction_filter : InteractionFilter
+       interaction criteria
+    structure : MmtfStructure
+       structure to compile the filter for
+    first_model_only : bool
+       compile the filter only for the atoms of the first model [True]
+    '''
+
+    def __init__(self, interaction_filter, structure, first_model_only=True):
+        self.interaction_filter = interaction_filter
+        group_list = structure.group_list
+
+        # evaluate group criteria once per group type
+        group_names = np.array([group['groupName'] for group in group_list], dtype=np.object_)
+        query_types = interaction_filter.is_query_group_np(group_names)
+        target_types = interaction_filter.is_target_group_np(group_names)
+        prohibited_types = np.array([interaction_filter.is_prohibited_target_group(name)
+                                     for name in group_names], dtype=bool)
+
+        # evaluate atom criteria once per atom slot of each group type
+        atom_names, elements, slot_types = [], [], []
+        for i, group in enumerate(group_list):
+            atom_names += group['atomNameList']
+            elements += group['elementList']
+            slot_types += [i] * len(group['atomNameList'])
+
+        atom_names = np.array(atom_names, dtype=np.object_)
+        elements = np.array(elements, dtype=np.object_)
+        slot_types = np.array(slot_types, dtype=np.int64)
+
+        self.query_slots = query_types[slot_types] \
+            & interaction_filter.is_query_element_np(elements) \
+            & interaction_filter.is_query_atom_name_np(atom_names)
+        self.target_slots = target_types[slot_types] \
+            & interaction_filter.is_target_element_np(elements) \
+            & interaction_filter.is_target_atom_name_np(atom_names)
+        self.prohibited_slots = prohibited_types[slot_types]
+
+        self.query_group_types = query_types
+        self.target_group_types = target_types
+        self.prohibited_group_types = prohibited_types
+
+        # map each atom onto its slot in the flattened group list
+        if first_model_only:
+            num_chains = structure.chains_per_model[0]
+        else:
+            num_chains = sum(structure.chains_per_model)
+        num_groups = int(np.sum(structure.groups_per_chain[:num_chains]))
+
+        atoms_per_type = np.array([len(group['atomNameList']) for group in group_list], dtype=np.int64)
+        type_offsets = np.cumsum(atoms_per_type) - atoms_per_type
+
+        self.group_types = np.asarray(structure.group_type_list[:num_groups], dtype=np.int64)
+        atoms_per_group = atoms_per_type[self.group_types]
+        group_offsets = np.cumsum(atoms_per_group) - atoms_per_group
+
+        self.num_atoms = int(atoms_per_group.sum())
+        self.atom_slots = np.repeat(type_offsets[self.group_types] - group_offsets, atoms_per_group) \
+            + np.arange(self.num_atoms)
+
+        # atom slots of group types that occur in the selected models
+        used_types = np.zeros(len(group_list), dtype=bool)
+        used_types[self.group_types] = True
+        self.used_slots = used_types[slot_types]
+
+    def get_query_atoms(self):
+        '''Returns a mask of the atoms that match the query criteria
+        (group, element, and atom name).
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           boolean mask of query atoms
+        '''
+        return self.query_slots[self.atom_slots]
+
+    def get_target_atoms(self):
+        '''Returns a mask of the atoms that match the target criteria
+        (group, element, and atom name).
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           boolean mask of target atoms
+        '''
+        return self.target_slots[self.atom_slots]
+
+    def get_prohibited_target_atoms(self):
+        '''Returns a mask of the atoms in prohibited target groups.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           boolean mask of atoms in prohibited groups
+        '''
+        return self.prohibited_slots[self.atom_slots]
+
+    def get_query_groups(self):
+        '''Returns a mask of the groups that match the query group criteria.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           boolean mask of query groups
+        '''
+        return self.query_group_types[self.group_types]
+
+    def get_target_groups(self):
+        '''Returns a mask of the groups that match the target group criteria.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           boolean mask of target groups
+        '''
+        return self.target_group_types[self.group_types]
+
+    def has_query_atoms(self):
+        '''Returns True if any group type used in the structure contains a
+        query atom. This check does not require any per-atom work.
+        '''
+        return bool(np.any(self.query_slots & self.used_slots))
+
+    def has_target_atoms(self):
+        '''Returns True if any group type used in the structure contains a
+        target atom. This check does not require any per-atom work.
+        '''
+        return bool(np.any(self.target_slots & self.used_slots))
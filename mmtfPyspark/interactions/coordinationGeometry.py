@@ -261,3 +261,170 @@ class CoordinateGeometry(object):
         indexed_values = [(index, value) for index, value in enumerate(values)]
         indexed_values.sort(key=lambda x: x[1])
         return [tup[0] for tup in indexed_values]
+
+
+class BatchCoordinateGeometry(object):
+    '''Calculates distances, angles, and orientational order parameters for
+    many coordination centers at once.
+
+    The neighbors of each center are passed as a padded block of coordinates.
+    Missing neighbors are specified by a mask (or by NaN coordinates) and are
+    excluded from all calculations. The results of center i correspond to the
+    results of CoordinateGeometry(centers[i], neighbors[i][mask[i]]).
+
+    Attributes
+    ----------
+    centers : :obj:`array <numpy.ndarray>`
+       n x 3 array of center coordinates
+    neighbors : :obj:`array <numpy.ndarray>`
+       n x k x 3 array of padded neighbor coordinates
+    mask : :obj:`array <numpy.ndarray>`
+       n x k boolean array of valid neighbors [all neighbors with coordinates]
+    '''
+
+    def __init__(self, centers, neighbors, mask=None):
+
+        self.centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        self.neighbors = np.asarray(neighbors, dtype=np.float64).reshape(len(self.centers), -1, 3)
+
+        if mask is None:
+            mask = ~np.isnan(self.neighbors).any(axis=-1)
+        self.mask = np.asarray(mask, dtype=bool)
+        self.counts = self.mask.sum(axis=1)
+
+        self._calc_distances()
+        self._calc_angles()
+        self._calc_dot_products()
+
+    def get_distances(self):
+        '''Returns the distances from each center to its neighbor atoms.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+            n x k array of distances, NaN for missing neighbors
+        '''
+
+        return self.distances
+
+    def get_angles(self):
+        '''Returns all pairwise angles between each center and pairs of its
+        neighbor atoms. The angles of neighbor pairs (i, j) with i < j are
+        ordered as (0, 1), (0, 2), ..., (1, 2), ...
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+            n x k*(k-1)/2 array of angles, NaN for missing neighbors
+        '''
+
+        return self.angles
+
+    def q3(self):
+        '''Returns the trigonal orientational order parameter q3 of each center
+        (see CoordinateGeometry.q3).
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           q3 values, NaN for centers with less than 3 neighbors
+        '''
+
+        total = self._sum_of_squares([(0, 1), (0, 2), (1, 2)], 0.5)
+
+        return self._by_count(1.0 - 4.0 / 7.0 * total, 3)
+
+    def q4(self):
+        '''Returns the tetrahedral orientational order parameter q4 of each
+        center (see CoordinateGeometry.q4).
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           q4 values, NaN for centers with less than 4 neighbors
+        '''
+
+        total = self._sum_of_squares(list(it.combinations(range(4), 2)), 1.0 / 3.0)
+
+        return self._by_count(1.0 - 3.0 / 8.0 * total, 4)
+
+    def q5(self):
+        '''Returns the trigonal bipyramidal orientational order parameter q5 of
+        each center (see CoordinateGeometry.q5).
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           q5 values, NaN for centers with less than 5 neighbors
+        '''
+
+        sum1 = self._sum_of_squares([(0, 1), (0, 2), (1, 2)], 0.5)
+        sum2 = self._sum_of_squares([(0, 3), (0, 4), (1, 3), (1, 4), (2, 3), (2, 4)], 0.0)
+        sum3 = self._sum_of_squares([(3, 4)], 1.0)
+
+        return self._by_count(1.0 - 6.0 / 35.0 * sum1 - 3.0 / 10.0 * sum2 - 3.0 / 40.0 * sum3, 5)
+
+    def q6(self):
+        '''Returns the octahedral orientational order parameter q6 of each
+        center (see CoordinateGeometry.q6).
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           q6 values, NaN for centers with less than 6 neighbors
+        '''
+
+        # CoordinateGeometry only stores dot products for i < j, therefore the
+        # (3, 0) equatorial term is zero there and is omitted here
+        total = self._sum_of_squares([(0, 1), (1, 2), (2, 3),
+                                      (0, 4), (1, 4), (2, 4), (3, 4),
+                                      (0, 5), (1, 5), (2, 5), (3, 5)], 0.0)
+
+        return self._by_count(1.0 - 1.0 / 4.0 * total, 6)
+
+    def _calc_distances(self):
+        '''Calculates the center to neighbor vectors and distances
+        '''
+
+        self.vectors = self.centers[:, None, :] - self.neighbors
+        self.vectors[~self.mask] = np.nan
+        self.distances = np.linalg.norm(self.vectors, axis=-1)
+
+    def _calc_angles(self):
+        '''Calculates the angles between all pairs of neighbors
+        '''
+
+        unit = self.vectors / self.distances[:, :, None]
+        i, j = np.triu_indices(self.neighbors.shape[1], 1)
+        cos = np.einsum('nij,nij->ni', unit[:, i, :], unit[:, j, :])
+        self.angles = np.arccos(np.clip(cos, -1.0, 1.0))
+
+    def _calc_dot_products(self):
+        '''Calculates the dot products between the unit vectors of all pairs of
+        neighbors, ordered by their distance to the center
+        '''
+
+        order = np.argsort(np.where(self.mask, self.distances, np.inf), axis=1, kind='stable')
+        distances = np.take_along_axis(self.distances, order, axis=1)
+        vectors = np.take_along_axis(self.vectors, order[:, :, None], axis=1)
+        unit = vectors / distances[:, :, None]
+        self.dotProducts = np.einsum('nik,njk->nij', unit, unit)
+
+    def _sum_of_squares(self, pairs, offset):
+        '''Returns the sum of (dot product + offset)^2 over the given pairs of
+        distance ordered neighbors
+        '''
+
+        total = np.zeros(len(self.centers))
+        size = self.dotProducts.shape[1]
+        for i, j in pairs:
+            if i < size and j < size:
+                total += (self.dotProducts[:, i, j] + offset) ** 2
+
+        return total
+
+    def _by_count(self, values, min_neighbors):
+        '''Sets values of centers with too few neighbors to NaN
+        '''
+
+        return np.where(self.counts >= min_neighbors, values, np.nan)
@@ -0,0 +1,301 @@
+#!/user/bin/env python
+'''interactionCache.py
+
+An opt-in, content-addressed cache for the results of
+InteractionExtractor.get_ligand_polymer_interactions and
+InteractionExtractorPd.get_interactions.
+
+The results of each structure are cached under a key that combines the
+structure id, a checksum of the structure data, and a canonical hash of the
+interaction parameters (InteractionFilter, or query/target strings, cutoff,
+level, and bio). Only structures whose key is not in the cache are
+recomputed. The results are stored in Parquet files in a local directory,
+one subdirectory per set of interaction parameters.
+
+Each run writes its results to a part named after the cache keys of the run
+(results/run=<id>) and then commits the keys to the manifest by renaming a
+hidden, completely written manifest part (manifest/run=<id>). Only the
+results of committed keys are read, so a run that fails between the two
+writes leaves no duplicate rows; a rerun overwrites the uncommitted part.
+Cached results of structures whose data changed (stale checksums) are
+evicted when the structure is processed again.
+
+Since the structures are traversed twice (once to calculate the keys and
+once to calculate the cache misses), the input RDD should be cached.
+
+Examples
+--------
+>>> cache = InteractionCache('/path/to/cache')
+>>> interactions = cache.get_ligand_polymer_interactions(pdb, interaction_filter)
+>>> print(cache.get_hits(), cache.get_misses())
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import hashlib
+import json
+import os
+import shutil
+from pyspark.sql import Row, SparkSession
+from pyspark.sql.types import StructType, StructField, StringType
+from mmtfPyspark.interactions.interaction_extractor import InteractionExtractor, LigandInteractionFingerprint
+from mmtfPyspark.interactions.interaction_extractor_pd import InteractionExtractorPd, \
+    AsymmetricUnitInteractions, BioAssemblyInteractions
+
+CACHE_KEY = "cacheKey"
+
+
+class InteractionCache(object):
+    '''Cache of per-structure interaction results
+
+    Attributes
+    ----------
+    path : str
+       local directory to store the cached results
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    def get_ligand_polymer_interactions(self, structures, interaction_filter, level='group'):
+        '''Returns the dataset of InteractionExtractor.get_ligand_polymer_interactions
+        and only calculates the interactions of structures that are not cached.
+
+        Parameters
+        ----------
+        structures : PythonRDD
+           a set of PDB structures
+        interaction_filter : InteractionFilter
+           interaction criteria
+        level : 'chain', 'group' or 'atom' to aggregate results
+
+        Returns
+        -------
+        dataset
+           dataset with interacting residue and atom information
+        '''
+
+        parameters = {'method': 'get_ligand_polymer_interactions',
+                      'filter': vars(interaction_filter),
+                      'level': level}
+
+        mapper = LigandInteractionFingerprint(interaction_filter, level)
+        schema = InteractionExtractor._get_schema(level)
+
+        return self._get_dataset(structures, parameters, mapper, schema)
+
+    def get_interactions(self, structures, distance_cutoff=4.0, query=None, target=None, inter=True,
+                         intra=False, bio=1, level='group'):
+        '''Returns the dataset of InteractionExtractorPd.get_interactions
+        and only calculates the interactions of structures that are not cached.
+        See InteractionExtractorPd.get_interactions for a description of
+        the parameters.
+
+        Returns
+        -------
+        dataframe
+           Spark dataframe with pairwise interaction information
+        '''
+
+        parameters = {'method': 'get_interactions', 'distance_cutoff': distance_cutoff,
+                      'query': query, 'target': target, 'inter': inter, 'intra': intra,
+                      'bio': bio, 'level': level}
+
+        if bio is None:
+            mapper = AsymmetricUnitInteractions(query, target, distance_cutoff, inter, intra, level)
+        else:
+            mapper = BioAssemblyInteractions(query, target, distance_cutoff, inter, intra, bio, level)
+        schema = InteractionExtractorPd._get_schema(level, bio)
+
+        return self._get_dataset(structures, parameters, mapper, schema)
+
+    def get_hits(self):
+        '''Returns the number of structures retrieved from the cache
+        since this cache object was created.
+        '''
+        return self.hits
+
+    def get_misses(self):
+        '''Returns the number of structures calculated and added to the cache
+        since this cache object was created.
+        '''
+        return self.misses
+
+    def clear(self):
+        '''Removes all cached results
+        '''
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+
+    def _get_dataset(self, structures, parameters, mapper, schema):
+        spark = SparkSession.builder.getOrCreate()
+
+        parameter_hash = get_parameter_hash(parameters)
+        results_path = os.path.join(self.path, parameter_hash, 'results')
+        manifest_path = os.path.join(self.path, parameter_hash, 'manifest')
+
+        # calculate the cache key of each structure
+        keys = structures.map(lambda t: (t[0], get_structure_checksum(t[1]))).collect()
+        keys = {structure_id: get_cache_key(structure_id, checksum, parameter_hash)
+                for structure_id, checksum in keys}
+
+        result_schema = StructType([StructField(CACHE_KEY, StringType(), False)] + schema.fields)
+        key_schema = StructType([StructField("structureId", StringType(), False),
+                                 StructField(CACHE_KEY, StringType(), False)])
+
+        manifest = _read_parts(spark, manifest_path, key_schema)
+        cached = set()
+        if manifest is not None:
+            entries = manifest.select("structureId", CACHE_KEY, "run").collect()
+            cached = {row[1] for row in entries}
+
+            # evict the results of structures with a different checksum
+            stale = {row[2] for row in entries if row[0] in keys and row[1] != keys[row[0]]}
+            if len(stale) > 0:
+                current = set(keys.values())
+                self._evict(spark, manifest_path, results_path, stale,
+                            {row[1] for row in entries if row[0] not in keys or row[1] in current})
+
+        missing = {structure_id: key for structure_id, key in keys.items() if key not in cached}
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if len(missing) > 0:
+            # calculate and store the interactions of the structures that are not cached
+            run = hashlib.sha1(" ".join(sorted(missing.values())).encode('utf-8')).hexdigest()
+            missing_keys = structures.context.broadcast(missing)
+            rows = structures.filter(lambda t: t[0] in missing_keys.value) \
+                             .flatMap(lambda t: [Row(missing_keys.value[t[0]], *row) for row in mapper(t)])
+
+            spark.createDataFrame(rows, result_schema).write.mode('overwrite') \
+                 .parquet(os.path.join(results_path, "run=" + run))
+
+            # commit the processed structures, including structures without results
+            entries = [Row(structure_id, key) for structure_id, key in missing.items()]
+            _write_part(spark.createDataFrame(entries, key_schema), manifest_path, run)
+
+        manifest = _read_parts(spark, manifest_path, key_schema)
+        results = _read_parts(spark, results_path, result_schema)
+        if manifest is None or results is None:
+            return spark.createDataFrame([], schema)
+
+        # only read committed results of the current structures
+        current = spark.createDataFrame([Row(structure_id, key) for structure_id, key in keys.items()],
+                                        key_schema).select(CACHE_KEY)
+        committed = manifest.select(CACHE_KEY, "run").join(current, CACHE_KEY)
+
+        return results.join(committed, [CACHE_KEY, "run"]).select([field.name for field in schema.fields])
+
+    def _evict(self, spark, manifest_path, results_path, runs, retained):
+        '''Rewrites the manifest and result parts of runs with stale cache keys,
+        keeping only the retained keys'''
+        retained = spark.createDataFrame([Row(key) for key in retained],
+                                         StructType([StructField(CACHE_KEY, StringType(), False)]))
+
+        for run in runs:
+            part = "run=" + run
+            # uncommit the stale keys first, their results are then no longer read
+            manifest = spark.read.parquet(os.path.join(manifest_path, part)).join(retained, CACHE_KEY)
+            _write_part(manifest.select("structureId", CACHE_KEY), manifest_path, run)
+
+            if os.path.exists(os.path.join(results_path, part)):
+                results = spark.read.parquet(os.path.join(results_path, part)).join(retained, CACHE_KEY)
+                _write_part(results, results_path, run)
+
+
+def get_parameter_hash(parameters):
+    '''Returns a canonical hash of interaction parameters. Sets are sorted and
+    dictionaries are serialized with sorted keys, so equivalent parameters have
+    the same hash.
+
+    Parameters
+    ----------
+    parameters : dict
+       interaction parameters
+
+    Returns
+    -------
+    str
+       hex digest of the parameters
+    '''
+
+    canonical = json.dumps(parameters, sort_keys=True, default=_to_json)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def get_structure_checksum(structure):
+    '''Returns a checksum of the data of a structure. The checksum is
+    calculated from the raw (encoded) data that a structure was decoded from,
+    or from the attributes of structures that were not decoded (e.g., the
+    output of mappers).
+
+    Parameters
+    ----------
+    structure : MmtfStructure
+       mmtf structure
+
+    Returns
+    -------
+    str
+       hex digest of the structure data
+    '''
+
+    digest = hashlib.sha1()
+    data = getattr(structure, 'input_data', None)
+    if data is None:
+        data = vars(structure)
+    for name in sorted(data.keys()):
+        value = data[name]
+        digest.update(name.encode('utf-8'))
+        if isinstance(value, (bytes, bytearray)):
+            digest.update(value)
+        else:
+            digest.update(json.dumps(value, sort_keys=True, default=_to_json).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def get_cache_key(structure_id, checksum, parameter_hash):
+    '''Returns the cache key for the results of a structure
+    '''
+    return hashlib.sha1(f"{structure_id}:{checksum}:{parameter_hash}".encode('utf-8')).hexdigest()
+
+
+def _to_json(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha1(value).hexdigest()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return repr(value)
+
+
+def _write_part(dataset, path, run):
+    '''Writes a dataset to a hidden directory and renames it to the part of a
+    run, so that readers only see completely written parts'''
+    part = os.path.join(path, "run=" + run)
+    temporary = os.path.join(path, ".run=" + run)
+    replaced = os.path.join(path, ".replaced-run=" + run)
+
+    dataset.write.mode('overwrite').parquet(temporary)
+    if os.path.exists(part):
+        shutil.rmtree(replaced, ignore_errors=True)
+        os.rename(part, replaced)
+    os.rename(temporary, part)
+    shutil.rmtree(replaced, ignore_errors=True)
+
+
+def _read_parts(spark, path, schema):
+    '''Returns the committed parts in a directory with a run column, or None
+    if there are no parts'''
+    if not os.path.exists(path) or not any(name.startswith("run=") for name in os.listdir(path)):
+        return None
+
+    # hidden directories (uncommitted parts) are ignored by Spark
+    schema = StructType(schema.fields + [StructField("run", StringType(), False)])
+    return spark.read.schema(schema).option("basePath", path).parquet(path)
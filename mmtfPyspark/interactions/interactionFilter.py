@@ -16,6 +16,7 @@ __status__ = "done"
 
 import sys
 import numpy as np
+from mmtfPyspark.interactions.compiledInteractionFilter import CompiledInteractionFilter
 
 
 class InteractionFilter(object):
@@ -387,6 +388,31 @@ class InteractionFilter(object):
             groups = [groups]
         self._prohibitedTargetGroups = set(groups)
 
+    def compile(self, structure, first_model_only=True):
+        '''Evaluates the query and target criteria once per group type of the
+        specified structure. The returned object provides atom masks for the
+        structure, and can be shared by all methods that process it.
+
+        Examples
+        --------
+        >>> compiled = filter.compile(structure)
+        >>> query = compiled.get_query_atoms()
+        >>> target = compiled.get_target_atoms()
+
+        Parameters
+        ----------
+        structure : MmtfStructure
+           structure to compile the filter for
+        first_model_only : bool
+           if True, only the atoms of the first model are considered
+
+        Returns
+        -------
+        CompiledInteractionFilter
+           filter criteria compiled for the specified structure
+        '''
+        return CompiledInteractionFilter(self, structure, first_model_only)
+
     def is_query_element(self, element):
         '''Returns True if the specified elements matches the query conditions.
 
@@ -67,6 +67,88 @@ class InteractionExtractor(object):
         return spark.createDataFrame(row, schema)
 
 
+    @staticmethod
+    def get_ligand_polymer_ensemble_interactions(structures, interaction_filter, level='group'):
+        '''Returns a dataset of ligand - macromolecule interactions across all
+        models of a structure (e.g., NMR ensembles). An interaction is reported
+        once if it occurs in at least one model, together with the number and
+        the fraction of models in which it occurs. Interactions are matched
+        across models by chain name, group number, and atom name.
+
+        The dataset contains the columns of get_ligand_polymer_interactions
+        for the specified level and the following additional columns:
+        - modelCount - number of models in which the interaction occurs
+        - frequency - fraction of models in which the interaction occurs
+
+        At the 'atom' level, the distance column contains the minimum distance
+        across all models. Note, the structures must not be read with
+        first_model=True.
+
+        Parameters
+        ----------
+        structures : PythonRDD
+           a set of PDB structures
+        interaction_filter : InteractionFilter
+           interaction criteria
+        level : 'chain', 'group' or 'atom' to aggregate results
+
+        Returns
+        -------
+        dataset
+           dataset with interacting residue and atom information and their frequencies
+        '''
+
+        row = structures.flatMap(LigandInteractionEnsembleFingerprint(interaction_filter, level))
+
+        spark = SparkSession.builder.getOrCreate()
+        schema = InteractionExtractor._get_schema(level)
+        schema = StructType(schema.fields + [StructField("modelCount", IntegerType(), False),
+                                             StructField("frequency", FloatType(), False)])
+        return spark.createDataFrame(row, schema)
+
+    @staticmethod
+    def get_ligand_polymer_water_bridges(structures, interaction_filter, level='group'):
+        '''Returns a dataset of water-mediated ligand - macromolecule interactions.
+        A water bridge is formed by a water oxygen that is within the distance
+        cutoff of both a query (ligand) atom and a target (polymer) atom. The
+        interaction criteria are applied to the ligand and polymer atoms only,
+        so water can be excluded from the query and target groups.
+
+        The dataset contains the columns of get_ligand_polymer_interactions
+        for the specified level and the following additional columns:
+        - waterChainId - chain name of the bridging water
+        - waterGroupNumber - group number of the bridging water
+        - queryWaterDistance - distance between query atom and water oxygen ('atom' level only)
+        - targetWaterDistance - distance between target atom and water oxygen ('atom' level only)
+
+        At the 'atom' level, the distance column contains the distance between
+        the query and target atoms.
+
+        Parameters
+        ----------
+        structures : PythonRDD
+           a set of PDB structures
+        interaction_filter : InteractionFilter
+           interaction criteria
+        level : 'chain', 'group' or 'atom' to aggregate results
+
+        Returns
+        -------
+        dataset
+           dataset with water bridge information
+        '''
+
+        row = structures.flatMap(LigandWaterBridgeFingerprint(interaction_filter, level))
+
+        spark = SparkSession.builder.getOrCreate()
+        fields = [StructField("waterChainId", StringType(), False),
+                  StructField("waterGroupNumber", StringType(), False)]
+        if level == 'atom':
+            fields += [StructField("queryWaterDistance", FloatType(), False),
+                       StructField("targetWaterDistance", FloatType(), False)]
+        schema = StructType(InteractionExtractor._get_schema(level).fields + fields)
+        return spark.createDataFrame(row, schema)
+
     @staticmethod
     def get_polymer_interactions(structures, interaction_filter, inter=True, intra=False, level='group'):
         '''Returns a dataset of inter and or intra macromolecule - macromolecule interactions
@@ -162,23 +244,12 @@ class LigandInteractionFingerprint:
         structure_id = t[0]
         structure = t[1]
 
-        arrays = ColumnarStructure(structure, True)
-
-        # Apply query (ligand) filter
-        group_names = arrays.get_group_names()
-        qg = self.filter.is_query_group_np(group_names)
-        if np.count_nonzero(qg) == 0:
-            return []
-
-        elements = arrays.get_elements()
-        qe = self.filter.is_query_element_np(elements)
-        if np.count_nonzero(qe) == 0:
+        # Evaluate the filter once per group type of this structure
+        compiled = self.filter.compile(structure)
+        if not compiled.has_query_atoms() or not compiled.has_target_atoms():
             return []
 
-        atom_names = arrays.get_atom_names()
-        qa = self.filter.is_query_atom_name_np(atom_names)
-        if np.count_nonzero(qa) == 0:
-            return []
+        arrays = ColumnarStructure(structure, True)
 
         ### filter prohibited groups??
 
@@ -186,20 +257,18 @@ class LigandInteractionFingerprint:
         polymer = arrays.is_polymer()
 
         # Create mask for ligand atoms
-        lig = ~polymer & qg & qe & qa
+        lig = ~polymer & compiled.get_query_atoms()
         if np.count_nonzero(lig) == 0:
             return []
 
         # Apply target (polymer) filter
-        tg = self.filter.is_target_group_np(group_names)
-        te = self.filter.is_target_element_np(elements)
-        ta = self.filter.is_target_atom_name_np(atom_names)
-
-        poly = polymer & tg & te & ta
+        poly = polymer & compiled.get_target_atoms()
 
         if np.count_nonzero(poly) == 0:
             return []
 
+        group_names = arrays.get_group_names()
+        atom_names = arrays.get_atom_names()
         chain_names = arrays.get_chain_names()
         group_numbers = arrays.get_group_numbers()
         entity_indices = arrays.get_entity_indices()
@@ -287,23 +356,12 @@ class LigandInteractionFingerprintNew:
         structure_id = t[0]
         structure = t[1]
 
-        arrays = ColumnarStructure(structure, True)
-
-        # Apply query (ligand) filter
-        group_names = arrays.get_group_names()
-        qg = self.filter.is_query_group_np(group_names)
-        if np.count_nonzero(qg) == 0:
+        # Evaluate the filter once per group type of this structure
+        compiled = self.filter.compile(structure)
+        if not compiled.has_query_atoms() or not compiled.has_target_atoms():
             return []
 
-        elements = arrays.get_elements()
-        qe = self.filter.is_query_element_np(elements)
-        if np.count_nonzero(qe) == 0:
-            return []
-
-        atom_names = arrays.get_atom_names()
-        qa = self.filter.is_query_atom_name_np(atom_names)
-        if np.count_nonzero(qa) == 0:
-            return []
+        arrays = ColumnarStructure(structure, True)
 
         ### filter prohibited groups??
 
@@ -311,20 +369,18 @@ class LigandInteractionFingerprintNew:
         polymer = arrays.is_polymer()
 
         # Create mask for ligand atoms
-        lig = ~polymer & qg & qe & qa
+        lig = ~polymer & compiled.get_query_atoms()
         if np.count_nonzero(lig) == 0:
             return []
 
         # Apply target (polymer) filter
-        tg = self.filter.is_target_group_np(group_names)
-        te = self.filter.is_target_element_np(elements)
-        ta = self.filter.is_target_atom_name_np(atom_names)
-
-        poly = polymer & tg & te & ta
+        poly = polymer & compiled.get_target_atoms()
 
         if np.count_nonzero(poly) == 0:
             return []
 
+        group_names = arrays.get_group_names()
+        atom_names = arrays.get_atom_names()
         chain_names = arrays.get_chain_names()
         group_numbers = arrays.get_group_numbers()
         entity_indices = arrays.get_entity_indices()
@@ -403,59 +459,325 @@ class LigandInteractionFingerprintNew:
         return rows
 
 
-class PolymerInteractionFingerprint:
+class LigandInteractionEnsembleFingerprint:
 
-    def __init__(self, interaction_filter, inter, intra, level='group'):
+    def __init__(self, interaction_filter, level='group'):
         self.filter = interaction_filter
-        self.inter = inter
-        self.intra = intra
         self.level = level
 
     def __call__(self, t):
         structure_id = t[0]
         structure = t[1]
 
-        arrays = ColumnarStructure(structure, True)
+        # Evaluate the filter once for the atoms of all models
+        compiled = self.filter.compile(structure, first_model_only=False)
+        if not compiled.has_query_atoms() or not compiled.has_target_atoms():
+            return []
 
-        # if there is only a single chain, there are no intermolecular interactions
-        if structure.num_chains == 1 and self.inter and not self.intra:
+        arrays = ColumnarStructure(structure, False)
+
+        # Masks are calculated once for the atoms of all models
+        polymer = arrays.is_polymer()
+        lig = ~polymer & compiled.get_query_atoms()
+        poly = polymer & compiled.get_target_atoms()
+
+        if np.count_nonzero(lig) == 0 or np.count_nonzero(poly) == 0:
+            return []
+
+        group_names = arrays.get_group_names()
+        atom_names = arrays.get_atom_names()
+        chain_names = arrays.get_chain_names()
+        group_numbers = arrays.get_group_numbers()
+        entity_indices = arrays.get_entity_indices()
+        sequence_positions = arrays.get_sequence_positions()
+
+        c = np.stack((arrays.get_x_coords(), arrays.get_y_coords(), arrays.get_z_coords()), axis=-1)
+
+        # Label atoms by chain name, group number, and atom name (depending
+        # on the level) to match interactions across models
+        chain_codes = np.unique(chain_names, return_inverse=True)[1]
+        atom_codes = np.unique(atom_names, return_inverse=True)[1]
+        group_labels = np.stack((chain_codes, np.unique(group_numbers, return_inverse=True)[1]), axis=-1)
+        atom_labels = np.column_stack((group_labels, atom_codes))
+        if self.level == 'atom':
+            lig_labels, poly_labels = atom_labels, atom_labels
+        elif self.level == 'group':
+            lig_labels, poly_labels = group_labels, group_labels
+        else:
+            lig_labels, poly_labels = group_labels, chain_codes[:, np.newaxis]
+
+        lig_codes = np.unique(lig_labels, axis=0, return_inverse=True)[1].ravel()
+        poly_codes = np.unique(poly_labels, axis=0, return_inverse=True)[1].ravel()
+
+        # Run the pair search per model and keep the closest atom pair of each
+        # unique interaction within a model
+        model_to_atom = arrays.get_model_to_atom_indices()
+        num_models = arrays.get_num_models()
+        distance_cutoff = self.filter.get_distance_cutoff()
+
+        keys, lig_atoms, poly_atoms, distances = [], [], [], []
+        for m in range(num_models):
+            start, end = model_to_atom[m], model_to_atom[m + 1]
+            li = start + np.flatnonzero(lig[start:end])
+            pi = start + np.flatnonzero(poly[start:end])
+            if len(li) == 0 or len(pi) == 0:
+                continue
+
+            sparse_dm = cKDTree(c[pi]).sparse_distance_matrix(cKDTree(c[li]), max_distance=distance_cutoff,
+                                                               output_type='ndarray')
+            la, pa, d = li[sparse_dm['j']], pi[sparse_dm['i']], sparse_dm['v']
+            k = np.stack((lig_codes[la], poly_codes[pa]), axis=-1)
+
+            order = np.lexsort((d, k[:, 1], k[:, 0]))
+            k, la, pa, d = k[order], la[order], pa[order], d[order]
+            first = np.ones(len(k), dtype=bool)
+            first[1:] = (k[1:] != k[:-1]).any(axis=1)
+
+            keys.append(k[first])
+            lig_atoms.append(la[first])
+            poly_atoms.append(pa[first])
+            distances.append(d[first])
+
+        if len(keys) == 0:
+            return []
+
+        # Aggregate the interactions across models, keeping the closest pair
+        keys = np.concatenate(keys)
+        lig_atoms = np.concatenate(lig_atoms)
+        poly_atoms = np.concatenate(poly_atoms)
+        distances = np.concatenate(distances)
+
+        order = np.argsort(distances, kind='stable')
+        _, index, counts = np.unique(keys[order], axis=0, return_index=True, return_counts=True)
+        index = order[index]
+
+        rows = []
+        for n in range(len(index)):
+            j = lig_atoms[index[n]]  # ligand atom index
+            i = poly_atoms[index[n]]  # polymer atom index
+            count = int(counts[n])
+            frequency = count / num_models
+
+            if self.level == 'chain':
+                row = Row(structure_id + "." + chain_names[i],  # structureChainId
+                          group_names[j],  # queryLigandId
+                          chain_names[j],  # queryLigandChainId
+                          group_numbers[j],  # queryLigandNumber
+                          chain_names[i],  # targetChainId
+                          count,  # modelCount
+                          frequency  # frequency
+                          )
+            elif self.level == 'group':
+                row = Row(structure_id + "." + chain_names[i],  # structureChainId
+                          group_names[j],  # queryLigandId
+                          chain_names[j],  # queryLigandChainId
+                          group_numbers[j],  # queryLigandNumber
+                          group_names[i],  # targetGroupId
+                          chain_names[i],  # targetChainId
+                          group_numbers[i],  # targetGroupNumber
+                          sequence_positions[i].item(),  # sequenceIndex
+                          structure.entity_list[entity_indices[i]]['sequence'],  # sequence
+                          count,  # modelCount
+                          frequency  # frequency
+                          )
+            else:
+                row = Row(structure_id + "." + chain_names[i],  # structureChainId
+                          group_names[j],  # queryLigandId
+                          chain_names[j],  # queryLigandChainId
+                          group_numbers[j],  # queryLigandNumber
+                          atom_names[j],  # queryAtomName
+                          group_names[i],  # targetGroupId
+                          chain_names[i],  # targetChainId
+                          group_numbers[i],  # targetGroupNumber
+                          atom_names[i],  # targetAtomName
+                          distances[index[n]].item(),  # distance
+                          sequence_positions[i].item(),  # sequenceIndex
+                          structure.entity_list[entity_indices[i]]['sequence'],  # sequence
+                          count,  # modelCount
+                          frequency  # frequency
+                          )
+            rows.append(row)
+
+        return rows
+
+
+class LigandWaterBridgeFingerprint:
+
+    def __init__(self, interaction_filter, level='group'):
+        self.filter = interaction_filter
+        self.level = level
+
+    def __call__(self, t):
+        structure_id = t[0]
+        structure = t[1]
+
+        # Evaluate the filter once per group type of this structure
+        compiled = self.filter.compile(structure)
+        if not compiled.has_query_atoms() or not compiled.has_target_atoms():
             return []
 
-        # Apply query filter
+        arrays = ColumnarStructure(structure, True)
+
         group_names = arrays.get_group_names()
-        qg = self.filter.is_query_group_np(group_names)
-        if np.count_nonzero(qg) == 0:
+        water_groups = (group_names == 'HOH') | (group_names == 'DOD')
+        water = water_groups & (arrays.get_elements() == 'O')
+
+        # Create masks for water oxygen, ligand, and polymer atoms. All atoms
+        # of water groups (including H and D) are excluded from the ligand
+        # and polymer atoms, only the oxygens bridge.
+        polymer = arrays.is_polymer()
+        lig = ~polymer & ~water_groups & compiled.get_query_atoms()
+        poly = polymer & ~water_groups & compiled.get_target_atoms()
+
+        if np.count_nonzero(water) == 0 or np.count_nonzero(lig) == 0 or np.count_nonzero(poly) == 0:
+            return []
+
+        c = np.stack((arrays.get_x_coords(), arrays.get_y_coords(), arrays.get_z_coords()), axis=-1)
+
+        wi = np.flatnonzero(water)
+        li = np.flatnonzero(lig)
+        pi = np.flatnonzero(poly)
+
+        # Find the ligand and polymer neighbors of all water oxygens
+        distance_cutoff = self.filter.get_distance_cutoff()
+        water_tree = cKDTree(c[wi])
+        lig_dm = water_tree.sparse_distance_matrix(cKDTree(c[li]), max_distance=distance_cutoff,
+                                                   output_type='ndarray')
+        poly_dm = water_tree.sparse_distance_matrix(cKDTree(c[pi]), max_distance=distance_cutoff,
+                                                    output_type='ndarray')
+
+        if len(lig_dm) == 0 or len(poly_dm) == 0:
             return []
 
-        elements = arrays.get_elements()
-        qe = self.filter.is_query_element_np(elements)
-        if np.count_nonzero(qe) == 0:
+        # Join the ligand and polymer neighbors on the water index: each ligand
+        # contact of a water is combined with all polymer contacts of that water
+        poly_dm = poly_dm[np.argsort(poly_dm['i'], kind='stable')]
+        poly_counts = np.bincount(poly_dm['i'], minlength=len(wi))
+        poly_offsets = np.cumsum(poly_counts) - poly_counts
+
+        repeats = poly_counts[lig_dm['i']]
+        lig_pairs = np.repeat(np.arange(len(lig_dm)), repeats)
+        ramp = np.arange(len(lig_pairs)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        poly_pairs = poly_offsets[lig_dm['i'][lig_pairs]] + ramp
+
+        w = wi[lig_dm['i'][lig_pairs]]  # water atom indices
+        la = li[lig_dm['j'][lig_pairs]]  # ligand atom indices
+        pa = pi[poly_dm['j'][poly_pairs]]  # polymer atom indices
+        lw = lig_dm['v'][lig_pairs]  # ligand - water distances
+        pw = poly_dm['v'][poly_pairs]  # polymer - water distances
+
+        if len(w) == 0:
             return []
 
+        # There are redundant bridges when aggregating the results at the 'chain'
+        # or 'group' level, since multiple atoms in a group may be involved.
+        if self.level != 'atom':
+            atom_to_group = arrays.get_atom_to_group_indices()
+            if self.level == 'chain':
+                target = arrays.get_atom_to_chain_indices()[pa]
+            else:
+                target = atom_to_group[pa]
+            keys = np.stack((atom_to_group[la], w, target), axis=-1)
+            _, index = np.unique(keys, axis=0, return_index=True)
+            w, la, pa = w[index], la[index], pa[index]
+
         atom_names = arrays.get_atom_names()
-        qa = self.filter.is_query_atom_name_np(atom_names)
-        if np.count_nonzero(qa) == 0:
+        chain_names = arrays.get_chain_names()
+        group_numbers = arrays.get_group_numbers()
+        entity_indices = arrays.get_entity_indices()
+        sequence_positions = arrays.get_sequence_positions()
+
+        rows = []
+        for n in range(len(w)):
+            j = la[n]  # ligand atom index
+            i = pa[n]  # polymer atom index
+            k = w[n]  # water atom index
+
+            if self.level == 'chain':
+                row = Row(structure_id + "." + chain_names[i],  # structureChainId
+                          group_names[j],  # queryLigandId
+                          chain_names[j],  # queryLigandChainId
+                          group_numbers[j],  # queryLigandNumber
+                          chain_names[i],  # targetChainId
+                          chain_names[k],  # waterChainId
+                          group_numbers[k]  # waterGroupNumber
+                          )
+            elif self.level == 'group':
+                row = Row(structure_id + "." + chain_names[i],  # structureChainId
+                          group_names[j],  # queryLigandId
+                          chain_names[j],  # queryLigandChainId
+                          group_numbers[j],  # queryLigandNumber
+                          group_names[i],  # targetGroupId
+                          chain_names[i],  # targetChainId
+                          group_numbers[i],  # targetGroupNumber
+                          sequence_positions[i].item(),  # sequenceIndex
+                          structure.entity_list[entity_indices[i]]['sequence'],  # sequence
+                          chain_names[k],  # waterChainId
+                          group_numbers[k]  # waterGroupNumber
+                          )
+            else:
+                row = Row(structure_id + "." + chain_names[i],  # structureChainId
+                          group_names[j],  # queryLigandId
+                          chain_names[j],  # queryLigandChainId
+                          group_numbers[j],  # queryLigandNumber
+                          atom_names[j],  # queryAtomName
+                          group_names[i],  # targetGroupId
+                          chain_names[i],  # targetChainId
+                          group_numbers[i],  # targetGroupNumber
+                          atom_names[i],  # targetAtomName
+                          float(np.linalg.norm(c[j] - c[i])),  # distance
+                          sequence_positions[i].item(),  # sequenceIndex
+                          structure.entity_list[entity_indices[i]]['sequence'],  # sequence
+                          chain_names[k],  # waterChainId
+                          group_numbers[k],  # waterGroupNumber
+                          lw[n].item(),  # queryWaterDistance
+                          pw[n].item()  # targetWaterDistance
+                          )
+            rows.append(row)
+
+        return rows
+
+
+class PolymerInteractionFingerprint:
+
+    def __init__(self, interaction_filter, inter, intra, level='group'):
+        self.filter = interaction_filter
+        self.inter = inter
+        self.intra = intra
+        self.level = level
+
+    def __call__(self, t):
+        structure_id = t[0]
+        structure = t[1]
+
+        # if there is only a single chain, there are no intermolecular interactions
+        if structure.num_chains == 1 and self.inter and not self.intra:
+            return []
+
+        # Evaluate the filter once per group type of this structure
+        compiled = self.filter.compile(structure)
+        if not compiled.has_query_atoms() or not compiled.has_target_atoms():
             return []
 
+        arrays = ColumnarStructure(structure, True)
+
         # Create mask for polymer atoms
         polymer = arrays.is_polymer()
 
         # Apply query filter to polymer
-        polyq = polymer & qg & qe & qa
+        polyq = polymer & compiled.get_query_atoms()
 
         if np.count_nonzero(polyq) == 0:
             return []
 
         # Apply target filter to polymer atoms
-        tg = self.filter.is_target_group_np(group_names)
-        te = self.filter.is_target_element_np(elements)
-        ta = self.filter.is_target_atom_name_np(atom_names)
-
-        polyt = polymer & tg & te & ta
+        polyt = polymer & compiled.get_target_atoms()
 
         if np.count_nonzero(polyt) == 0:
             return []
 
+        group_names = arrays.get_group_names()
+        atom_names = arrays.get_atom_names()
         chain_names = arrays.get_chain_names()
         group_numbers = arrays.get_group_numbers()
         entity_indices = arrays.get_entity_indices()
@@ -481,41 +803,58 @@ class PolymerInteractionFingerprint:
         pet = entity_indices[polyt]
         pst = sequence_positions[polyt]
 
-        # Calculate distances between the two atom sets
-        tree_t = cKDTree(cpt)
-        tree_q = cKDTree(cpq)
+        # Inter- and intra-chain interactions are distinguished by chain name.
+        # Assign each atom to a chain by name and find the chain pairs that
+        # can be within the distance cutoff before doing any atom-level work.
         distance_cutoff = self.filter.get_distance_cutoff()
-        sparse_dm = tree_t.sparse_distance_matrix(tree_q, max_distance=distance_cutoff, output_type='dict')
+        names, chain_indices = np.unique(chain_names.astype(str), return_inverse=True)
+        pcq_index = chain_indices[polyq]
+        pct_index = chain_indices[polyt]
 
-        # Add interactions to rows.
-        # There are redundant interactions when aggregating the results at the 'group' level,
-        # since multiple atoms in a group may be involved in interactions.
-        # Therefore we use a set of rows to store only unique interactions.
-        rows = set([])
-        for ind, dis in sparse_dm.items():
-            i = ind[0]  # polymer target atom index
-            j = ind[1]  # polymer query atom index
+        chain_pairs = _get_chain_pairs(cpq, pcq_index, cpt, pct_index, len(names),
+                                       distance_cutoff, self.inter, self.intra)
+        if len(chain_pairs) == 0:
+            return []
 
-            # handle intra vs inter-chain interactions
-            if pcq[j] == pct[i]:
-                # cases with interactions in the same chain
-                if not self.intra:
-                    # exclude intrachain interactions
-                    continue
+        # Calculate distances between the query and target atoms of each chain pair
+        q_order, q_start = _get_chain_atom_ranges(pcq_index, len(names))
+        t_order, t_start = _get_chain_atom_ranges(pct_index, len(names))
+        q_trees = dict()
+        t_trees = dict()
 
-                elif pnq[j] == pnt[i]:
-                    # exclude interactions within the same chain and group
-                    continue
+        ind_t, ind_q, dist = [], [], []
+        for chain_q, chain_t in chain_pairs:
+            q = q_order[q_start[chain_q]:q_start[chain_q + 1]]
+            t = t_order[t_start[chain_t]:t_start[chain_t + 1]]
 
-            else:
-                # case with interactions in different chains
-                if not self.inter:
-                    # exclude inter-chain interactions
-                    continue
+            if chain_q not in q_trees:
+                q_trees[chain_q] = cKDTree(cpq[q])
+            if chain_t not in t_trees:
+                t_trees[chain_t] = cKDTree(cpt[t])
 
+            sparse_dm = t_trees[chain_t].sparse_distance_matrix(q_trees[chain_q], max_distance=distance_cutoff,
+                                                                 output_type='ndarray')
             # exclude self interactions (this can happen if the query and target criteria overlap)
-            if dis < 0.001:
-                continue
+            keep = sparse_dm['v'] >= 0.001
+            if chain_q == chain_t:
+                # exclude interactions within the same chain and group
+                keep &= pnq[q[sparse_dm['j']]] != pnt[t[sparse_dm['i']]]
+
+            ind_t.append(t[sparse_dm['i'][keep]])
+            ind_q.append(q[sparse_dm['j'][keep]])
+            dist.append(sparse_dm['v'][keep])
+
+        ind_t = np.concatenate(ind_t)
+        ind_q = np.concatenate(ind_q)
+        dist = np.concatenate(dist)
+
+        # Add interactions to rows.
+        # There are redundant interactions when aggregating the results at the 'group' level,
+        # since multiple atoms in a group may be involved in interactions.
+        # Therefore we use a set of rows to store only unique interactions.
+        rows = set([])
+        for i, j, dis in zip(ind_t, ind_q, dist):
+            # i: polymer target atom index, j: polymer query atom index
 
             if self.level == 'chain':
                 row = Row(structure_id + "." + pct[i],  # structureChainId
@@ -547,7 +886,7 @@ class PolymerInteractionFingerprint:
                           pct[i],  # targetChainId
                           pnt[i],  # targetGroupNumber
                           pat[i],  # targetAtomName
-                          dis,  # distance
+                          dis.item(),  # distance
                           pst[i].item(),  # sequenceIndex
                           structure.entity_list[pet[i]]['sequence']  # sequence
                           )
@@ -555,3 +894,48 @@ class PolymerInteractionFingerprint:
 
         return rows
 
+
+
+def _get_chain_atom_ranges(chain_indices, num_chains):
+    '''Returns the atom indices sorted by chain and the start position of
+    each chain in the sorted index array.
+    '''
+    order = np.argsort(chain_indices, kind='stable')
+    start = np.searchsorted(chain_indices[order], np.arange(num_chains + 1))
+    return order, start
+
+
+def _get_bounding_spheres(coords, chain_indices, num_chains):
+    '''Returns the center and radius of a bounding sphere for the atoms of
+    each chain, and a mask of the chains that contain atoms.
+    '''
+    counts = np.bincount(chain_indices, minlength=num_chains)
+    centers = np.stack([np.bincount(chain_indices, weights=coords[:, k], minlength=num_chains)
+                        for k in range(3)], axis=-1)
+    present = counts > 0
+    centers[present] /= counts[present, None]
+
+    radii = np.zeros(num_chains)
+    np.maximum.at(radii, chain_indices, np.linalg.norm(coords - centers[chain_indices], axis=1))
+    return centers, radii, present
+
+
+def _get_chain_pairs(query_coords, query_chains, target_coords, target_chains, num_chains,
+                     cutoff, inter, intra):
+    '''Returns (query chain, target chain) index pairs that satisfy the
+    inter/intra-chain selection and whose bounding spheres are within the
+    distance cutoff.
+    '''
+    cq, rq, pq = _get_bounding_spheres(query_coords, query_chains, num_chains)
+    ct, rt, pt = _get_bounding_spheres(target_coords, target_chains, num_chains)
+
+    allowed = np.outer(pq, pt)
+    if not intra:
+        np.fill_diagonal(allowed, False)
+    if not inter:
+        allowed &= np.eye(num_chains, dtype=bool)
+
+    d = np.linalg.norm(cq[:, None, :] - ct[None, :, :], axis=-1)
+    allowed &= d <= rq[:, None] + rt[None, :] + cutoff
+
+    return np.argwhere(allowed)
@@ -47,19 +47,19 @@ class LigandInteractionFingerprint(object):
         y = arrays.get_y_coords()
         z = arrays.get_z_coords()
 
+        # evaluate the filter once per group type of this structure
+        compiled = self.filter.compile(structure)
+        queryGroups = compiled.get_query_groups()
+        queryAtoms = compiled.get_query_atoms()
+        targetAtoms = polymer & compiled.get_target_atoms() \
+            & ~compiled.get_prohibited_target_atoms()
+
         # create a distance box for quick lookup interactions of polymer atoms
         # of the specified elements
         box = DistanceBox(self.filter.get_distance_cutoff())
-        for i in range(arrays.get_num_atoms()):
-
-            if polymer[i] \
-                and self.filter.is_target_group(groupNames[i]) \
-                and self.filter.is_target_atom_name(atomNames[i]) \
-                and self.filter.is_target_element(elements[i]) \
-                and not self.filter.is_prohibited_target_group(groupNames[i]):
-
-                newPoint = np.array([x[i],y[i],z[i]])
-                box.add_point(newPoint, i)
+        for i in np.flatnonzero(targetAtoms):
+            newPoint = np.array([x[i],y[i],z[i]])
+            box.add_point(newPoint, i)
 
         groupToAtomIndices = arrays.get_group_to_atom_indices()
 
@@ -75,15 +75,14 @@ class LigandInteractionFingerprint(object):
 
             # the specified filter conditions (some groups may be excluded,
             # e.g. water)
-            if self.filter.is_query_group(groupNames[start]):
+            if queryGroups[g]:
 
                 print(groupNames[start])
                 # create list of atoms that interact within the cutoff distance
                 neighbors = []
                 for a in range(start,end):
 
-                    if self.filter.is_query_atom_name(atomNames[a]) \
-                        and self.filter.is_query_element(elements[a]):
+                    if queryAtoms[a]:
 
                         p = np.array([x[a], y[a], z[a]])
 
@@ -0,0 +1,395 @@
+#!/user/bin/env python
+'''polarInteractionExtractor.py
+
+Creates datasets of hydrogen bonds and salt bridges based on geometric
+criteria. Hydrogen bond donor and acceptor atoms, and the charged atoms of
+salt bridges, are assigned from tables keyed by group and atom name. These
+assignments and the bonded heavy atoms of each atom are resolved once per
+group type of a structure. Candidate pairs are found with a single KD-tree
+query and the angle criteria are evaluated in a vectorized form.
+
+Hydrogen bonds are identified from heavy atom positions only (hydrogen atoms
+are not required):
+- the donor-acceptor distance is less than or equal to the distance cutoff
+- the angles between the heavy atoms bonded to the donor, the donor, and the
+  acceptor are at least the angle cutoff
+- the angles between the donor, the acceptor, and the heavy atoms bonded to
+  the acceptor are at least the angle cutoff
+
+Atoms of groups that are not in the tables (e.g., ligands) are treated as
+both donors and acceptors if they are nitrogen or oxygen atoms.
+
+References
+----------
+- I. K. McDonald & J. M. Thornton (1994) Satisfying hydrogen bonding potential
+  in proteins, J Mol Biol 238, 777-793. https://doi.org/10.1006/jmbi.1994.1334
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import math
+import numpy as np
+from scipy.spatial import cKDTree
+from pyspark.sql import Row, SparkSession
+from mmtfPyspark.utils import ColumnarStructure
+from mmtfPyspark.interactions.interaction_extractor import InteractionExtractor
+
+_AMINO_ACIDS = ['ALA', 'ARG', 'ASN', 'ASP', 'CYS', 'GLN', 'GLU', 'GLY', 'HIS', 'ILE',
+                'LEU', 'LYS', 'MET', 'PHE', 'PRO', 'SER', 'THR', 'TRP', 'TYR', 'VAL']
+_NUCLEOTIDES = ['A', 'C', 'G', 'U', 'DA', 'DC', 'DG', 'DT']
+
+# side chain (and nucleobase) donors and acceptors
+_DONORS = {'ARG': {'NE', 'NH1', 'NH2'}, 'ASN': {'ND2'}, 'CYS': {'SG'}, 'GLN': {'NE2'},
+           'HIS': {'ND1', 'NE2'}, 'LYS': {'NZ'}, 'SER': {'OG'}, 'THR': {'OG1'},
+           'TRP': {'NE1'}, 'TYR': {'OH'},
+           'A': {'N6'}, 'C': {'N4'}, 'G': {'N1', 'N2'}, 'U': {'N3'},
+           'DA': {'N6'}, 'DC': {'N4'}, 'DG': {'N1', 'N2'}, 'DT': {'N3'},
+           'HOH': {'O'}}
+_ACCEPTORS = {'ASN': {'OD1'}, 'ASP': {'OD1', 'OD2'}, 'CYS': {'SG'}, 'GLN': {'OE1'},
+              'GLU': {'OE1', 'OE2'}, 'HIS': {'ND1', 'NE2'}, 'MET': {'SD'}, 'SER': {'OG'},
+              'THR': {'OG1'}, 'TYR': {'OH'},
+              'A': {'N1', 'N3', 'N7'}, 'C': {'O2', 'N3'}, 'G': {'O6', 'N3', 'N7'}, 'U': {'O2', 'O4'},
+              'DA': {'N1', 'N3', 'N7'}, 'DC': {'O2', 'N3'}, 'DG': {'O6', 'N3', 'N7'}, 'DT': {'O2', 'O4'},
+              'HOH': {'O'}}
+
+# backbone donors and acceptors
+for _name in _AMINO_ACIDS:
+    if _name != 'PRO':
+        _DONORS.setdefault(_name, set()).add('N')
+    _ACCEPTORS.setdefault(_name, set()).update({'O', 'OXT'})
+for _name in _NUCLEOTIDES:
+    _ACCEPTORS[_name].update({'OP1', 'OP2', "O3'", "O4'", "O5'"})
+    if not _name.startswith('D'):
+        _DONORS[_name].add("O2'")
+        _ACCEPTORS[_name].add("O2'")
+
+# charged atoms of salt bridges
+_POSITIVE = {'ARG': {'NE', 'NH1', 'NH2'}, 'HIS': {'ND1', 'NE2'}, 'LYS': {'NZ'}}
+_NEGATIVE = {'ASP': {'OD1', 'OD2'}, 'GLU': {'OE1', 'OE2'}}
+
+# maximum number of bonded heavy atoms used for angle criteria
+MAX_BONDED_ATOMS = 4
+
+
+class PolarInteractionExtractor(object):
+
+    @staticmethod
+    def get_hydrogen_bonds(structures, distance_cutoff=3.5, angle_cutoff=90.0, inter=True, intra=True,
+                           level='group'):
+        '''Returns a dataset of hydrogen bonds. The donor is the query and the
+        acceptor is the target of an interaction. The dataset contains the
+        same columns as InteractionExtractor.get_polymer_interactions for the
+        specified level. The sequenceIndex is -1 for non-polymer groups.
+
+        Parameters
+        ----------
+        structures : PythonRDD
+           a set of PDB structures
+        distance_cutoff : float
+           maximum donor-acceptor distance [3.5]
+        angle_cutoff : float
+           minimum angle in degrees at the donor and acceptor atoms [90.0]
+        inter : bool
+           calculate inter-chain hydrogen bonds [True]
+        intra : bool
+           calculate intra-chain hydrogen bonds [True]
+        level : str
+           'chain', 'group' or 'atom' to aggregate results ['group']
+
+        Returns
+        -------
+        dataset
+           dataset with hydrogen bonds
+        '''
+
+        rows = structures.flatMap(HydrogenBondFingerprint(distance_cutoff, angle_cutoff, inter, intra, level))
+
+        spark = SparkSession.builder.getOrCreate()
+        schema = InteractionExtractor._get_schema(level)
+        return spark.createDataFrame(rows, schema)
+
+    @staticmethod
+    def get_salt_bridges(structures, distance_cutoff=4.0, inter=True, intra=True, level='group'):
+        '''Returns a dataset of salt bridges between the side chains of
+        positively (ARG, HIS, LYS) and negatively (ASP, GLU) charged amino
+        acids. The positive group is the query and the negative group is the
+        target of an interaction. The dataset contains the same columns as
+        InteractionExtractor.get_polymer_interactions for the specified level.
+
+        Parameters
+        ----------
+        structures : PythonRDD
+           a set of PDB structures
+        distance_cutoff : float
+           maximum distance between charged atoms [4.0]
+        inter : bool
+           calculate inter-chain salt bridges [True]
+        intra : bool
+           calculate intra-chain salt bridges [True]
+        level : str
+           'chain', 'group' or 'atom' to aggregate results ['group']
+
+        Returns
+        -------
+        dataset
+           dataset with salt bridges
+        '''
+
+        rows = structures.flatMap(SaltBridgeFingerprint(distance_cutoff, inter, intra, level))
+
+        spark = SparkSession.builder.getOrCreate()
+        schema = InteractionExtractor._get_schema(level)
+        return spark.createDataFrame(rows, schema)
+
+
+class PolarAtoms(object):
+    '''Donor, acceptor, and charged atoms and their bonded heavy atoms in the
+    first model of a structure. The atom types are resolved once per group type.
+
+    Attributes
+    ----------
+    structure : mmtfStructure
+       mmtf structure
+    '''
+
+    def __init__(self, structure):
+        self.arrays = ColumnarStructure(structure, True)
+        arrays = self.arrays
+        group_list = structure.group_list
+
+        donor, acceptor, positive, negative, bonded = [], [], [], [], []
+        for group in group_list:
+            d, a, p, n, b = _resolve_group_type(group)
+            donor.append(d)
+            acceptor.append(a)
+            positive.append(p)
+            negative.append(n)
+            bonded.append(b)
+
+        # map each atom onto its slot in the flattened group list
+        atom_to_group = arrays.get_atom_to_group_indices()
+        group_to_atom = arrays.get_group_to_atom_indices()
+        group_types = np.asarray(arrays.get_group_types()[:arrays.get_num_groups()], dtype=np.int64)
+
+        atoms_per_type = np.array([len(group['atomNameList']) for group in group_list], dtype=np.int64)
+        type_offsets = np.cumsum(atoms_per_type) - atoms_per_type
+
+        local = np.arange(arrays.get_num_atoms()) - group_to_atom[atom_to_group]
+        slots = type_offsets[group_types[atom_to_group]] + local
+
+        self.donors = np.concatenate(donor)[slots]
+        self.acceptors = np.concatenate(acceptor)[slots]
+        self.positive = np.concatenate(positive)[slots]
+        self.negative = np.concatenate(negative)[slots]
+
+        # bonded heavy atoms as atom indices, -1 if not present
+        bonded = np.concatenate(bonded)[slots]
+        group_start = (np.arange(arrays.get_num_atoms()) - local)[:, None]
+        self.bonded_atoms = np.where(bonded >= 0, group_start + bonded, -1)
+
+        self.coords = np.stack((arrays.get_x_coords(), arrays.get_y_coords(), arrays.get_z_coords()), axis=-1)
+
+    def get_hydrogen_bonds(self, distance_cutoff, angle_cutoff):
+        '''Returns hydrogen bonds as arrays of donor atom indices, acceptor
+        atom indices, and donor-acceptor distances.
+        '''
+
+        donors = np.flatnonzero(self.donors)
+        acceptors = np.flatnonzero(self.acceptors)
+        donor, acceptor, distance = self._get_pairs(donors, acceptors, distance_cutoff)
+
+        cos_cutoff = math.cos(math.radians(angle_cutoff))
+        valid = _check_angles(self.coords, self.bonded_atoms, donor, acceptor, cos_cutoff) \
+            & _check_angles(self.coords, self.bonded_atoms, acceptor, donor, cos_cutoff)
+
+        return donor[valid], acceptor[valid], distance[valid]
+
+    def get_salt_bridges(self, distance_cutoff):
+        '''Returns salt bridges as arrays of positive atom indices, negative
+        atom indices, and distances.
+        '''
+
+        return self._get_pairs(np.flatnonzero(self.positive), np.flatnonzero(self.negative), distance_cutoff)
+
+    def _get_pairs(self, query, target, distance_cutoff):
+        '''Returns pairs of query and target atoms in different groups within
+        the distance cutoff.
+        '''
+
+        empty = np.zeros(0, dtype=np.int64)
+        if len(query) == 0 or len(target) == 0:
+            return empty, empty, np.zeros(0)
+
+        query_tree = cKDTree(self.coords[query])
+        target_tree = cKDTree(self.coords[target])
+        sparse_dm = query_tree.sparse_distance_matrix(target_tree, distance_cutoff, output_type='ndarray')
+
+        q = query[sparse_dm['i']]
+        t = target[sparse_dm['j']]
+        atom_to_group = self.arrays.get_atom_to_group_indices()
+        different = atom_to_group[q] != atom_to_group[t]
+
+        return q[different], t[different], sparse_dm['v'][different]
+
+
+class HydrogenBondFingerprint(object):
+
+    def __init__(self, distance_cutoff=3.5, angle_cutoff=90.0, inter=True, intra=True, level='group'):
+        self.distance_cutoff = distance_cutoff
+        self.angle_cutoff = angle_cutoff
+        self.inter = inter
+        self.intra = intra
+        self.level = level
+
+    def __call__(self, t):
+        atoms = PolarAtoms(t[1])
+        donor, acceptor, distance = atoms.get_hydrogen_bonds(self.distance_cutoff, self.angle_cutoff)
+
+        return _get_rows(t[0], t[1], atoms.arrays, donor, acceptor, distance,
+                         self.inter, self.intra, self.level)
+
+
+class SaltBridgeFingerprint(object):
+
+    def __init__(self, distance_cutoff=4.0, inter=True, intra=True, level='group'):
+        self.distance_cutoff = distance_cutoff
+        self.inter = inter
+        self.intra = intra
+        self.level = level
+
+    def __call__(self, t):
+        atoms = PolarAtoms(t[1])
+        positive, negative, distance = atoms.get_salt_bridges(self.distance_cutoff)
+
+        return _get_rows(t[0], t[1], atoms.arrays, positive, negative, distance,
+                         self.inter, self.intra, self.level)
+
+
+def _resolve_group_type(group):
+    '''Returns donor, acceptor, positive, and negative masks and the local
+    indices of bonded heavy atoms for the atoms of a group type.
+    '''
+
+    name = group['groupName']
+    atom_names = group['atomNameList']
+    elements = group['elementList']
+
+    if name in _DONORS or name in _ACCEPTORS:
+        donor = [a in _DONORS.get(name, ()) for a in atom_names]
+        acceptor = [a in _ACCEPTORS.get(name, ()) for a in atom_names]
+    else:
+        donor = [e in ('N', 'O') for e in elements]
+        acceptor = donor
+
+    positive = [a in _POSITIVE.get(name, ()) for a in atom_names]
+    negative = [a in _NEGATIVE.get(name, ()) for a in atom_names]
+
+    heavy = [e not in ('H', 'D') for e in elements]
+    bonded = np.full((len(atom_names), MAX_BONDED_ATOMS), -1, dtype=np.int64)
+    counts = np.zeros(len(atom_names), dtype=np.int64)
+    bonds = group['bondAtomList']
+    for b in range(0, len(bonds), 2):
+        i, j = bonds[b], bonds[b + 1]
+        if heavy[j] and counts[i] < MAX_BONDED_ATOMS:
+            bonded[i, counts[i]] = j
+            counts[i] += 1
+        if heavy[i] and counts[j] < MAX_BONDED_ATOMS:
+            bonded[j, counts[j]] = i
+            counts[j] += 1
+
+    return np.array(donor, dtype=bool), np.array(acceptor, dtype=bool), \
+        np.array(positive, dtype=bool), np.array(negative, dtype=bool), bonded
+
+
+def _check_angles(coords, bonded_atoms, center, partner, cos_cutoff):
+    '''Returns True for pairs where all angles between the bonded heavy atoms
+    of the center atom, the center atom, and the partner atom are at least
+    the angle cutoff.
+    '''
+
+    bonded = bonded_atoms[center]
+    present = bonded >= 0
+
+    v1 = coords[np.where(present, bonded, 0)] - coords[center][:, None, :]
+    v2 = coords[partner] - coords[center]
+
+    cos = np.einsum('nkj,nj->nk', v1, v2) \
+        / (np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)[:, None])
+
+    return ((cos <= cos_cutoff) | ~present).all(axis=1)
+
+
+def _get_rows(structure_id, structure, arrays, query, target, distance, inter, intra, level):
+    '''Returns rows in the format of InteractionExtractor for the given query
+    and target atom pairs.
+    '''
+
+    chain_names = arrays.get_chain_names()
+
+    same_chain = chain_names[query] == chain_names[target]
+    selected = (same_chain & intra) | (~same_chain & inter)
+    query, target, distance = query[selected], target[selected], distance[selected]
+
+    if len(query) == 0:
+        return []
+
+    group_names = arrays.get_group_names()
+    group_numbers = arrays.get_group_numbers()
+    atom_names = arrays.get_atom_names()
+    entity_indices = arrays.get_entity_indices()
+    sequence_positions = arrays.get_sequence_positions()
+
+    # aggregate the pairs at the chain or group level
+    if level == 'chain':
+        atom_to_group = arrays.get_atom_to_group_indices()
+        _, chain_indices = np.unique(chain_names.astype(str), return_inverse=True)
+        keys = np.stack((atom_to_group[query], chain_indices[target]), axis=-1)
+        _, unique = np.unique(keys, axis=0, return_index=True)
+        query, target = query[unique], target[unique]
+    elif level == 'group':
+        atom_to_group = arrays.get_atom_to_group_indices()
+        keys = np.stack((atom_to_group[query], atom_to_group[target]), axis=-1)
+        _, unique = np.unique(keys, axis=0, return_index=True)
+        query, target = query[unique], target[unique]
+
+    rows = []
+    for n in range(len(query)):
+        i = query[n]
+        j = target[n]
+
+        if level == 'chain':
+            rows.append(Row(structure_id + "." + chain_names[j],  # structureChainId
+                            group_names[i],  # queryGroupId
+                            chain_names[i],  # queryChainId
+                            group_numbers[i],  # queryGroupNumber
+                            chain_names[j]  # targetChainId
+                            ))
+        elif level == 'group':
+            rows.append(Row(structure_id + "." + chain_names[j],  # structureChainId
+                            group_names[i],  # queryGroupId
+                            chain_names[i],  # queryChainId
+                            group_numbers[i],  # queryGroupNumber
+                            group_names[j],  # targetGroupId
+                            chain_names[j],  # targetChainId
+                            group_numbers[j],  # targetGroupNumber
+                            sequence_positions[j].item(),  # sequenceIndex
+                            structure.entity_list[entity_indices[j]]['sequence']  # sequence
+                            ))
+        elif level == 'atom':
+            rows.append(Row(structure_id + "." + chain_names[j],  # structureChainId
+                            group_names[i],  # queryGroupId
+                            chain_names[i],  # queryChainId
+                            group_numbers[i],  # queryGroupNumber
+                            atom_names[i],  # queryAtomName
+                            group_names[j],  # targetGroupId
+                            chain_names[j],  # targetChainId
+                            group_numbers[j],  # targetGroupNumber
+                            atom_names[j],  # targetAtomName
+                            distance[n].item(),  # distance
+                            sequence_positions[j].item(),  # sequenceIndex
+                            structure.entity_list[entity_indices[j]]['sequence']  # sequence
+                            ))
+
+    return rows
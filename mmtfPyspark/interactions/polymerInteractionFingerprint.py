@@ -47,23 +47,24 @@ class PolymerInteractionFingerprint(object):
         y = arrays.get_y_coords()
         z = arrays.get_z_coords()
 
+        # evaluate the filter once per group type of this structure
+        compiled = self.filter.compile(structure)
+        queryAtoms = compiled.get_query_atoms()
+        targetAtoms = compiled.get_target_atoms()
+        candidates = polymer & (queryAtoms | targetAtoms) \
+            & ~compiled.get_prohibited_target_atoms()
+
         # create a distance box for quick lookup interactions of polymer atoms
         # of the specified elements
         boxes = {}
-        for i in range(arrays.get_num_atoms()):
-
-            if polymer[i] \
-                and (self.filter.is_target_group(groupNames[i]) or self.filter.is_query_group(groupNames[i])) \
-                and (self.filter.is_target_atom_name(atomNames[i]) or self.filter.is_query_atom_name(atomNames[i])) \
-                and (self.filter.is_target_element(elements[i]) or self.filter_is_query_element_name(elements[i])) \
-                and not self.filter.is_prohibited_target_group(groupNames[i]):
+        for i in np.flatnonzero(candidates):
 
-                if chainNames[i] not in boxes:
-                    box = DistanceBox(self.filter.get_distance_cutoff())
-                    boxes[chainNames[i]] = box
+            if chainNames[i] not in boxes:
+                box = DistanceBox(self.filter.get_distance_cutoff())
+                boxes[chainNames[i]] = box
 
-                newPoint = np.array([x[i],y[i],z[i]])
-                boxes[chainNames[i]].add_point(newPoint,i)
+            newPoint = np.array([x[i],y[i],z[i]])
+            boxes[chainNames[i]].add_point(newPoint,i)
 
         chainBoxes = [(k,v) for k,v in boxes.items()]
 
@@ -99,22 +100,12 @@ class PolymerInteractionFingerprint(object):
                         dSq = dx * dx + dy * dy + dz * dz
 
                         if dSq <= cutoffDistanceSquared:
-                            if self.filter.is_target_group(groupNames[n]) \
-                                and self.filter.is_target_atom_name(atomNames[n]) \
-                                and self.filter.is_target_element(elements[n]) \
-                                and self.filter.is_query_group(groupNames[m]) \
-                                and self.filter.is_query_atom_name(atomNames[m]) \
-                                and self.filter.is_query_element(elements[m]):
+                            if targetAtoms[n] and queryAtoms[m]:
 
                                 entityIndexI = entityIndices[n]
                                 indicesI[sequenceMapIndices[n]] = groupNumbers[n]
 
-                            if self.filter.is_target_group(groupNames[m]) \
-                                and self.filter.is_target_atom_name(atomNames[m]) \
-                                and self.filter.is_target_element(elements[m]) \
-                                and self.filter.is_query_group(groupNames[n]) \
-                                and self.filter.is_query_atom_name(atomNames[n]) \
-                                and self.filter.is_query_element(elements[n]):
+                            if targetAtoms[m] and queryAtoms[n]:
 
                                 entityIndexJ = entityIndices[m]
                                 indicesJ[sequenceMapIndices[m]] = groupNumbers[m]
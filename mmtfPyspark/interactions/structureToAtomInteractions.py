@@ -39,19 +39,25 @@ class StructureToAtomInteractions(object):
         interactions = []
         structureId = t[0]
 
+        # evaluate the filter once per group type of this structure
+        compiled = self.filter.compile(t[1])
+        if not compiled.has_query_atoms():
+            return interactions
+
         # convert structure to an array-based format for efficient processing
         arrays = ColumnarStructureX(t[1], True)
 
         # create a list of query atoms for which interactions should be calculated
-        queryAtomIndices = self._get_query_atom_indices(arrays)
+        queryAtomIndices = self._get_query_atom_indices(arrays, compiled)
 
         if len(queryAtomIndices) == 0:
             return interactions
 
         # Add atom (indices) on grid for rapid indexing of atom neighbors on a
         # grid based on a cutoff distance
-        box = self._get_distance_box(arrays)
+        box = self._get_distance_box(arrays, compiled)
 
+        accepted = []
         for queryAtomIndex in queryAtomIndices:
             # find interactions of query atom specified by atom index
             interaction = self._get_interactions(arrays, queryAtomIndex, box)
@@ -60,15 +66,21 @@ class StructureToAtomInteractions(object):
             # only add interations that are within the given limits of interations
             if interaction.get_num_interactions() >= self.filter.get_min_interactions() \
                     and interaction.get_num_interactions() <= self.filter.get_max_interactions():
-
-                # return interactions as either pairs or all interaction of
-                # one atom as a row
-                if self.pairwise:
-                    interactions += interaction.get_pair_interactions_as_rows()
-                else:
-                    multiInteract = interaction.get_multiple_interactions_as_row(
-                        self.filter.get_max_interactions())
-                    interactions += multiInteract
+                accepted.append(interaction)
+
+        # return interactions as either pairs or all interaction of
+        # one atom as a row
+        if self.pairwise:
+            for interaction in accepted:
+                interactions += interaction.get_pair_interactions_as_rows()
+        else:
+            # calculate the coordination geometry of all query atoms at once
+            maxInteractions = self.filter.get_max_interactions()
+            AtomInteraction.calc_coordination_geometries(accepted, maxInteractions)
+
+            for interaction in accepted:
+                multiInteract = interaction.get_multiple_interactions_as_row(maxInteractions)
+                interactions += multiInteract
 
         return interactions
 
@@ -156,7 +168,7 @@ class StructureToAtomInteractions(object):
 
         return interaction
 
-    def _get_distance_box(self, arrays):
+    def _get_distance_box(self, arrays, compiled):
         '''Add atom indices on grid for rapid indexing of atom neighbors on a
         grid based on a cutoff distance
 
@@ -164,53 +176,44 @@ class StructureToAtomInteractions(object):
         ----------
         arrays : columnarStructure
            structure in columnarStructure format
+        compiled : CompiledInteractionFilter
+           filter compiled for this structure
         '''
 
         # Get required data
         x = arrays.get_x_coords()
         y = arrays.get_y_coords()
         z = arrays.get_z_coords()
-        elements = arrays.get_elements()
-        groupNames = arrays.get_group_names()
 
         box = DistanceBox(self.filter.get_distance_cutoff())
-        for i in range(arrays.get_num_atoms()):
-            if self.filter.is_target_group(groupNames[i]) \
-                    and self.filter.is_target_element(elements[i]):
-
-                newPoint = np.array([x[i], y[i], z[i]])
-                box.add_point(newPoint, i)
+        for i in np.flatnonzero(compiled.get_target_atoms()):
+            newPoint = np.array([x[i], y[i], z[i]])
+            box.add_point(newPoint, i)
 
         return box
 
-    def _get_query_atom_indices(self, arrays):
+    def _get_query_atom_indices(self, arrays, compiled):
         '''Returns a list of indices to query atoms in the structure
 
         Parameters
         ----------
         arrays : columnarStructure
            structure in columnarStructure format
+        compiled : CompiledInteractionFilter
+           filter compiled for this structure
         '''
 
+        query = compiled.get_query_atoms()
+        if not query.any():
+            return []
+
         # Get required data
-        groupNames = arrays.get_group_names()
-        elements = arrays.get_elements()
-        groupStartIndices = arrays.get_group_to_atom_indices()
         occupancies = arrays.get_occupancies()
-        normalizedbFactors = arrays.get_normalized_b_factors()
+        normalizedbFactors = np.asarray(arrays.get_normalized_b_factors())
 
         # Find atoms that match the query criteria and exlcued atoms with
         # partial occupancy
-        indices = []
-        for i in range(arrays.get_num_groups()):
-
-            start = groupStartIndices[i]
-            end = groupStartIndices[i + 1]
-
-            if self.filter.is_query_group(groupNames[start]):
-                indices += [j for j in range(start, end)
-                            if self.filter.is_query_element(elements[j])
-                            and normalizedbFactors[j] < self.filter.get_normalized_b_factor_cutoff()
-                            and occupancies[j] >= 1.0]
+        query = query & (normalizedbFactors < self.filter.get_normalized_b_factor_cutoff()) \
+            & (occupancies >= 1.0)
 
-        return indices
+        return np.flatnonzero(query).tolist()
@@ -19,6 +19,7 @@ import os
 # import msgpack
 import gzip
 from mmtfPyspark.utils import MmtfStructure
+from mmtfPyspark.filters import FilterPipeline
 from mmtf.api import default_api
 from os import path, walk
 from pyspark.sql import SparkSession
@@ -30,7 +31,7 @@ text = "org.apache.hadoop.io.Text"
 byteWritable = "org.apache.hadoop.io.BytesWritable"
 
 
-def read_full_sequence_file(pdbId=None, first_model=False, fraction=None, seed=123):
+def read_full_sequence_file(pdbId=None, first_model=False, fraction=None, seed=123, filters=None):
     '''Reads a MMTF-Hadoop Sequence file using the default file location.
     The default file location is determined by :func:`get_mmtf_full_path() <mmtfPyspark.io.mmtfReader.get_mmtf_full_path>`
 
@@ -44,11 +45,13 @@ def read_full_sequence_file(pdbId=None, first_model=False, fraction=None, seed=1
        fraction of structure to read
     seed : int, optional
        random seed
+    filters : filter, optional
+       filter or FilterPipeline applied before structures are fully decoded
     '''
-    return read_sequence_file(get_mmtf_full_path(), pdbId, first_model, fraction, seed)
+    return read_sequence_file(get_mmtf_full_path(), pdbId, first_model, fraction, seed, filters)
 
 
-def read_reduced_sequence_file(pdbId=None, first_model=False, fraction=None, seed=123):
+def read_reduced_sequence_file(pdbId=None, first_model=False, fraction=None, seed=123, filters=None):
     '''Reads a MMTF-Hadoop Sequence file using the default file location.
     The default file location is determined by :func:`get_mmtf_reduced_path()
     <mmtfPyspark.io.mmtfReader.get_mmtf_reducedget_mmtf_reduced_path>`
@@ -63,11 +66,13 @@ def read_reduced_sequence_file(pdbId=None, first_model=False, fraction=None, see
        fraction of structure to read
     seed : int, optional
        random seed
+    filters : filter, optional
+       filter or FilterPipeline applied before structures are fully decoded
     '''
-    return read_sequence_file(get_mmtf_reduced_path(), pdbId, first_model, fraction, seed)
+    return read_sequence_file(get_mmtf_reduced_path(), pdbId, first_model, fraction, seed, filters)
 
 
-def read_sequence_file(path, pdbId=None, first_model=False, fraction=None, seed=123):
+def read_sequence_file(path, pdbId=None, first_model=False, fraction=None, seed=123, filters=None):
     '''Reads an MMTF Hadoop Sequence File. Can read all files from path,
     randomly rample a fraction, or a subset based on input list.
     See <a href="http://mmtf.rcsb.org/download.html"> for file download information</a>
@@ -82,6 +87,10 @@ def read_sequence_file(path, pdbId=None, first_model=False, fraction=None, seed=
        fraction of structure to read
     seed : int
        random seed
+    filters : filter, optional
+       filter or FilterPipeline applied before structures are fully decoded.
+       Filters that only read metadata fields are evaluated on partially
+       decoded records, see :class:`FilterPipeline <mmtfPyspark.filters.FilterPipeline>`
 
     Raises
     ------
@@ -98,30 +107,36 @@ def read_sequence_file(path, pdbId=None, first_model=False, fraction=None, seed=
 
     infiles = sc.sequenceFile(path, text, byteWritable)
 
-    # Read in all structures from a directory
-    if (pdbId == None and fraction == None):
-        return infiles.map(lambda t: _call_sequence_file(t, first_model))
-
     # Read in a specified list of pdbIds
-    elif(pdbId != None and fraction == None):
+    if (pdbId != None and fraction == None):
         pdbIdSet = set(pdbId)
-        return infiles.filter(lambda t: str(t[0]) in pdbIdSet).map(lambda t: _call_sequence_file(t, first_model))
+        infiles = infiles.filter(lambda t: str(t[0]) in pdbIdSet)
 
     # Read in a random fraction of structures from a directory
     elif (pdbId == None and fraction != None):
-        return infiles.sample(False, fraction, seed).map(lambda t: _call_sequence_file(t, first_model))
+        infiles = infiles.sample(False, fraction, seed)
 
-    else:
+    elif (pdbId != None and fraction != None):
         raise Exception("Inappropriate combination of parameters")
 
+    filters = _get_pipeline(filters)
+    structures = infiles.map(lambda t: _call_sequence_file(t, first_model, filters))
+
+    if filters is not None:
+        structures = structures.filter(lambda t: t is not None)
+
+    return structures
 
-def read_mmtf_files(path, first_model=False):
+
+def read_mmtf_files(path, first_model=False, filters=None):
     '''Read the specified PDB entries from a MMTF file
 
     Parameters
     ----------
     path : str
        Path to MMTF files
+    filters : filter, optional
+       filter or FilterPipeline applied before structures are fully decoded
 
     Returns
     -------
@@ -135,7 +150,8 @@ def read_mmtf_files(path, first_model=False):
     spark = SparkSession.builder.getOrCreate()
     sc = spark.sparkContext
 
-    return sc.parallelize(_get_files(path)).map(lambda f: _call_mmtf(f, first_model)).filter(lambda t: t is not None)
+    filters = _get_pipeline(filters)
+    return sc.parallelize(_get_files(path)).map(lambda f: _call_mmtf(f, first_model, filters)).filter(lambda t: t is not None)
 
 
 def download_mmtf_files(pdbIds, reduced=False, first_model=False):
@@ -237,7 +253,24 @@ def _get_structure(pdbId, reduced, first_model):
         print(f"ERROR: {pdbId} is not a valid pdbId")
 
 
-def _call_sequence_file(t, first_model):
+def _get_pipeline(filters):
+    '''Wraps a single filter into a FilterPipeline'''
+    if filters is None or isinstance(filters, FilterPipeline):
+        return filters
+
+    return FilterPipeline(filters)
+
+
+def _decode(name, unpack, first_model, filters):
+    '''Decodes a structure, or applies the filters and only decodes the
+    structures that pass the metadata filters'''
+    if filters is None:
+        return (name, MmtfStructure(unpack, first_model))
+
+    return filters.decode(name, unpack, first_model)
+
+
+def _call_sequence_file(t, first_model, filters=None):
     '''Call function for hadoop sequence files'''
     # TODO: check if all sequence files are gzipped
     # data = default_api.ungzip_data(t[1])
@@ -246,11 +279,10 @@ def _call_sequence_file(t, first_model):
     # return (str(t[0]), decoder)
     data = gzip.decompress(t[1])
     unpack = pd.read_msgpack(data)
-    decoder = MmtfStructure(unpack, first_model)
-    return (t[0], decoder)
+    return _decode(t[0], unpack, first_model, filters)
 
 
-def _call_mmtf(f, first_model=False):
+def _call_mmtf(f, first_model=False, filters=None):
     '''Call function for mmtf files'''
 
     if ".mmtf.gz" in f:
@@ -258,8 +290,7 @@ def _call_mmtf(f, first_model=False):
         data = gzip.open(f, 'rb')
         #unpack = msgpack.unpack(data, raw=False)
         unpack = pd.read_msgpack(data)
-        decoder = MmtfStructure(unpack, first_model)
-        return (name, decoder)
+        return _decode(name, unpack, first_model, filters)
 
     elif ".mmtf" in f:
         #name = f.split('/')[-1].split('.')[0].upper()
@@ -267,8 +298,7 @@ def _call_mmtf(f, first_model=False):
         #decoder = MmtfStructure(unpack)
         name = f.split('/')[-1].split('.')[0].upper()
         unpack = pd.read_msgpack(f)
-        decoder = MmtfStructure(unpack, first_model)
-        return (name, decoder)
+        return _decode(name, unpack, first_model, filters)
 
 
 def _get_files(user_path):
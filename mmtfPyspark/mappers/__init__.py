@@ -6,3 +6,4 @@ from .structureToSecondaryStructureElements import StructureToSecondaryStructure
 from .structureToProteinDimers import StructureToProteinDimers
 from .structureToBiopython import StructureToBiopython
 from .structureToInteractingResidues import StructureToInteractingResidues
+from .structureToSolventAccessibleSurface import StructureToSolventAccessibleSurface
@@ -1,25 +1,142 @@
 #!/user/bin/env python
 '''structureToBiopython.py:
 
-Maps a structure to BioPython Structure
+Maps a structure to a BioPython Structure. The BioPython objects are built
+directly from the decoded atom, group, and chain arrays of the structure
+using the chain to group and group to atom offsets. The atom names and
+elements of each group type in the group list are prepared once per group
+type, rather than replaying every atom through the callback methods of the
+mmtf DefaultParser.StructureDecoder.
 
 '''
 __author__ = "Mars (Shih-Cheng) Huang"
 __maintainer__ = "Mars (Shih-Cheng) Huang"
 __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
-__status__ = "Error"
-from Bio.PDB.mmtf import DefaultParser
-from mmtf.utils import decoder_utils
+__status__ = "debug"
 
-# TODO MMTFEncoder error
+import numpy as np
+from Bio.PDB.Atom import Atom
+from Bio.PDB.StructureBuilder import StructureBuilder
 
 
 class StructureToBiopython(object):
+    '''Maps a structure to a BioPython Structure. The structure can either
+    be passed as a (structureId, structure) tuple or as a value, e.g., by
+    flatMapValues.
+
+    Chains are named by their chain name (author chain id). Chains with the
+    same name in a model, e.g., polymer, ligand, and water chains, are merged
+    into a single BioPython chain, as in BioPython's own MMTF parser. The
+    copies of a chain in a bioassembly are distinguished by the index of
+    their transformation, e.g., A, A-2, A-3.
+    '''
 
     def __call__(self, t):
+        structure = t[1] if isinstance(t, tuple) else t
+
+        return _build_structure(structure)
+
+
+def _build_structure(structure):
+    '''Returns a BioPython Structure for a structure'''
+
+    builder = StructureBuilder()
+    builder.init_structure(structure.structure_id)
+    builder.init_seg(' ')
+
+    # residue names, atom names, elements, and duplicate atom names per group type
+    templates = []
+    for g in structure.group_list:
+        atom_names = [str(name) for name in g['atomNameList']]
+        elements = [str(element).upper() for element in g['elementList']]
+        templates.append((g['groupName'], atom_names, elements,
+                          len(set(atom_names)) != len(atom_names)))
+
+    # hetero flags of the chains by entity type
+    het_flags = {'polymer': ' ', 'non-polymer': 'H', 'water': 'W'}
+    chain_het_flags = ['H'] * structure.num_chains
+    for entity in structure.entity_list:
+        for index in entity['chainIndexList']:
+            if index < structure.num_chains:
+                chain_het_flags[index] = het_flags.get(entity['type'], 'H')
+
+    coords = np.column_stack((structure.x_coord_list,
+                              structure.y_coord_list,
+                              structure.z_coord_list)).astype(np.float32)
+    b_factors = np.asarray(structure.b_factor_list).tolist()
+    occupancies = np.asarray(structure.occupancy_list).tolist()
+    atom_ids = np.asarray(structure.atom_id_list).tolist()
+    alt_locs = np.asarray([a if a not in ('', '\x00') else ' ' for a in structure.alt_loc_list])
+
+    group_types = np.asarray(structure.group_type_list)
+    group_ids = np.asarray(structure.group_id_list).tolist()
+    ins_codes = [c if c not in ('', '\x00') else ' ' for c in structure.ins_code_list]
+    chain_names = [str(name) for name in structure.chain_name_list]
+
+    # copies of a chain in a bioassembly are named by their transformation
+    copy_transforms = getattr(structure, 'copy_transforms', None)
+    if copy_transforms is not None:
+        chain_names = [name if transform == 0 else name + '-' + str(transform + 1)
+                       for name, transform in zip(chain_names, copy_transforms.tolist())]
+
+    # offsets from the MMTF counts, which are also provided by chain and
+    # bioassembly views
+    model_to_chain = _get_offsets(structure.chains_per_model[:structure.num_models])
+    chain_to_group = _get_offsets(structure.groups_per_chain[:model_to_chain[-1]])
+    atoms_per_type = np.array([len(g['elementList']) for g in structure.group_list], dtype=np.int64)
+    group_to_atom = _get_offsets(atoms_per_type[group_types[:chain_to_group[-1]]])
+
+    group_types = group_types.tolist()
+    model_to_chain = model_to_chain.tolist()
+    chain_to_group = chain_to_group.tolist()
+
+    # groups with alternative locations
+    alt_loc_count = np.zeros(len(alt_locs) + 1, dtype=np.int64)
+    alt_loc_count[1:] = np.cumsum(alt_locs != ' ')
+    disordered_groups = (alt_loc_count[group_to_atom[1:]] > alt_loc_count[group_to_atom[:-1]]).tolist()
+    group_to_atom = group_to_atom.tolist()
+    alt_locs = alt_locs.tolist()
+
+    for model in range(structure.num_models):
+        builder.init_model(model)
+
+        for chain in range(model_to_chain[model], model_to_chain[model + 1]):
+            builder.init_chain(chain_names[chain])
+            het_flag = chain_het_flags[chain]
+
+            for group in range(chain_to_group[chain], chain_to_group[chain + 1]):
+                group_name, atom_names, elements, duplicate_names = templates[group_types[group]]
+                builder.init_residue(group_name, het_flag, group_ids[group], ins_codes[group])
+                residue = builder.residue
+                start = group_to_atom[group]
+
+                if disordered_groups[group] or duplicate_names or residue.is_disordered() \
+                        or len(residue) > 0:
+                    # disordered, duplicate, and redefined atoms are resolved by the StructureBuilder
+                    for atom, (name, element) in enumerate(zip(atom_names, elements), start):
+                        builder.init_atom(name, coords[atom], b_factors[atom], occupancies[atom],
+                                          alt_locs[atom], name, atom_ids[atom], element)
+                else:
+                    # add the ordered atoms of a new residue in bulk
+                    residue_id = residue.get_full_id()
+                    atoms = []
+                    for atom, (name, element) in enumerate(zip(atom_names, elements), start):
+                        a = Atom(name, coords[atom], b_factors[atom], occupancies[atom],
+                                 ' ', name, atom_ids[atom], element)
+                        a.parent = residue
+                        a.full_id = residue_id + ((name, ' '),)
+                        atoms.append(a)
+
+                    residue.child_list.extend(atoms)
+                    residue.child_dict.update(zip(atom_names, atoms))
+
+    return builder.get_structure()
 
-        parser = DefaultParser.StructureDecoder()
-        t.pass_data_on(parser)
 
-        return parser.structure_bulder.get_structure()
+def _get_offsets(counts):
+    '''Returns the start offsets of consecutive ranges of the given lengths,
+    followed by the total length'''
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    return offsets
@@ -10,12 +10,10 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "done"
 
-from mmtf.utils import *
+from mmtf.utils import decoder_utils
 from mmtf.api.mmtf_writer import MMTFEncoder
-import itertools
-from sympy import Point3D
-from mmtfPyspark.utils import DistanceBox
-import time
+from numba import njit
+from scipy.spatial import cKDTree
 import numpy as np
 import math
 
@@ -35,6 +33,9 @@ class StructureToProteinDimers(object):
        exclusive flag [False]
     '''
 
+    # bin width used to hash chain vectors in exclusive mode
+    VECTOR_TOLERANCE = 0.1
+
     def __init__(self, cutoffDistance=8.0, contacts=20,
                  useAllAtoms=False, exclusive=False):
         self.cutoffDistance = cutoffDistance
@@ -45,470 +46,248 @@ class StructureToProteinDimers(object):
     def __call__(self, t):
         structure = t[1]
 
-        # split structure into a list of chains
-        chains = self._split_to_chains(structure)
-        chainVectors = self._get_chain_vectors(chains)
-        resList = []
+        # atom and group index ranges of the L-protein chains in the first model
+        chainIndices, chainToAtomIndices, chainToGroupIndices = self._get_protein_chains(structure)
+        if len(chainIndices) < 2:
+            return []
 
+        coords = np.column_stack((np.asarray(structure.x_coord_list, dtype=np.float64),
+                                  np.asarray(structure.y_coord_list, dtype=np.float64),
+                                  np.asarray(structure.z_coord_list, dtype=np.float64)))
+
+        # atoms used to count contacts, either all atoms or C-beta atoms
         if self.useAllAtoms:
-            boxes = self._get_all_atoms_distance_boxes(
-                chains, self.cutoffDistance)
+            selected = np.ones(coords.shape[0], dtype=bool)
         else:
-            boxes = self._get_c_beta_atoms_distance_boxes(
-                chains, self.cutoffDistance)
-
-        self.exclusiveHashSet = np.empty([0, 3])
-
-        for i in range(len(chains)):
-
-            j = 0
-
-            while j < i:
-
-                if self._check_pair(boxes[i], boxes[j], chains[i], chains[j], self.cutoffDistance, self.contacts):
-
-                    if self.exclusive:
-
-                        newVec = chainVectors[i] - chainVectors[j]
-                        if not self._check_list(newVec, self.exclusiveHashSet):
-
-                            resList.append(self._combine_chains(
-                                chains[i], chains[j]))
-
-                            self.exclusiveHashSet = np.append(
-                                self.exclusiveHashSet, [newVec], axis=0)
-                    else:
-                        resList.append(self._combine_chains(
-                            chains[i], chains[j]))
-
-                j += 1
-
-        return resList
-
-    def _check_list(self, vec, exclusiveList):
-
-        for point in exclusiveList:
-
-            if np.linalg.norm(vec - point) < 0.1 and self._angle(vec, point) < 0.1:
-                return True
-            vec = vec * -1
-
-            if np.linalg.norm(vec - point) < 0.1 and self._angle(vec, point) < 0.1:
-                return True
-            vec = vec * -1
-
-        return False
-
-    def _angle(self, a, b):
-
-        arccosInput = np.dot(a, b) / np.linagl.norm(a) / np.linagl.norm(b)
-        arccosInput = 1.0 if arccosInput > 1.0 else arccosInput
-        arccosInput = -1.0 if arccosInput < -1.0 else arccosInput
-
-        return math.acos(arccosInput)
-
-    def _get_chain_vectors(self, chains):
+            selected = self._get_atom_names(structure) == 'CB'
 
         chainVectors = []
+        centers = []
+        radii = []
+        points = []
+        for c in chainIndices:
+            start = chainToAtomIndices[c]
+            end = chainToAtomIndices[c + 1]
+            chainVectors.append(coords[start:end].mean(axis=0))
+
+            p = coords[start:end][selected[start:end]]
+            points.append(p)
+            if p.shape[0] > 0:
+                center = p.mean(axis=0)
+                centers.append(center)
+                radii.append(np.sqrt(((p - center) ** 2).sum(axis=1).max()))
+            else:
+                centers.append(np.zeros(3))
+                radii.append(-np.inf)
+
+        centers = np.array(centers)
+        radii = np.array(radii)
+
+        # prefilter chain pairs by their bounding spheres
+        first, second = np.tril_indices(len(chainIndices), -1)
+        separation = np.sqrt(((centers[first] - centers[second]) ** 2).sum(axis=1))
+        candidates = separation < radii[first] + radii[second] + self.cutoffDistance
+
+        chainToEntityIndex = self._get_chain_to_entity_index(structure)
+        exclusiveHashMap = {}
+        trees = {}
+        resList = []
 
-        for chain in chains:
-
-            chainVectors.append(self._calc_average_vec(chain))
-
-        return chainVectors
-
-    def _calc_average_vec(self, s1):
-
-        totX, totY, totZ = 0, 0, 0
-
-        for i in range(s1.num_atoms):  # TODO double check num atoms
-
-            totX += s1.x_coord_list[i]
-            totY += s1.y_coord_list[i]
-            totZ += s1.z_coord_list[i]
-
-        return np.array([totX / s1.num_atoms, totY / s1.num_atoms, totZ / s1.num_atoms])
-
-    def _distance(self, s1, s2, index1, index2):
-
-        xCoord = s1.x_coord_list[index1]
-        yCoord = s1.y_coord_list[index1]
-        zCoord = s1.z_coord_list[index1]
-
-        newPoint1 = Point3D(xCoord, yCoord, zCoord)
-
-        xCoord = s2.x_coord_list[index2]
-        yCoord = s2.y_coord_list[index2]
-        zCoord = s2.z_coord_list[index2]
-
-        newPoint2 = Point3D(xCoord, yCoord, zCoord)
-
-        return newPoint1.distance(newPoint2)
-
-    def _check_pair(self, box1, box2, s1, s2, cutoffDistance, contacts):
-
-        pointsInBox2 = box1.getIntersection(box2)
-        pointsInBox1 = box2.getIntersection(box1)
-
-        hs1, hs2 = set(), set()
-
-        num = 0
-
-        for i in range(len(pointsInBox2)):
+        for i, j in zip(first[candidates], second[candidates]):
 
-            for j in range(len(pointsInBox1)):
+            if not self._check_pair(points, trees, i, j):
+                continue
 
-                if (i in hs1) or (j in hs2):
+            if self.exclusive:
+                newVec = chainVectors[i] - chainVectors[j]
+                if self._check_list(newVec, exclusiveHashMap):
                     continue
+                self._add_to_list(newVec, exclusiveHashMap)
 
-                if self._distance(s1, s2, pointsInBox2[i], pointsInBox1[j]) < cutoffDistance:
-
-                    num += 1
-                    hs1.add(i)
-                    hs2.add(j)
-
-                if num > contacts:
-                    return True
+            resList.append(self._combine_chains(structure, chainToAtomIndices, chainToGroupIndices,
+                                                chainToEntityIndex, chainIndices[i], chainIndices[j]))
 
-        return False
+        return resList
 
-    def _get_c_beta_atoms_distance_boxes(self, chains, cutoffDistance):
-        '''Get distance boxes for all atoms
+    def _check_pair(self, points, trees, i, j):
+        '''Returns True if two chains have more than the required number of
+        contacts. Each atom can participate in at most one contact.
         '''
-        distanceBoxes = []
-
-        for i in range(len(chains)):
-
-            tmp = chains[i]
-            newbox = DistanceBox(cutoffDistance)
-            groupIndex = 0
-            atomIndex = 0
-
-            for k in range(tmp.groups_per_chain[0]):
-                groupType = tmp.group_type_list[groupIndex]
-
-                for m in range(len(tmp.group_list[groupType]["formalChargeList"])):
-
-                    atomName = tmp.group_list[groupType]["atomNameList"][m]
-
-                    if atomName == "CB":
-
-                        xCoord = tmp.x_coord_list[atomIndex]
-                        yCoord = tmp.y_coord_list[atomIndex]
-                        zCoord = tmp.z_coord_list[atomIndex]
-
-                        # TODO trying numpy instead of Point3D
-                        #newPoint = Point3D(xCoord, yCoord, zCoord)
-                        newPoint = np.array([xCoord, yCoord, zCoord])
-
-                        newbox.add_point(newPoint, atomIndex)
+        for k in (i, j):
+            if k not in trees:
+                trees[k] = cKDTree(points[k])
 
-                    atomIndex += 1
+        pairs = trees[i].sparse_distance_matrix(trees[j], max_distance=self.cutoffDistance,
+                                                output_type='ndarray')
+        pairs = pairs[pairs['v'] < self.cutoffDistance]
 
-                groupIndex += 1
+        if pairs.shape[0] <= self.contacts:
+            return False
 
-            distanceBoxes.append(newbox)
+        order = np.lexsort((pairs['j'], pairs['i']))
+        return _count_contacts(pairs['i'][order], pairs['j'][order],
+                               points[i].shape[0], points[j].shape[0], self.contacts)
 
-        return distanceBoxes
-
-    def _get_all_atoms_distance_boxes(self, chains, cutoffDistance):
-        '''Get distance boxes for all atoms
+    def _check_list(self, vec, exclusiveHashMap):
+        '''Returns True if the vector or its inverse matches a vector that
+        has already been added to the hash map.
         '''
-        distanceBoxes = []
-
-        for i in range(len(chains)):
+        for v in (vec, -vec):
+            key = np.floor(v / self.VECTOR_TOLERANCE).astype(np.int64)
 
-            tmp = chains[i]
-            newbox = DistanceBox(cutoffDistance)
+            for offset in _OFFSETS:
+                for point in exclusiveHashMap.get(tuple(key + offset), []):
+                    if np.linalg.norm(v - point) < self.VECTOR_TOLERANCE \
+                            and self._angle(v, point) < self.VECTOR_TOLERANCE:
+                        return True
 
-            for j in range(tmp.num_atoms):
-
-                xCoord = tmp.x_coord_list[j]
-                yCoord = tmp.y_coord_list[j]
-                zCoord = tmp.z_coord_list[j]
+        return False
 
-                # TODO trying numpy instead of Point3D
-                # newPoint = Point3D(xCoord, yCoord, zCoord)
-                newPoint = np.array([xCoord, yCoord, zCoord])
+    def _add_to_list(self, vec, exclusiveHashMap):
+        key = tuple(np.floor(vec / self.VECTOR_TOLERANCE).astype(np.int64))
+        exclusiveHashMap.setdefault(key, []).append(vec)
 
-                newbox.add_point(newPoint, j)
+    def _angle(self, a, b):
 
-            distanceBoxes.append(newbox)
+        arccosInput = np.dot(a, b) / np.linalg.norm(a) / np.linalg.norm(b)
+        arccosInput = 1.0 if arccosInput > 1.0 else arccosInput
+        arccosInput = -1.0 if arccosInput < -1.0 else arccosInput
 
-        return distanceBoxes
+        return math.acos(arccosInput)
 
-    def _split_to_chains(self, s):
-        '''split structure to a list of chains
+    def _get_protein_chains(self, structure):
+        '''Returns the indices of the L-protein chains in the first model and
+        the atom and group index ranges of all chains
         '''
-        chains = []
-        numChains = s.chains_per_model[0]
-
-        chainToEntityIndex = self._get_chain_to_entity_index(s)
-        atomsPerChain, bondsPerChain = self._get_num_atoms_and_bonds(s)
-
-        groupCounter = 0
-        atomCounter = 0
+        numChains = structure.chains_per_model[0]
+        groupsPerChain = np.asarray(structure.groups_per_chain[:numChains], dtype=np.int64)
+        chainToGroupIndices = np.zeros(numChains + 1, dtype=np.int64)
+        chainToGroupIndices[1:] = np.cumsum(groupsPerChain)
+        numGroups = chainToGroupIndices[-1]
+
+        groupTypes = np.asarray(structure.group_type_list[:numGroups], dtype=np.int64)
+        atomsPerType = np.array([len(g['atomNameList']) for g in structure.group_list], dtype=np.int64)
+        peptidePerType = np.array([g['chemCompType'] in ("L-PEPTIDE LINKING", "PEPTIDE LINKING")
+                                   for g in structure.group_list], dtype=bool)
+
+        groupToAtomIndices = np.zeros(numGroups + 1, dtype=np.int64)
+        groupToAtomIndices[1:] = np.cumsum(atomsPerType[groupTypes])
+        chainToAtomIndices = groupToAtomIndices[chainToGroupIndices]
+
+        # number of non-peptide groups per chain
+        nonPeptide = np.zeros(numGroups + 1, dtype=np.int64)
+        nonPeptide[1:] = np.cumsum(~peptidePerType[groupTypes])
+        nonPeptide = np.diff(nonPeptide[chainToGroupIndices])
+
+        polymer = np.zeros(numChains, dtype=bool)
+        for entity in structure.entity_list:
+            if entity['type'] == 'polymer':
+                indices = [c for c in entity['chainIndexList'] if c < numChains]
+                polymer[indices] = True
+
+        protein = polymer & (nonPeptide == 0) & (groupsPerChain > 0)
+
+        return np.flatnonzero(protein), chainToAtomIndices, chainToGroupIndices
+
+    def _get_atom_names(self, structure):
+        '''Returns an array of atom names by a lookup through the group types'''
+        names = []
+        offsets = [0]
+        for group in structure.group_list:
+            names += group['atomNameList']
+            offsets.append(len(names))
+        names = np.array(names, dtype=np.object_)
+        offsets = np.array(offsets, dtype=np.int64)
+
+        groupTypes = np.asarray(structure.group_type_list, dtype=np.int64)
+        counts = np.diff(offsets)[groupTypes]
+        groupStarts = np.repeat(np.cumsum(counts) - counts, counts)
+        slots = np.arange(counts.sum()) - groupStarts
+
+        return names[np.repeat(offsets[groupTypes], counts) + slots]
+
+    def _get_chain_id(self, s, chainIndex, entityIndex):
+        return s.structure_id + '.' + \
+            s.chain_name_list[chainIndex] + '.' + \
+            s.chain_id_list[chainIndex] + '.' + \
+            str(entityIndex + 1)
+
+    def _combine_chains(self, s, chainToAtomIndices, chainToGroupIndices, chainToEntityIndex,
+                        chain1, chain2):
+        '''Creates a new structure with the two specified chains'''
+
+        chains = (chain1, chain2)
+        numAtoms, numBonds, numGroups = 0, 0, 0
+        for c in chains:
+            numAtoms += chainToAtomIndices[c + 1] - chainToAtomIndices[c]
+            numGroups += s.groups_per_chain[c]
+            for g in range(chainToGroupIndices[c], chainToGroupIndices[c + 1]):
+                numBonds += len(s.group_list[s.group_type_list[g]]['bondOrderList'])
+
+        structureId = self._get_chain_id(s, chain1, chainToEntityIndex[chain1]) + "_append_" + \
+            self._get_chain_id(s, chain2, chainToEntityIndex[chain2])
 
-        for i in range(numChains):
-            atomMap = {}
-            newChain = MMTFEncoder()
-            entityToChainIndex = chainToEntityIndex[i]
+        combinedStructure = MMTFEncoder()
 
-            structureId = s.structure_id + '.' +\
-                s.chain_name_list[i] + '.' +\
-                s.chain_id_list[i] + '.' +\
-                str(entityToChainIndex + 1)
+        # Set header
+        combinedStructure.init_structure(int(numBonds), int(numAtoms), int(numGroups),
+                                         2, 1, structureId)
+        decoder_utils.add_xtalographic_info(s, combinedStructure)
+        decoder_utils.add_header_info(s, combinedStructure)
 
-            # Set header
-            newChain.init_structure(bondsPerChain[i],
-                                    atomsPerChain[i],
-                                    s.groups_per_chain[i],
-                                    1, 1, structureId)
-            decoder_utils.add_xtalographic_info(s, newChain)
-            decoder_utils.add_header_info(s, newChain)
+        # Set model info (only one model: 0)
+        combinedStructure.set_model_info(0, 2)
 
-            # Set model info (only one model: 0)
-            newChain.set_model_info(0, 1)
+        for n, c in enumerate(chains):
+            entityIndex = chainToEntityIndex[c]
 
             # Set entity and chain info
-            newChain.set_entity_info([0],
-                                     s.entity_list[entityToChainIndex]['sequence'],
-                                     s.entity_list[entityToChainIndex]['description'],
-                                     s.entity_list[entityToChainIndex]['type'])
+            combinedStructure.set_entity_info([n],
+                                              s.entity_list[entityIndex]['sequence'],
+                                              s.entity_list[entityIndex]['description'],
+                                              s.entity_list[entityIndex]['type'])
 
-            newChain.set_chain_info(s.chain_id_list[i],
-                                    s.chain_name_list[i],
-                                    s.groups_per_chain[i])
+            combinedStructure.set_chain_info(s.chain_id_list[c],
+                                             s.chain_name_list[c],
+                                             s.groups_per_chain[c])
 
-            for j in range(s.groups_per_chain[i]):
-                groupIndex = s.group_type_list[groupCounter]
-                # print(s.group_type_list)
+            atomCounter = chainToAtomIndices[c]
 
-                # Set group info
-                newChain.set_group_info(s.group_list[groupIndex]['groupName'],
-                                        s.group_id_list[groupCounter],
-                                        s.ins_code_list[groupCounter],
-                                        s.group_list[groupIndex]['chemCompType'],
-                                        len(s.group_list[groupIndex]
-                                            ['atomNameList']),
-                                        len(s.group_list[groupIndex]
-                                            ['bondOrderList']),
-                                        s.group_list[groupIndex]['singleLetterCode'],
-                                        s.sequence_index_list[groupCounter],
-                                        s.sec_struct_list[groupCounter])
-
-                for k in range(len(s.group_list[groupIndex]['atomNameList'])):
-                    newChain.set_atom_info(s.group_list[groupIndex]['atomNameList'][k],
-                                           s.atom_id_list[atomCounter],
-                                           s.alt_loc_list[atomCounter],
-                                           s.x_coord_list[atomCounter],
-                                           s.y_coord_list[atomCounter],
-                                           s.z_coord_list[atomCounter],
-                                           s.occupancy_list[atomCounter],
-                                           s.b_factor_list[atomCounter],
-                                           s.group_list[groupIndex]['elementList'][k],
-                                           s.group_list[groupIndex]['formalChargeList'][k])
+            for groupCounter in range(chainToGroupIndices[c], chainToGroupIndices[c + 1]):
+                group = s.group_list[s.group_type_list[groupCounter]]
 
+                # Set group info
+                combinedStructure.set_group_info(group['groupName'],
+                                                 s.group_id_list[groupCounter],
+                                                 s.ins_code_list[groupCounter],
+                                                 group['chemCompType'],
+                                                 len(group['atomNameList']),
+                                                 len(group['bondOrderList']),
+                                                 group['singleLetterCode'],
+                                                 s.sequence_index_list[groupCounter],
+                                                 s.sec_struct_list[groupCounter])
+
+                for k in range(len(group['atomNameList'])):
+                    combinedStructure.set_atom_info(group['atomNameList'][k],
+                                                    s.atom_id_list[atomCounter],
+                                                    s.alt_loc_list[atomCounter],
+                                                    s.x_coord_list[atomCounter],
+                                                    s.y_coord_list[atomCounter],
+                                                    s.z_coord_list[atomCounter],
+                                                    s.occupancy_list[atomCounter],
+                                                    s.b_factor_list[atomCounter],
+                                                    group['elementList'][k],
+                                                    group['formalChargeList'][k])
                     atomCounter += 1
 
-                for l in range(len(s.group_list[groupIndex]['bondOrderList'])):
-
-                    bondIndOne = s.group_list[groupIndex]['bondAtomList'][l * 2]
-                    bondIndTwo = s.group_list[groupIndex]['bondAtomList'][l * 2 + 1]
-                    bondOrder = s.group_list[groupIndex]['bondOrderList'][l]
-
-                    #newChain.set_group_bond(bondIndOne, bondIndTwo, bondOrder)
-                    newChain.current_group.bond_atom_list += [
-                        bondIndOne, bondIndTwo]
-                    newChain.current_group.bond_order_list.append(bondOrder)
-
-                groupCounter += 1
-
-                # TODO skipping adding inter group bond info for now
-
-            newChain.finalize_structure()
-
-            # TODO double check if just getting from chain 0
-            chain_type = [chain['type'] for chain in newChain.entity_list]
-
-            polymer = "polymer" in chain_type
-
-            if polymer:
-
-                match = True
-
-                for j in range(newChain.groups_per_chain[0]):
-
-                    #print(newChain.groups_per_chain, newChain.group_type_list)
-                    groupIndex = newChain.group_type_list[j]
-
-                    if match:
-                        _type = newChain.group_list[groupIndex]["chemCompType"]
-
-                        match = (
-                            _type == "L-PEPTIDE LINKING") or (_type == "PEPTIDE LINKING")
-
-                if match:
-                    chains.append(newChain)
-
-        return chains
-
-    def _combine_chains(self, s1, s2):
-
-        if not s1.alt_loc_set:
-            s1 = s1.set_alt_loc_list()
-        if not s2.alt_loc_set:
-            s2 = s2.set_alt_loc_list()
-
-        groupCounter = 0
-        atomCounter = 0
-
-        structureId = s1.structure_id + "_append_" + s2.structure_id
-
-        combinedStructure = MMTFEncoder()
-
-        # Set header
-        combinedStructure.init_structure(s1.num_bonds + s2.num_bonds,
-                                         s1.num_atoms + s2.num_atoms,
-                                         s1.num_groups + s2.num_groups,
-                                         2, 1, structureId)
-        decoder_utils.add_xtalographic_info(s1, combinedStructure)
-        decoder_utils.add_header_info(s1, combinedStructure)
-
-        # Set model info (only one model: 0)
-        combinedStructure.set_model_info(0, 2)
-
-        chainToEntityIndex = self._get_chain_to_entity_index(s1)[0]
-
-        # Set entity and chain info
-        combinedStructure.set_entity_info([0],
-                                          s1.entity_list[chainToEntityIndex]['sequence'],
-                                          s1.entity_list[chainToEntityIndex]['description'],
-                                          s1.entity_list[chainToEntityIndex]['type'])
-
-        combinedStructure.set_chain_info(s1.chain_id_list[0],
-                                         s1.chain_name_list[0],
-                                         s1.groups_per_chain[0])
-
-        for i in range(s1.groups_per_chain[0]):
-            groupIndex = s1.group_type_list[groupCounter]
-
-            # Set group info
-            combinedStructure.set_group_info(s1.group_list[groupIndex]['groupName'],
-                                             s1.group_id_list[groupCounter],
-                                             s1.ins_code_list[groupCounter],
-                                             s1.group_list[groupIndex]['chemCompType'],
-                                             len(s1.group_list[groupIndex]
-                                                 ['atomNameList']),
-                                             len(s1.group_list[groupIndex]
-                                                 ['bondOrderList']),
-                                             s1.group_list[groupIndex]['singleLetterCode'],
-                                             s1.sequence_index_list[groupCounter],
-                                             s1.sec_struct_list[groupCounter])
-
-            for j in range(len(s1.group_list[groupIndex]['atomNameList'])):
-                combinedStructure.set_atom_info(s1.group_list[groupIndex]['atomNameList'][j],
-                                                s1.atom_id_list[atomCounter],
-                                                s1.alt_loc_list[atomCounter],
-                                                s1.x_coord_list[atomCounter],
-                                                s1.y_coord_list[atomCounter],
-                                                s1.z_coord_list[atomCounter],
-                                                s1.occupancy_list[atomCounter],
-                                                s1.b_factor_list[atomCounter],
-                                                s1.group_list[groupIndex]['elementList'][j],
-                                                s1.group_list[groupIndex]['formalChargeList'][j])
-
-                atomCounter += 1
-
-            # TODO not sure if we should add bonds like this
-            # TODO bondAtomList == getGroupBondIndices?
-            for k in range(len(s1.group_list[groupIndex]["bondOrderList"])):
-                bondIndOne = s1.group_list[groupIndex]["bondAtomList"][k * 2]
-                bondIndTwo = s1.group_list[groupIndex]["bondAtomList"][k * 2 + 1]
-                bondOrder = s1.group_list[groupIndex]["bondOrderList"][k]
-                combinedStructure.set_group_bond(
-                    bondIndOne, bondIndTwo, bondOrder)
-
-            groupCounter += 1
-
-        # Set entity and chain info for s2
-        chainToEntityIndex = self._get_chain_to_entity_index(s2)[0]
-        combinedStructure.set_entity_info([1],
-                                          s2.entity_list[chainToEntityIndex]['sequence'],
-                                          s2.entity_list[chainToEntityIndex]['description'],
-                                          s2.entity_list[chainToEntityIndex]['type'])
-
-        combinedStructure.set_chain_info(s2.chain_id_list[0],
-                                         s2.chain_name_list[0],
-                                         s2.groups_per_chain[0])
-
-        groupCounter = 0
-        atomCounter = 0
-
-        for i in range(s2.groups_per_chain[0]):
-            groupIndex = s2.group_type_list[groupCounter]
-
-            # Set group info
-            combinedStructure.set_group_info(s2.group_list[groupIndex]['groupName'],
-                                             s2.group_id_list[groupCounter],
-                                             s2.ins_code_list[groupCounter],
-                                             s2.group_list[groupIndex]['chemCompType'],
-                                             len(s2.group_list[groupIndex]
-                                                 ['atomNameList']),
-                                             len(s2.group_list[groupIndex]
-                                                 ['bondOrderList']),
-                                             s2.group_list[groupIndex]['singleLetterCode'],
-                                             s2.sequence_index_list[groupCounter],
-                                             s2.sec_struct_list[groupCounter])
-
-            for j in range(len(s2.group_list[groupIndex]['atomNameList'])):
-                combinedStructure.set_atom_info(s2.group_list[groupIndex]['atomNameList'][j],
-                                                s2.atom_id_list[atomCounter],
-                                                s2.alt_loc_list[atomCounter],
-                                                s2.x_coord_list[atomCounter],
-                                                s2.y_coord_list[atomCounter],
-                                                s2.z_coord_list[atomCounter],
-                                                s2.occupancy_list[atomCounter],
-                                                s2.b_factor_list[atomCounter],
-                                                s2.group_list[groupIndex]['elementList'][j],
-                                                s2.group_list[groupIndex]['formalChargeList'][j])
-
-                atomCounter += 1
-
-            # TODO not sure if we should add bonds like this
-            # TODO bondAtomList == getGroupBondIndices?
-            for k in range(len(s2.group_list[groupIndex]["bondOrderList"])):
-                bondIndOne = s2.group_list[groupIndex]["bondAtomList"][k * 2]
-                bondIndTwo = s2.group_list[groupIndex]["bondAtomList"][k * 2 + 1]
-                bondOrder = s2.group_list[groupIndex]["bondOrderList"][k]
-                combinedStructure.set_group_bond(
-                    bondIndOne, bondIndTwo, bondOrder)
-
-            groupCounter += 1
+                for k in range(len(group['bondOrderList'])):
+                    combinedStructure.set_group_bond(group['bondAtomList'][k * 2],
+                                                     group['bondAtomList'][k * 2 + 1],
+                                                     group['bondOrderList'][k])
 
         combinedStructure.finalize_structure()
         return (structureId, combinedStructure)
 
-    def _get_num_atoms_and_bonds(self, structure):
-        '''Gets the number of atoms and bonds per chain
-        '''
-        numChains = structure.chains_per_model[0]
-        atomsPerChain = [0] * numChains
-        bondsPerChain = [0] * numChains
-        groupCounter = 0
-
-        for i in range(numChains):
-
-            for j in range(structure.groups_per_chain[i]):
-                groupIndex = structure.group_type_list[groupCounter]
-                atomsPerChain[i] = len(
-                    structure.group_list[groupIndex]['atomNameList'])
-                bondsPerChain[i] = len(
-                    structure.group_list[groupIndex]['bondOrderList'])
-                groupCounter += 1
-
-        return atomsPerChain, bondsPerChain
-
     def _get_chain_to_entity_index(self, structure):
         '''Returns an list that maps a chain index to an entity index.
 
@@ -521,6 +300,38 @@ class StructureToProteinDimers(object):
         for i in range(len(structure.entity_list)):
 
             for j in structure.entity_list[i]["chainIndexList"]:
-                entityChainIndex[j] = i
+                if j < structure.num_chains:
+                    entityChainIndex[j] = i
 
         return entityChainIndex
+
+
+# offsets to the 27 neighboring bins of a hashed vector
+_OFFSETS = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)],
+                    dtype=np.int64)
+
+
+@njit
+def _count_contacts(pairs1, pairs2, n1, n2, contacts):
+    '''Greedily assigns contacts between two atom sets, such that each atom
+    participates in at most one contact. Returns True if the number of
+    contacts exceeds the specified limit.
+    '''
+    used1 = np.zeros(n1, dtype=np.bool_)
+    used2 = np.zeros(n2, dtype=np.bool_)
+    num = 0
+
+    for k in range(pairs1.shape[0]):
+        a = pairs1[k]
+        b = pairs2[k]
+        if used1[a] or used2[b]:
+            continue
+
+        used1[a] = True
+        used2[b] = True
+        num += 1
+
+        if num > contacts:
+            return True
+
+    return False
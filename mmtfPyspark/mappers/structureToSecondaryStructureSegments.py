@@ -1,7 +1,9 @@
 #!/user/bin/env python
 '''structureToSecondaryStructureSegments.py:
 
-Maps chain seuqnce to its sequence segments
+Maps chain seuqnce to its sequence segments. The segments are taken from a
+strided view of the sequence, and segments with undefined center labels are
+removed with a mask.
 
 '''
 __author__ = "Mars (Shih-Cheng) Huang"
@@ -9,6 +11,7 @@ __maintainer__ = "Mars (Shih-Cheng) Huang"
 __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "done"
+import numpy as np
 from pyspark.sql import Row
 
 
@@ -34,17 +37,21 @@ class StructureToSecondaryStructureSegments(object):
         dsspQ8 = t[5]
 
         numSegments = max(0, len(sequence) - self.length)
-        sequences = []
-
-        for i in range(len(sequence) - self.length):
-            currSeq = sequence[i:i + self.length]
-
-            # print(dsspQ3)
-            labelQ3 = dsspQ3[i + int(self.length / 2): i + int(self.length / 2) + 1]
-            labelQ8 = dsspQ8[i + int(self.length / 2): i + int(self.length / 2) + 1]
-
-            if (labelQ8 != "X" and labelQ3 != "X"):
-                sequences.append(
-                    Row(structureChainId, currSeq, labelQ8, labelQ3))
-
-        return sequences
+        if numSegments == 0:
+            return []
+
+        # labels of the center residues of the segments
+        center = int(self.length / 2)
+        labelsQ8 = np.frombuffer(dsspQ8.encode('ascii'), dtype='S1')[center:center + numSegments]
+        labelsQ3 = np.frombuffer(dsspQ3.encode('ascii'), dtype='S1')[center:center + numSegments]
+        indices = np.flatnonzero((labelsQ8 != b'X') & (labelsQ3 != b'X'))
+
+        # strided view of all segments of the sequence
+        segments = np.ndarray(shape=(numSegments,), dtype='S%i' % self.length,
+                              buffer=sequence.encode('ascii'), strides=(1,))
+
+        return [Row(structureChainId, currSeq, labelQ8, labelQ3)
+                for currSeq, labelQ8, labelQ3
+                in zip(segments[indices].astype(str).tolist(),
+                       labelsQ8[indices].astype(str).tolist(),
+                       labelsQ3[indices].astype(str).tolist())]
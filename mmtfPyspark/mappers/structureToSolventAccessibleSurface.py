@@ -0,0 +1,108 @@
+#!/user/bin/env python
+'''structureToSolventAccessibleSurface.py
+
+Maps a structure to the solvent accessible surface area (SASA) of its
+chains, groups, or atoms. Hydrogen atoms and water molecules are excluded
+from the calculation. For a multi-model structure, only the first model is
+considered.
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+from pyspark.sql import Row
+from mmtfPyspark.utils import SolventAccessibleSurface
+import numpy as np
+
+
+class StructureToSolventAccessibleSurface(object):
+    '''Maps a structure to rows of solvent accessible surface areas in square
+    Angstroms at the chain, group, or atom level.
+
+    The rows contain the following fields depending on the level:
+    - chain: structureChainId, sasa (summed over all chains with the same
+      chain name, e.g., a polymer chain and its bound ligands)
+    - group: structureChainId, groupName, groupNumber, sasa
+    - atom: structureChainId, groupName, groupNumber, atomName, element, sasa
+
+    Attributes
+    ----------
+    level : str
+       'chain', 'group', or 'atom' level to aggregate the surface area ['group']
+    probe_radius : float
+       radius of the solvent probe in Angstroms [1.4]
+    num_points : int
+       number of sphere points per atom [100]
+    '''
+
+    def __init__(self, level='group', probe_radius=1.4, num_points=100):
+        if level not in ('chain', 'group', 'atom'):
+            raise ValueError(f"level must be 'chain', 'group', or 'atom', but was: {level}")
+
+        self.level = level
+        self.probe_radius = probe_radius
+        self.num_points = num_points
+
+    def __call__(self, t):
+        structure_id = t[0].split('.')[0]
+        surface = SolventAccessibleSurface(t[1], self.probe_radius, self.num_points)
+        arrays = surface.arrays
+
+        if arrays.get_num_atoms() == 0:
+            return []
+
+        included = surface.get_included_atoms()
+        chain_names = arrays.get_chain_names()
+
+        if self.level == 'chain':
+            chain_to_atom = arrays.get_chain_to_atom_indices()
+            chain_sasa = surface.get_chain_sasa()
+
+            # chains without atoms or without included atoms are skipped
+            num_atoms = np.diff(chain_to_atom)
+            has_atoms = np.zeros(len(num_atoms), dtype=bool)
+            has_atoms[num_atoms > 0] = np.add.reduceat(included, chain_to_atom[:-1][num_atoms > 0]) > 0
+
+            # chains with the same chain name are aggregated into one row
+            sasa_by_name = {}
+            for i in np.flatnonzero(has_atoms):
+                chain_name = chain_names[chain_to_atom[i]]
+                sasa_by_name[chain_name] = sasa_by_name.get(chain_name, 0.0) + float(chain_sasa[i])
+
+            return [Row(structure_id + "." + chain_name,  # structureChainId
+                        sasa)  # sasa
+                    for chain_name, sasa in sasa_by_name.items()]
+
+        group_names = arrays.get_group_names()
+        group_numbers = arrays.get_group_numbers()
+
+        if self.level == 'group':
+            group_to_atom = arrays.get_group_to_atom_indices()
+            group_sasa = surface.get_group_sasa()
+
+            # groups without atoms or without included atoms are skipped
+            num_atoms = np.diff(group_to_atom)
+            has_atoms = np.zeros(len(num_atoms), dtype=bool)
+            has_atoms[num_atoms > 0] = np.add.reduceat(included, group_to_atom[:-1][num_atoms > 0]) > 0
+
+            rows = []
+            for i in np.flatnonzero(has_atoms):
+                first = group_to_atom[i]
+                rows.append(Row(structure_id + "." + chain_names[first],  # structureChainId
+                                group_names[first],  # groupName
+                                group_numbers[first],  # groupNumber
+                                float(group_sasa[i])))  # sasa
+            return rows
+
+        atom_names = arrays.get_atom_names()
+        elements = arrays.get_elements()
+        atom_sasa = surface.get_atom_sasa()
+
+        return [Row(structure_id + "." + chain_names[i],  # structureChainId
+                    group_names[i],  # groupName
+                    group_numbers[i],  # groupNumber
+                    atom_names[i],  # atomName
+                    elements[i],  # element
+                    float(atom_sasa[i]))  # sasa
+                for i in np.flatnonzero(included)]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import shutil
+import tempfile
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.datasets import groupNameIndex
+from mmtfPyspark.filters import ContainsGroup
+from mmtfPyspark.mappers import StructureToPolymerChains, StructureToBioassembly
+
+
+class GroupNameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("groupNameIndexTest") \
+                                 .getOrCreate()
+
+        # 4HHB: 4 heme groups
+        # 1HV4: 8 heme groups
+        # 1STP: biotin
+        # 1J6T: phosphite in model 2 and 3
+        self.path = '../../../resources/files/'
+        self.tmp = tempfile.mkdtemp()
+
+    def test1(self):
+        path = self.tmp + '/index.parquet'
+        groupNameIndex.write(mmtfReader.read_mmtf_files(self.path), path)
+        index = groupNameIndex.read(path)
+
+        self.assertListEqual(['1HV4', '4HHB'], groupNameIndex.get_ids(index, ['HEM']))
+        self.assertListEqual(['1J6T', '1STP'], groupNameIndex.get_ids(index, ['BTN', 'PO3']))
+
+        counts = index.filter("groupName = 'HEM' AND structureId = '4HHB'").collect()
+        self.assertEqual(4, len(counts))
+        self.assertEqual(4, sum(row['count'] for row in counts))
+
+        # the filter only checks the structure ids
+        pdb = mmtfReader.read_mmtf_files(self.path, filters=ContainsGroup('HEM', index=index))
+        self.assertListEqual(['1HV4', '4HHB'], sorted(pdb.keys().collect()))
+
+    def test2(self):
+        path = self.tmp + '/index.parquet'
+        groupNameIndex.write(mmtfReader.read_mmtf_files(self.path), path)
+        index = groupNameIndex.read(path)
+
+        # all models are indexed, a chain is counted once
+        counts = index.filter("groupName = 'PO3'").collect()
+        self.assertListEqual([('1J6T', 'B', 1)], [(row.structureId, row.chainName, row['count']) for row in counts])
+
+    def test3(self):
+        path = self.tmp + '/index.parquet'
+        groupNameIndex.write(mmtfReader.read_mmtf_files(self.path), path)
+        index = groupNameIndex.read(path)
+
+        # chains and bioassemblies of indexed entries are checked for the groups
+        pdb = mmtfReader.read_mmtf_files(self.path).filter(lambda t: t[0] == '4HHB')
+        chains = pdb.flatMap(StructureToPolymerChains())
+        self.assertEqual(0, chains.filter(ContainsGroup('HEM', index=index)).count())
+        self.assertEqual(4, chains.filter(ContainsGroup('HIS', index=index)).count())
+
+        assemblies = pdb.flatMap(StructureToBioassembly()).filter(ContainsGroup('HEM', index=index))
+        self.assertListEqual(['4HHB-BioAssembly1'], assemblies.keys().collect())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
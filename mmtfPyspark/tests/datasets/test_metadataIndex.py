@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+import shutil
+import tempfile
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.datasets import metadataIndex
+from mmtfPyspark.filters import Resolution, ExperimentalMethods, ContainsLProteinChain, ContainsGroup, \
+    ContainsSequenceRegex
+
+
+class MetadataIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("metadataIndexTest") \
+                                 .getOrCreate()
+
+        # 4HHB: 1.74 A x-ray resolution
+        # 1STP: 2.6 A x-ray resolution
+        # 1HV4: 2.8 A x-ray resolution
+        # 1J6T: NMR structure
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path)
+        self.tmp = tempfile.mkdtemp()
+
+    def test1(self):
+        path = self.tmp + '/index.parquet'
+        metadataIndex.write(self.pdb, path)
+        index = metadataIndex.read(path)
+        self.assertEqual(4, index.count())
+
+        row = index.filter("structureId = '1STP'").first()
+        self.assertEqual(['A', 'A', 'A'], row.chainNames)
+        self.assertEqual(['polymer', 'non-polymer', 'water'], row.chainTypes)
+        self.assertTrue('BTN' in row.groupNames)
+
+        pdbIds = metadataIndex.get_ids(index, [Resolution(0.0, 2.7)])
+        self.assertListEqual(['1STP', '4HHB'], sorted(pdbIds))
+
+        pdbIds = metadataIndex.get_ids(index, ExperimentalMethods(ExperimentalMethods.SOLUTION_NMR))
+        self.assertListEqual(['1J6T'], pdbIds)
+
+        pdbIds = metadataIndex.get_ids(index, [ContainsLProteinChain(), ContainsGroup('HEM')])
+        self.assertListEqual(['1HV4', '4HHB'], sorted(pdbIds))
+
+        pdbIds = metadataIndex.get_ids(index, [Resolution(0.0, 2.7), ContainsGroup('BTN')])
+        self.assertListEqual(['1STP'], pdbIds)
+
+        with self.assertRaises(ValueError):
+            metadataIndex.get_ids(index, [ContainsSequenceRegex("N.[ST]")])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.datasets import residueContactMapExtractor
+
+
+class ResidueContactMapExtractorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("residueContactMapExtractorTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '4HHB')
+
+    def test_intra_chain(self):
+        contacts = residueContactMapExtractor.get_dataset(self.pdb, 'CA', 8.0)
+        self.assertEqual(4, contacts.count())
+
+        row = contacts.filter("structureChainId = '4HHB.A'").first()
+        self.assertEqual('A', row.targetChainId)
+        self.assertEqual(141, row.numRows)
+        self.assertEqual(647, row.numContacts)
+
+        matrix = residueContactMapExtractor.to_coo_matrix(row)
+        self.assertEqual((141, 141), matrix.shape)
+        self.assertEqual(2 * 647, matrix.nnz)
+
+    def test_inter_chain(self):
+        contacts = residueContactMapExtractor.get_dataset(self.pdb, 'CA', 8.0, inter_chain=True)
+        self.assertEqual(9, contacts.count())
+
+        row = contacts.filter("structureChainId = '4HHB.A' AND targetChainId = 'B'").first()
+        self.assertEqual(56, row.numContacts)
+        self.assertEqual((141, 146), residueContactMapExtractor.to_coo_matrix(row).shape)
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+import random
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.datasets import sequenceClusters
+from mmtfPyspark.filters import RepresentativeChains
+from mmtfPyspark.mappers import *
+
+
+class SequenceClustersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("sequenceClustersTest") \
+                                 .getOrCreate()
+
+        # 4HHB: human hemoglobin, chains A, C and B, D have identical sequences
+        # 1HV4: bar-headed goose hemoglobin, about 70% identical to 4HHB
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path)
+
+    def test1(self):
+        representatives = sequenceClusters.get_representative_chains(self.pdb, sequenceIdentity=90)
+
+        self.assertListEqual(['1HV4.A', '1HV4.B', '1J6T.A', '1J6T.B', '1STP.A', '4HHB.A', '4HHB.B'],
+                             representatives)
+
+    def test2(self):
+        clusters = sequenceClusters.get_dataset(self.pdb, sequenceIdentity=60)
+        rows = {row.structureChainId: row for row in clusters.collect()}
+
+        self.assertEqual(15, len(rows))
+        self.assertEqual('4HHB.A', rows['4HHB.C'].representativeChainId)
+        self.assertEqual('4HHB.A', rows['1HV4.A'].representativeChainId)
+        self.assertTrue(0.6 < rows['1HV4.A'].sequenceIdentity < 0.8)
+        self.assertEqual('4HHB.B', rows['4HHB.D'].representativeChainId)
+        self.assertEqual('4HHB.B', rows['1HV4.B'].representativeChainId)
+        self.assertTrue(0.6 < rows['1HV4.B'].sequenceIdentity < 0.8)
+        self.assertNotEqual(rows['4HHB.A'].clusterId, rows['4HHB.B'].clusterId)
+
+    def test4(self):
+        with self.assertRaises(ValueError):
+            sequenceClusters.get_dataset(self.pdb, sequenceIdentity=40)
+
+    def test3(self):
+        representatives = RepresentativeChains(self.pdb, sequenceIdentity=90)
+        chains = self.pdb.flatMap(StructureToPolymerChains()) \
+                         .filter(representatives) \
+                         .keys() \
+                         .collect()
+
+        self.assertIn('4HHB.A', chains)
+        self.assertNotIn('4HHB.C', chains)
+
+    def test5(self):
+        # S0 ... S4: each sequence is 88% identical to the previous one, with
+        # substitutions at different positions, S4 is 53% identical to S0
+        rng = random.Random(0)
+        amino_acids = 'ACDEFGHIKLMNPQRSTVWY'
+        sequence = [rng.choice(amino_acids) for _ in range(200)]
+        positions = rng.sample(range(200), 96)
+        sequences = [''.join(sequence)]
+        for k in range(4):
+            for p in positions[k * 24:(k + 1) * 24]:
+                sequence[p] = rng.choice([a for a in amino_acids if a != sequence[p]])
+            sequences.append(''.join(sequence))
+
+        # the chains are ranked by resolution: S0, S1, ..., S4
+        data = [(i, (s, [(1.0 + i / 10, 'S' + str(i) + '.A')])) for i, s in enumerate(sequences)]
+        rows = sequenceClusters._cluster_sequences(self.spark.sparkContext.parallelize(data), 85, 5, 1)
+        rows = {row[0]: row for row in rows.collect()}
+
+        # members are similar to their representative, not only to another member
+        self.assertListEqual(['S0.A', 'S0.A', 'S2.A', 'S2.A', 'S4.A'],
+                             [rows['S' + str(i) + '.A'][2] for i in range(5)])
+        self.assertTrue(all(row[3] >= 0.85 for row in rows.values()))
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
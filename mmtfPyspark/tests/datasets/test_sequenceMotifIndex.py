@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+import shutil
+import tempfile
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.datasets import sequenceMotifIndex
+from mmtfPyspark.filters import ContainsSequenceRegex
+
+
+class SequenceMotifIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("sequenceMotifIndexTest") \
+                                 .getOrCreate()
+
+        # 4HHB: hemoglobin alpha (VLS...) and beta (VHL...) chains
+        # 1HV4: hemoglobin alpha (VLS...) and beta chains
+        self.path = '../../../resources/files/'
+        self.tmp = tempfile.mkdtemp()
+
+    def test1(self):
+        self.assertListEqual(['GK'], sequenceMotifIndex.get_literals("[AG].{4}GK[ST]"))
+        self.assertListEqual(['HHHHHH'], sequenceMotifIndex.get_literals("^H{6}"))
+        self.assertListEqual(['C', 'C', 'H', 'H'], sequenceMotifIndex.get_literals("C.{2,4}C.{12}H.{3,5}H"))
+        self.assertListEqual([], sequenceMotifIndex.get_literals("AB|CD"))
+
+    def test2(self):
+        path = self.tmp + '/index'
+        sequenceMotifIndex.write(mmtfReader.read_mmtf_files(self.path), path)
+        index = sequenceMotifIndex.read(path)
+
+        hits = sequenceMotifIndex.search(index, "^VLS").collect()
+        chainIds = sorted(row.structureId + '.' + row.chainName for row in hits)
+        self.assertListEqual(['1HV4.A', '1HV4.C', '1HV4.E', '1HV4.G', '4HHB.A', '4HHB.C'], chainIds)
+
+        self.assertListEqual(['4HHB'], sequenceMotifIndex.get_ids(index, "^VHL"))
+        self.assertListEqual([], sequenceMotifIndex.get_ids(index, "C.{2,4}C.{12}H.{3,5}H"))
+
+        # the filter only checks the structure ids
+        pdb = mmtfReader.read_mmtf_files(self.path, filters=ContainsSequenceRegex("W.{7}G", index=index))
+        self.assertListEqual(['4HHB'], pdb.keys().collect())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.datasets import sequenceMotifIndex, sequenceSimilaritySearch
+from mmtfPyspark.filters import LocalSequenceSimilarity
+from mmtfPyspark.mappers import *
+from mmtfPyspark.utils.sequenceAlignment import get_local_alignment
+
+
+class SequenceSimilaritySearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("sequenceSimilaritySearchTest") \
+                                 .getOrCreate()
+
+        # 4HHB: human hemoglobin alpha (A, C) and beta (B, D) chains
+        # 1HV4: bar-headed goose hemoglobin alpha (A, C, E, G) and beta (B, D, F, H) chains
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path)
+        self.sequences = sequenceMotifIndex.get_dataset(self.pdb)
+
+        # human hemoglobin alpha
+        self.query = "VLSPADKTNVKAAWGKVGAHAGEYGAEALERMFLSFPTTKTYFPHFDLSHGSAQVKGHGKKVADALTNAVAHV" \
+                     "DDMPNALSALSDLHAHKLRVDPVNFKLLSHCLLVTLAAHLPAEFTPAVHASLDKFLASVSTVLTSKYR"
+
+    def test1(self):
+        self.assertTupleEqual((41, 0.9, 10, 0, 10, 0, 10), get_local_alignment("VLSPADKTNV", "VLSAADKTNVK"))
+
+    def test2(self):
+        hits = sequenceSimilaritySearch.get_dataset(self.sequences, {'P69905': self.query}, eValueCutoff=1e-10)
+        rows = {row.structureId + '.' + row.chainName: row for row in hits.collect()}
+
+        # alpha and beta chains
+        self.assertEqual(12, len(rows))
+        self.assertEqual(1.0, rows['4HHB.A'].sequenceIdentity)
+        self.assertEqual(141, rows['4HHB.A'].alignmentLength)
+        self.assertEqual(1, rows['4HHB.A'].queryStart)
+        self.assertEqual(141, rows['4HHB.A'].queryEnd)
+        self.assertTrue(0.6 < rows['1HV4.A'].sequenceIdentity < 0.8)
+        self.assertTrue(rows['4HHB.B'].eValue < 1e-10)
+
+    def test3(self):
+        chainIds = sequenceSimilaritySearch.get_chain_ids(self.sequences, self.query,
+                                                          eValueCutoff=1e-10, sequenceIdentityCutoff=60)
+
+        self.assertListEqual(['1HV4.A', '1HV4.C', '1HV4.E', '1HV4.G', '4HHB.A', '4HHB.C'], chainIds)
+
+    def test4(self):
+        similar = LocalSequenceSimilarity(self.sequences, self.query, eValueCutoff=1e-10,
+                                          sequenceIdentityCutoff=60)
+        chains = self.pdb.flatMap(StructureToPolymerChains()) \
+                         .filter(similar) \
+                         .keys() \
+                         .collect()
+
+        self.assertIn('4HHB.C', chains)
+        self.assertNotIn('4HHB.B', chains)
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
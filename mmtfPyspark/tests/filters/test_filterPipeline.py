@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.filters import FilterPipeline, Resolution, ContainsLProteinChain, \
+    ExperimentalMethods, NotFilter
+
+
+class FilterPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("filterPipelineTest") \
+                                 .getOrCreate()
+
+        # 4HHB: 1.74 A x-ray resolution
+        # 1STP: 2.6 A x-ray resolution
+        # 1HV4: 2.8 A x-ray resolution
+        # 1J6T: NMR structure
+        self.path = '../../../resources/files/'
+
+    def test1(self):
+        pipeline = FilterPipeline().filter(Resolution(0.0, 2.7)) \
+                                   .filter(ContainsLProteinChain())
+        self.assertListEqual(['resolution'], pipeline.get_metadata_fields())
+
+        pdb = mmtfReader.read_mmtf_files(self.path, filters=pipeline)
+        results = pdb.keys().collect()
+
+        self.assertEqual(2, len(results))
+        self.assertTrue('4HHB' in results)
+        self.assertTrue('1STP' in results)
+
+    def test2(self):
+        pipeline = FilterPipeline(NotFilter(ExperimentalMethods(ExperimentalMethods.X_RAY_DIFFRACTION)))
+
+        # the same filters applied to fully decoded structures
+        pdb = mmtfReader.read_mmtf_files(self.path)
+        results = pdb.filter(pipeline).keys().collect()
+        self.assertListEqual(['1J6T'], results)
+
+        results = mmtfReader.read_mmtf_files(self.path, filters=pipeline).keys().collect()
+        self.assertListEqual(['1J6T'], results)
+
+    def test3(self):
+        # filters are evaluated in the order of their cost
+        pipeline = FilterPipeline(ContainsLProteinChain(), Resolution(0.0, 2.7))
+
+        pdb = pipeline.apply(mmtfReader.read_mmtf_files(self.path))
+        self.assertEqual(2, pdb.count())
+
+        statistics = pipeline.get_statistics()
+        self.assertListEqual(['Resolution', 'ContainsLProteinChain'], list(statistics['filter']))
+        self.assertListEqual([4, 2], list(statistics['evaluated']))
+        self.assertListEqual([2, 2], list(statistics['passed']))
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
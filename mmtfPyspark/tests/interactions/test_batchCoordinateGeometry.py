@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+import unittest
+import numpy as np
+from mmtfPyspark.interactions import CoordinateGeometry, BatchCoordinateGeometry
+
+
+class BatchCoordinateGeometryTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(7)
+        self.centers = rng.normal(size=(50, 3)) * 10.0
+        self.neighbors = self.centers[:, None, :] + rng.normal(size=(50, 6, 3)) * 2.0
+        self.mask = rng.rand(50, 6) > 0.2
+        self.mask[:, 0] = True
+
+    def test_tetrahedron(self):
+        center = np.zeros(3)
+        neighbors = np.array([[[1, 1, 1], [1, -1, -1], [-1, 1, -1], [-1, -1, 1]]], dtype=float)
+        geom = BatchCoordinateGeometry(center, neighbors)
+
+        self.assertAlmostEqual(1.0, geom.q4()[0])
+        self.assertTrue(np.isnan(geom.q5()[0]))
+        self.assertTrue(np.allclose(np.arccos(-1.0 / 3.0), geom.get_angles()[0]))
+
+    def test_against_coordinate_geometry(self):
+        geom = BatchCoordinateGeometry(self.centers, self.neighbors, self.mask)
+        q = [geom.q3(), geom.q4(), geom.q5(), geom.q6()]
+
+        for i in range(len(self.centers)):
+            points = list(self.neighbors[i][self.mask[i]])
+            single = CoordinateGeometry(self.centers[i], points)
+
+            self.assertTrue(np.allclose(single.get_distance(), geom.get_distances()[i][self.mask[i]]))
+
+            for n, func in enumerate([single.q3, single.q4, single.q5, single.q6]):
+                if len(points) >= n + 3:
+                    self.assertAlmostEqual(func(), q[n][i])
+                else:
+                    self.assertTrue(np.isnan(q[n][i]))
+
+
+if __name__ == '__main__':
+    unittest.main()
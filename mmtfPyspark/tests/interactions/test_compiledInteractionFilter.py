@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+import unittest
+import numpy as np
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.interactions import InteractionFilter
+from mmtfPyspark.utils import ColumnarStructure
+
+
+class CompiledInteractionFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("CompiledInteractionFilterTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        pdb = mmtfReader.read_mmtf_files(path)
+        self.structure = pdb.filter(lambda t: t[0] == '4HHB').values().first()
+
+    def test_masks(self):
+        interaction_filter = InteractionFilter()
+        interaction_filter.set_query_groups(True, ['HEM'])
+        interaction_filter.set_query_atom_names(False, ['FE'])
+        interaction_filter.set_target_elements(True, ['O', 'N'])
+        interaction_filter.set_prohibited_target_groups(['HOH'])
+
+        compiled = interaction_filter.compile(self.structure)
+        arrays = ColumnarStructure(self.structure, True)
+        group_names = arrays.get_group_names()
+        elements = arrays.get_elements()
+        atom_names = arrays.get_atom_names()
+
+        query = interaction_filter.is_query_group_np(group_names) \
+            & interaction_filter.is_query_atom_name_np(atom_names)
+        target = interaction_filter.is_target_element_np(elements)
+
+        np.testing.assert_array_equal(query, compiled.get_query_atoms())
+        np.testing.assert_array_equal(target, compiled.get_target_atoms())
+        np.testing.assert_array_equal(group_names == 'HOH', compiled.get_prohibited_target_atoms())
+        self.assertEqual(4, np.count_nonzero(compiled.get_query_groups()))
+        self.assertTrue(compiled.has_query_atoms())
+
+    def test_missing_query_group(self):
+        interaction_filter = InteractionFilter()
+        interaction_filter.set_query_groups(True, ['ATP'])
+
+        compiled = interaction_filter.compile(self.structure)
+        self.assertFalse(compiled.has_query_atoms())
+        self.assertEqual(0, np.count_nonzero(compiled.get_query_atoms()))
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.interactions import InteractionFilter
+from mmtfPyspark.interactions.interaction_extractor import InteractionExtractor
+
+
+class EnsembleInteractionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("EnsembleInteractionsTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] in ['1J6T', '4HHB'])
+
+    def test_nmr_ensemble(self):
+        interaction_filter = InteractionFilter()
+        interaction_filter.set_distance_cutoff(4.0)
+        interaction_filter.set_query_groups(True, ['PO3'])
+
+        interactions = InteractionExtractor.get_ligand_polymer_ensemble_interactions(self.pdb,
+                                                                                     interaction_filter,
+                                                                                     level='group')
+        self.assertEqual(8, interactions.count())
+        self.assertEqual(7, interactions.filter("modelCount = 2").count())
+        self.assertEqual(1, interactions.filter("targetGroupNumber = '312' AND modelCount = 1").count())
+
+    def test_single_model(self):
+        interaction_filter = InteractionFilter()
+        interaction_filter.set_distance_cutoff(4.0)
+        interaction_filter.set_query_groups(True, ['HEM'])
+
+        ensemble = InteractionExtractor.get_ligand_polymer_ensemble_interactions(self.pdb,
+                                                                                 interaction_filter,
+                                                                                 level='atom')
+        interactions = InteractionExtractor.get_ligand_polymer_interactions(self.pdb, interaction_filter,
+                                                                            level='atom')
+        self.assertEqual(interactions.count(), ensemble.count())
+        self.assertEqual(0, ensemble.filter("frequency < 1.0").count())
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
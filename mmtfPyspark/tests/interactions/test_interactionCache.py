@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+import unittest
+import os
+import tempfile
+import shutil
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.interactions import InteractionFilter, InteractionExtractor, InteractionCache
+from mmtfPyspark.interactions.interactionCache import get_parameter_hash
+
+
+class InteractionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("InteractionCacheTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path).cache()
+        self.path = tempfile.mkdtemp()
+
+        self.interaction_filter = InteractionFilter()
+        self.interaction_filter.set_distance_cutoff(4.0)
+        self.interaction_filter.set_query_groups(True, ['HEM', 'BTN'])
+
+    def test_hits_and_misses(self):
+        expected = InteractionExtractor.get_ligand_polymer_interactions(self.pdb, self.interaction_filter).count()
+        num_structures = self.pdb.count()
+
+        cache = InteractionCache(self.path)
+        interactions = cache.get_ligand_polymer_interactions(self.pdb, self.interaction_filter)
+        self.assertEqual(expected, interactions.count())
+        self.assertEqual(0, cache.get_hits())
+        self.assertEqual(num_structures, cache.get_misses())
+
+        interactions = cache.get_ligand_polymer_interactions(self.pdb, self.interaction_filter)
+        self.assertEqual(expected, interactions.count())
+        self.assertEqual(num_structures, cache.get_hits())
+        self.assertEqual(num_structures, cache.get_misses())
+
+        # a different filter is cached separately
+        self.interaction_filter.set_distance_cutoff(3.0)
+        cache.get_ligand_polymer_interactions(self.pdb, self.interaction_filter)
+        self.assertEqual(2 * num_structures, cache.get_misses())
+
+    def test_uncommitted_results(self):
+        expected = InteractionExtractor.get_ligand_polymer_interactions(self.pdb, self.interaction_filter).count()
+
+        cache = InteractionCache(self.path)
+        cache.get_ligand_polymer_interactions(self.pdb, self.interaction_filter)
+
+        # simulate a failure after the results were written, before the manifest was committed
+        parameter_hash = os.listdir(self.path)[0]
+        shutil.rmtree(os.path.join(self.path, parameter_hash, 'manifest'))
+
+        interactions = cache.get_ligand_polymer_interactions(self.pdb, self.interaction_filter)
+        self.assertEqual(expected, interactions.count())
+        self.assertEqual(0, cache.get_hits())
+
+    def test_parameter_hash(self):
+        filter1 = InteractionFilter()
+        filter1.set_query_groups(True, ['HEM', 'ATP'])
+        filter2 = InteractionFilter()
+        filter2.set_query_groups(True, ['ATP', 'HEM'])
+
+        self.assertEqual(get_parameter_hash({'filter': vars(filter1), 'level': 'group'}),
+                         get_parameter_hash({'level': 'group', 'filter': vars(filter2)}))
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
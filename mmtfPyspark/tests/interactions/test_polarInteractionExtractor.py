@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.interactions import PolarInteractionExtractor
+
+
+class PolarInteractionExtractorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("PolarInteractionExtractorTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '1STP')
+
+    def test_hydrogen_bonds(self):
+        hbonds = PolarInteractionExtractor.get_hydrogen_bonds(self.pdb, level='group')
+        self.assertEqual(343, hbonds.count())
+
+        biotin = hbonds.filter("queryGroupId = 'BTN' OR targetGroupId = 'BTN'")
+        self.assertEqual(17, biotin.count())
+
+        hbonds = PolarInteractionExtractor.get_hydrogen_bonds(self.pdb, level='atom')
+        self.assertEqual(356, hbonds.count())
+        self.assertEqual(0, hbonds.filter("distance > 3.5").count())
+
+    def test_salt_bridges(self):
+        salt_bridges = PolarInteractionExtractor.get_salt_bridges(self.pdb, level='group')
+        self.assertEqual(1, salt_bridges.count())
+
+        row = salt_bridges.first()
+        self.assertEqual('ARG', row.queryGroupId)
+        self.assertEqual('GLU', row.targetGroupId)
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
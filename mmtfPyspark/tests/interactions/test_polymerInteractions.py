@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.interactions import InteractionFilter
+from mmtfPyspark.interactions.interaction_extractor import InteractionExtractor
+
+
+class PolymerInteractionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("PolymerInteractionsTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '4HHB')
+
+        self.interaction_filter = InteractionFilter()
+        self.interaction_filter.set_distance_cutoff(4.5)
+        self.interaction_filter.set_query_groups(False, ['HOH'])
+
+    def test_inter(self):
+        interactions = InteractionExtractor.get_polymer_interactions(self.pdb, self.interaction_filter,
+                                                                     inter=True, intra=False, level='group')
+        self.assertEqual(328, interactions.count())
+        self.assertEqual(0, interactions.filter("queryChainId = targetChainId").count())
+
+    def test_intra(self):
+        interactions = InteractionExtractor.get_polymer_interactions(self.pdb, self.interaction_filter,
+                                                                     inter=False, intra=True, level='group')
+        self.assertEqual(5302, interactions.count())
+        self.assertEqual(0, interactions.filter("queryChainId != targetChainId").count())
+
+    def test_inter_intra(self):
+        interactions = InteractionExtractor.get_polymer_interactions(self.pdb, self.interaction_filter,
+                                                                     inter=True, intra=True, level='atom')
+        self.assertEqual(48482, interactions.count())
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
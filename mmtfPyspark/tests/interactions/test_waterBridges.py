@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.interactions import InteractionFilter
+from mmtfPyspark.interactions.interaction_extractor import InteractionExtractor
+
+
+class WaterBridgesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("WaterBridgesTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '4HHB')
+
+        self.interaction_filter = InteractionFilter()
+        self.interaction_filter.set_distance_cutoff(3.5)
+        self.interaction_filter.set_query_groups(True, ['HEM'])
+
+    def test_chain(self):
+        bridges = InteractionExtractor.get_ligand_polymer_water_bridges(self.pdb, self.interaction_filter,
+                                                                        level='chain')
+        self.assertEqual(7, bridges.count())
+
+    def test_group(self):
+        bridges = InteractionExtractor.get_ligand_polymer_water_bridges(self.pdb, self.interaction_filter,
+                                                                        level='group')
+        self.assertEqual(9, bridges.count())
+
+    def test_atom(self):
+        bridges = InteractionExtractor.get_ligand_polymer_water_bridges(self.pdb, self.interaction_filter,
+                                                                        level='atom')
+        self.assertEqual(17, bridges.count())
+        self.assertEqual(0, bridges.filter("queryWaterDistance > 3.5 OR targetWaterDistance > 3.5").count())
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+'''structureToBiopythonBenchmark.py
+
+Compares the conversion of a decoded structure to a BioPython Structure by
+StructureToBiopython with the callback path of the mmtf
+DefaultParser.StructureDecoder, which replays every atom through callback
+methods.
+
+Run from this directory: python structureToBiopythonBenchmark.py
+'''
+
+import time
+import unittest
+import warnings
+from Bio.PDB.mmtf.DefaultParser import StructureDecoder
+from mmtf import parse_gzip
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.mappers import StructureToBiopython
+
+
+class StructureToBiopythonBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("structureToBiopythonBenchmark") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.structure = mmtfReader.read_mmtf_files(path) \
+                                   .filter(lambda t: t[0] == '4HHB') \
+                                   .values() \
+                                   .first()
+        self.decoder = parse_gzip(path + '4HHB.mmtf.gz')
+        self.repeats = 20
+
+    def test1(self):
+        # merged chains with the same chain name issue construction warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+
+            t0 = time.time()
+            for _ in range(self.repeats):
+                direct = StructureToBiopython()(self.structure)
+            t_direct = (time.time() - t0) / self.repeats
+
+            t0 = time.time()
+            for _ in range(self.repeats):
+                callback = self._decode_with_callbacks()
+            t_callback = (time.time() - t0) / self.repeats
+
+        print("4HHB direct: %.4f s, callback: %.4f s, speedup: %.1fx"
+              % (t_direct, t_callback, t_callback / t_direct))
+
+        self.assertEqual(len(list(callback.get_atoms())), len(list(direct.get_atoms())))
+        self.assertEqual([c.id for c in callback.get_chains()], [c.id for c in direct.get_chains()])
+
+    def _decode_with_callbacks(self):
+        decoder = self.decoder
+        decoder.atom_counter = 0
+        decoder.group_counter = 0
+        decoder.chain_counter = 0
+        decoder.model_counter = 0
+
+        parser = StructureDecoder()
+        decoder.pass_data_on(parser)
+
+        return parser.structure_builder.get_structure()
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
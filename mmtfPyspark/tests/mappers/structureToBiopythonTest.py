@@ -2,7 +2,8 @@
 
 import unittest
 from pyspark.sql import SparkSession
-from mmtfPyspark.mappers import StructureToBiopython, StructureToPolymerChains
+from mmtfPyspark.mappers import StructureToBiopython, StructureToPolymerChains, StructureToBioassembly
+from mmtfPyspark.io import mmtfReader
 from mmtfPyspark.io.mmtfReader import download_mmtf_files
 
 
@@ -34,6 +35,28 @@ class StructureToBiopythonTest(unittest.TestCase):
 
         self.assertTrue(chainCounts.sum() == 10)
 
+    def test2(self):
+        path = '../../../resources/files/'
+        pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '1STP')
+
+        # polymer chain views
+        chains = pdb.flatMap(StructureToPolymerChains()) \
+                    .mapValues(StructureToBiopython()) \
+                    .values() \
+                    .collect()
+        self.assertEqual(1, len(chains))
+        self.assertListEqual(['A'], [c.id for c in chains[0].get_chains()])
+        self.assertEqual(901, sum(1 for a in chains[0].get_atoms()))
+
+        # 1STP: 4 copies of the protein, biotin, and water chains
+        assemblies = pdb.flatMap(StructureToBioassembly()) \
+                        .mapValues(StructureToBiopython()) \
+                        .values() \
+                        .collect()
+        self.assertEqual(1, len(assemblies))
+        self.assertListEqual(['A', 'A-2', 'A-3', 'A-4'], [c.id for c in assemblies[0].get_chains()])
+        self.assertEqual(4004, sum(1 for a in assemblies[0].get_atoms()))
+
     def tearDown(self):
         self.spark.stop()
 
@@ -3,6 +3,7 @@
 import unittest
 from pyspark.sql import SparkSession
 from mmtfPyspark.mappers import StructureToBioassembly, StructureToProteinDimers
+from mmtfPyspark.io import mmtfReader
 from mmtfPyspark.io.mmtfReader import download_mmtf_files
 
 
@@ -63,6 +64,33 @@ class StructureToProteinDimersTest(unittest.TestCase):
 
         self.assertTrue(pdb_4.count() == 5)
 
+    def test5(self):
+        path = '../../../resources/files/'
+        assemblies = mmtfReader.read_mmtf_files(path) \
+                               .filter(lambda t: t[0] == '4HHB') \
+                               .flatMap(StructureToBioassembly())
+
+        # 4HHB: hemoglobin tetramer, chains A, C (alpha) and B, D (beta)
+        prefix = '4HHB-BioAssembly1.'
+        alpha1 = prefix + 'A.A.1'
+        beta1 = prefix + 'B.B.2'
+        alpha2 = prefix + 'C.C.1'
+        beta2 = prefix + 'D.D.2'
+
+        # C-beta contacts: the alpha1-beta1 and alpha2-beta2 interfaces
+        expected = [beta1 + '_append_' + alpha1, beta2 + '_append_' + alpha2]
+        for exclusive in (False, True):
+            dimers = assemblies.flatMap(StructureToProteinDimers(8, 10, False, exclusive)).keys().collect()
+            self.assertListEqual(expected, sorted(dimers))
+
+        # all atom contacts: all interfaces except beta1-beta2
+        expected = sorted([beta1 + '_append_' + alpha1, alpha2 + '_append_' + alpha1,
+                           alpha2 + '_append_' + beta1, beta2 + '_append_' + alpha1,
+                           beta2 + '_append_' + alpha2])
+        for exclusive in (False, True):
+            dimers = assemblies.flatMap(StructureToProteinDimers(8, 20, True, exclusive)).keys().collect()
+            self.assertListEqual(expected, sorted(dimers))
+
     def tearDown(self):
         self.spark.stop()
 
@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 
+import pickle
 import unittest
+import numpy as np
 from pyspark.sql import SparkSession
 from mmtfPyspark.mappers import StructureToBioassembly
+from mmtfPyspark.io import mmtfReader
 from mmtfPyspark.io.mmtfReader import download_mmtf_files
 
 
@@ -30,6 +33,42 @@ class StructureToBioassemblyTest(unittest.TestCase):
 
         self.assertTrue(len(results_1) == 2)
 
+    def test2(self):
+        path = '../../../resources/files/'
+        pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '1STP')
+
+        # 1STP: 4 transformations of 3 chains (protein, biotin, water)
+        assemblies = pdb.flatMap(StructureToBioassembly()).collect()
+        self.assertEqual(1, len(assemblies))
+        self.assertEqual('1STP-BioAssembly1', assemblies[0][0])
+
+        assembly = assemblies[0][1]
+        self.assertEqual(12, assembly.num_chains)
+        self.assertListEqual([12], assembly.chains_per_model)
+        self.assertEqual(4004, assembly.num_atoms)
+        self.assertEqual(4004, len(assembly.x_coord_list))
+
+        # lazy assemblies calculate the coordinates of chain copies on request
+        lazy = pdb.flatMap(StructureToBioassembly(lazy=True)).values().first()
+        self.assertEqual(4, len(lazy.get_operators()))
+        coords = np.column_stack((assembly.x_coord_list, assembly.y_coord_list, assembly.z_coord_list))
+        self.assertTrue(np.allclose(coords[0:10], lazy.get_transformed_coords(0, 0)[0:10], atol=0.001))
+
+    def test3(self):
+        path = '../../../resources/files/'
+        structure = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '4HHB').values().first()
+        assembly = StructureToBioassembly()(('4HHB', structure))[0][1]
+
+        # the parent structure and the coordinates of the copies are not pickled
+        data = pickle.dumps(assembly)
+        self.assertLess(len(data), len(pickle.dumps(structure)) / 2)
+
+        copy = pickle.loads(data)
+        self.assertEqual('4HHB-BioAssembly1', copy.structure_id)
+        self.assertEqual(assembly.num_atoms, copy.num_atoms)
+        self.assertEqual(len(assembly.get_operators()), len(copy.get_operators()))
+        self.assertTrue(np.allclose(assembly.x_coord_list, copy.x_coord_list, atol=0.002))
+
     def tearDown(self):
         self.spark.stop()
 
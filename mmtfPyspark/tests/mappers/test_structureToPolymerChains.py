@@ -2,8 +2,11 @@
 
 import unittest
 from pyspark.sql import SparkSession
+import msgpack
 from mmtfPyspark.mappers import StructureToPolymerChains
+from mmtfPyspark.io import mmtfReader
 from mmtfPyspark.io.mmtfReader import download_mmtf_files
+from mmtfPyspark.utils import MmtfStructure
 
 
 class StructureToPolymerChainsTest(unittest.TestCase):
@@ -30,6 +33,25 @@ class StructureToPolymerChainsTest(unittest.TestCase):
 
         self.assertTrue(len(results_1) == 10)
 
+    def test2(self):
+        path = '../../../resources/files/'
+        pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '4HHB')
+        chains = pdb.flatMap(StructureToPolymerChains(excludeDuplicates=True)).collect()
+
+        self.assertListEqual(['4HHB.A', '4HHB.B'], [key for key, _ in chains])
+
+        chain = chains[1][1]
+        self.assertEqual('4HHB.B.B.2', chain.structure_id)
+        self.assertEqual(1123, chain.num_atoms)
+        self.assertEqual(146, chain.num_groups)
+        self.assertEqual(1, len(chain.entity_list))
+
+        # chains are only encoded on request
+        data = msgpack.unpackb(msgpack.packb(chain.input_data, use_bin_type=True), raw=False)
+        structure = MmtfStructure(data)
+        self.assertEqual(1123, structure.num_atoms)
+        self.assertListEqual(['B'], structure.chain_name_list.tolist())
+
     def tearDown(self):
         self.spark.stop()
 
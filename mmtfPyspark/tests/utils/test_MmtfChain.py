@@ -7,6 +7,7 @@ __maintainer__ = "Peter Rose"
 __status__ = "Warning"
 '''
 
+import pickle
 import unittest
 import numpy as np
 from pyspark.sql import SparkSession
@@ -110,6 +111,26 @@ class TestMmtfChain(unittest.TestCase):
         chains = structure.get_chains()
         self.assertEqual(2, len(chains))
 
+    def test_4HHB_chain_pickle(self):
+        print('test_4HHB_chain_pickle')
+        path = '../../../resources/files/'
+        pdb = mmtfReader.read_mmtf_files(path)
+        pdb = pdb.filter(lambda t: t[0] == '4HHB')
+        structure = pdb.values().first()
+        chain = structure.get_chain('B')
+
+        # the parent structure is not pickled with the chain
+        data = pickle.dumps(chain)
+        self.assertLess(len(data), len(pickle.dumps(structure)) / 2)
+
+        copy = pickle.loads(data)
+        self.assertEqual(chain.structure_id, copy.structure_id)
+        self.assertEqual(1123, copy.num_atoms)
+        self.assertEqual(146, copy.num_groups)
+        np.testing.assert_allclose(chain.coords, copy.coords, atol=0.001)
+        self.assertListEqual(chain.group_names.tolist(), copy.group_names.tolist())
+        self.assertListEqual(['B'], copy.chain_name_list.tolist())
+
     # def test_4HHB_multiple_chains(self):
     #     print('test_4HHB_multiple_chains')
     #     path = '../../../resources/files/'
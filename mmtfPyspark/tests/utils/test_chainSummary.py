@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+import unittest
+import numpy as np
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.utils import ChainSummary
+
+
+class TestChainSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("TestChainSummary") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        pdb = mmtfReader.read_mmtf_files(path)
+        self.structure = pdb.filter(lambda t: t[0] == '4HHB').values().first()
+
+    def test_4HHB(self):
+        summary = ChainSummary(self.structure)
+
+        # 4 polymer chains, 6 heme and phosphate chains, 4 water chains
+        self.assertEqual(14, summary.num_chains)
+        self.assertListEqual([True] * 4 + [False] * 10, summary.polymer.tolist())
+        self.assertListEqual([141, 146, 141, 146], summary.groups_per_chain[:4].tolist())
+        self.assertListEqual([105, 0, 36], summary.q3_counts[0].tolist())
+        np.testing.assert_allclose([105 / 141, 0, 36 / 141], summary.get_q3_fractions()[0])
+
+    def test_all_groups_in(self):
+        summary = ChainSummary(self.structure)
+        match = summary.all_groups_in('chemCompType', ['L-PEPTIDE LINKING', 'PEPTIDE LINKING'])
+
+        self.assertListEqual([True] * 4 + [False] * 10, match.tolist())
+        self.assertTrue(summary.any_polymer_chain(match, exclusive=True))
+        self.assertFalse(summary.any_polymer_chain(~match))
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
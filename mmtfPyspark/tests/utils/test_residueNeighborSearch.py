@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.utils import ResidueNeighborSearch, StructureToAllInteractions
+from mmtfPyspark.mappers import StructureToInteractingResidues
+
+
+class TestResidueNeighborSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("TestResidueNeighborSearch") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path)
+
+    def test_4HHB_hem(self):
+        structure = self.pdb.filter(lambda t: t[0] == '4HHB').values().first()
+        search = ResidueNeighborSearch(structure)
+        hem = search.get_group_indices('HEM')
+        self.assertEqual(4, len(hem))
+
+        qa, na, d = search.get_atom_contacts(hem, 4.0)
+        self.assertEqual(337, len(d))
+        self.assertTrue((d <= 4.0).all())
+
+        qg, ng, d = search.get_group_contacts(hem, 4.0)
+        self.assertEqual(73, len(d))
+
+    def test_1STP_mappers(self):
+        pdb = self.pdb.filter(lambda t: t[0] == '1STP')
+
+        atoms = pdb.flatMap(StructureToAllInteractions('BTN', 4.0)).collect()
+        self.assertEqual(70, len(atoms))
+        self.assertTrue(all(row[1] == 'BTN' for row in atoms))
+
+        residues = pdb.flatMap(StructureToInteractingResidues('BTN', 4.0)).collect()
+        self.assertEqual(19, len(residues))
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
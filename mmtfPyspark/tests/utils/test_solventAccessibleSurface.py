@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import unittest
+import math
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.utils import SolventAccessibleSurface
+from mmtfPyspark.datasets import solventAccessibilityExtractor
+from mmtfPyspark.mappers import StructureToSolventAccessibleSurface
+
+
+class SolventAccessibleSurfaceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("SolventAccessibleSurfaceTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path).filter(lambda t: t[0] == '1STP')
+
+    def test_atom_sasa(self):
+        surface = SolventAccessibleSurface(self.pdb.values().first())
+        sasa = surface.get_atom_sasa()
+
+        # the surface area of an atom can't exceed the area of its expanded sphere
+        self.assertTrue((sasa >= 0).all())
+        self.assertTrue((sasa <= 4.0 * math.pi * (2.75 + 1.4) ** 2).all())
+        self.assertEqual(0.0, sasa[~surface.get_included_atoms()].sum())
+
+        self.assertAlmostEqual(6887.4, sasa.sum(), delta=1.0)
+        self.assertAlmostEqual(sasa.sum(), surface.get_group_sasa().sum())
+        self.assertAlmostEqual(sasa.sum(), surface.get_chain_sasa().sum())
+
+    def test_dataset(self):
+        groups = solventAccessibilityExtractor.get_dataset(self.pdb, level='group')
+        self.assertEqual(122, groups.count())
+
+        biotin = groups.filter("groupName = 'BTN'").first()
+        self.assertAlmostEqual(39.0, biotin.sasa, delta=0.1)
+
+        # the streptavidin and biotin chains share the chain name A
+        chains = solventAccessibilityExtractor.get_dataset(self.pdb, level='chain').collect()
+        self.assertEqual(['1STP.A'], [row.structureChainId for row in chains])
+        self.assertAlmostEqual(6887.4, chains[0].sasa, delta=1.0)
+
+    def test_empty_chains(self):
+        structure = self.pdb.values().first()
+
+        # add chains without groups after the first chain and at the end
+        structure.num_chains += 2
+        structure.chains_per_model = [structure.chains_per_model[0] + 2]
+        structure.groups_per_chain = list(structure.groups_per_chain)
+        structure.groups_per_chain[1:1] = [0]
+        structure.groups_per_chain.append(0)
+        for names, empty in (('_chain_name_list', ['B', 'C']), ('_chain_id_list', ['X', 'Y'])):
+            chains = list(getattr(structure, names[1:]))
+            setattr(structure, names, chains[:1] + empty[:1] + chains[1:] + empty[1:])
+
+        chains = StructureToSolventAccessibleSurface('chain')(('1STP', structure))
+        self.assertEqual(['1STP.A'], [row[0] for row in chains])
+        self.assertAlmostEqual(6887.4, chains[0][1], delta=1.0)
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import unittest
+from pyspark.sql import SparkSession
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.webfilters.broadcastIdSet import BroadcastIdSet, BroadcastIdFilter, get_structure_id
+from mmtfPyspark.mappers import *
+
+
+class BroadcastIdSetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spark = SparkSession.builder.master("local[*]") \
+                                 .appName("BroadcastIdSetTest") \
+                                 .getOrCreate()
+
+        path = '../../../resources/files/'
+        self.pdb = mmtfReader.read_mmtf_files(path)
+
+    def test1(self):
+        idSet = BroadcastIdSet(["4HHB.A", "1STP.A", "1J6T:1"])
+
+        self.assertSetEqual({"1J6T", "1STP", "4HHB"}, set(idSet.structure_ids))
+        self.assertEqual("4HHB", get_structure_id("4HHB.A"))
+        self.assertEqual("1J6T", get_structure_id("1J6T:1"))
+
+        # the id sets are read from the broadcast variables on the executors
+        results = self.pdb.filter(lambda t: t[0] in idSet.structure_ids).keys().collect()
+        self.assertListEqual(["1J6T", "1STP", "4HHB"], sorted(results))
+
+        chains = self.pdb.flatMap(StructureToPolymerChains()) \
+                         .filter(lambda t: t[0] in idSet.ids) \
+                         .keys() \
+                         .collect()
+        self.assertListEqual(["1STP.A", "4HHB.A"], sorted(chains))
+
+    def test2(self):
+        class ChainIdFilter(BroadcastIdFilter):
+            def __init__(self, ids):
+                self.idSet = BroadcastIdSet(ids)
+
+        idFilter = ChainIdFilter(["4HHB.A", "1STP.A"])
+
+        # structures with a selected chain and the selected chains pass
+        results = self.pdb.filter(idFilter).keys().collect()
+        self.assertListEqual(["1STP", "4HHB"], sorted(results))
+
+        chains = self.pdb.flatMap(StructureToPolymerChains()) \
+                         .filter(idFilter) \
+                         .keys() \
+                         .collect()
+        self.assertListEqual(["1STP.A", "4HHB.A"], sorted(chains))
+
+    def tearDown(self):
+        self.spark.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from mmtfPyspark.webservices import httpCache, PiscesDownloader
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    '''Local stand-in for the web services'''
+
+    pages = {'/clusters/bc-30.out': b'4HHB_A 4HHB_C\n1STP_A\n',
+             '/culledpdb': b'<a href="cullpdb_pc20_res2.0_R0.25_chains10.gz">\n<a href="log">\n',
+             '/culledpdb/cullpdb_pc20_res2.0_R0.25_chains10.gz':
+                 gzip.compress(b'IDs         length  Exptl.\n4HHBA       141  XRAY\n1STPA       159  XRAY\n')}
+    requests = 0
+
+    def do_GET(self):
+        StandInHandler.requests += 1
+        content = self.pages.get(self.path)
+        if content is None:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        StandInHandler.requests += 1
+        data = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b'1STP\n' if b'biotin' in data else b'4HHB\n')
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('localhost', 0), StandInHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = 'http://localhost:%d' % self.server.server_port
+
+        self.tmp = tempfile.mkdtemp()
+        httpCache.configure(cache_dir=os.path.join(self.tmp, 'cache'), ttl=3600, offline=False)
+        StandInHandler.requests = 0
+
+    def test_cache(self):
+        url = self.url + '/clusters/bc-30.out'
+        self.assertEqual(b'4HHB_A 4HHB_C\n1STP_A\n', httpCache.get(url))
+        self.assertEqual(b'4HHB_A 4HHB_C\n1STP_A\n', httpCache.get(url))
+        self.assertEqual(1, StandInHandler.requests)
+
+        # expired responses are downloaded again
+        httpCache.get(url, ttl=0)
+        self.assertEqual(2, StandInHandler.requests)
+
+        # POST requests are cached by their data
+        self.assertEqual(b'1STP\n', httpCache.get(self.url + '/search', data=b'biotin'))
+        self.assertEqual(b'4HHB\n', httpCache.get(self.url + '/search', data=b'heme'))
+        self.assertEqual(b'1STP\n', httpCache.get(self.url + '/search', data=b'biotin'))
+        self.assertEqual(4, StandInHandler.requests)
+
+    def test_corrupted(self):
+        url = self.url + '/clusters/bc-30.out'
+        path = httpCache.get_path(url)
+        with open(path, 'wb') as f:
+            f.write(b'4HHB_A')
+
+        self.assertEqual(b'4HHB_A 4HHB_C\n1STP_A\n', httpCache.get(url))
+        self.assertEqual(2, StandInHandler.requests)
+
+    def test_network_failure(self):
+        url = self.url + '/clusters/bc-30.out'
+        httpCache.get(url)
+        self.server.shutdown()
+        self.server.server_close()
+
+        # the expired response is used if the service is not available
+        self.assertEqual(b'4HHB_A 4HHB_C\n1STP_A\n', httpCache.get(url, ttl=0))
+
+    def test_offline(self):
+        url = self.url + '/clusters/bc-30.out'
+        httpCache.get(url)
+        httpCache.configure(offline=True, mirror_dir=os.path.join(self.tmp, 'mirror'))
+
+        self.assertEqual(b'4HHB_A 4HHB_C\n1STP_A\n', httpCache.get(url, ttl=0))
+        self.assertEqual(1, StandInHandler.requests)
+
+        with self.assertRaises(IOError):
+            httpCache.get(self.url + '/clusters/bc-40.out')
+
+        # mirror in the <host>/<path> layout
+        mirror = os.path.join(self.tmp, 'mirror', 'localhost:%d' % self.server.server_port, 'clusters')
+        os.makedirs(mirror)
+        with open(os.path.join(mirror, 'bc-40.out'), 'wb') as f:
+            f.write(b'1STP_A\n')
+
+        self.assertEqual(b'1STP_A\n', httpCache.get(self.url + '/clusters/bc-40.out'))
+        self.assertEqual(1, StandInHandler.requests)
+
+        # without the mirror directory, only cached responses are available
+        httpCache.configure(mirror_dir=None)
+        self.assertIsNone(httpCache.get_config()['mirror_dir'])
+        with self.assertRaises(IOError):
+            httpCache.get(self.url + '/clusters/bc-40.out')
+
+    def test_pisces(self):
+        url = PiscesDownloader.URL
+        try:
+            PiscesDownloader.URL = self.url + '/culledpdb'
+            ids = PiscesDownloader(20, 2.0).get_structure_chain_ids()
+            self.assertListEqual(['4HHB.A', '1STP.A'], ids[1:])
+
+            PiscesDownloader(20, 2.0).get_structure_chain_ids()
+            self.assertEqual(2, StandInHandler.requests)
+        finally:
+            PiscesDownloader.URL = url
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        httpCache.reset()
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,16 @@ from .columnarStructure import ColumnarStructure
 from .columnarStructureX import ColumnarStructureX
 from .codec import Codec
 from .mmtfChain import MmtfChain
+from .mmtfBioassembly import MmtfBioassembly
 from .mmtfSubstructure import MmtfSubstructure
 from .mmtfModel import MmtfModel
 from .mmtfStructure import MmtfStructure
+from .mmtfMetadata import MmtfMetadata
 from .dsspSecondaryStructure import DsspSecondaryStructure
+from .chainSummary import ChainSummary, IndexChainSummary
 from .distanceBox import DistanceBox
+from .residueNeighborSearch import ResidueNeighborSearch
 from .structureToAllInteractions import StructureToAllInteractions
+from .solventAccessibleSurface import SolventAccessibleSurface
 from .mmtfCodec import encode_array, decode_array
 
@@ -0,0 +1,230 @@
+#!/user/bin/env python
+'''chainSummary.py
+
+Summarizes the chains of the first model of a structure with array
+operations over the group types, the DSSP codes, and the groups per chain:
+the polymer flag, the number of groups, the DSSP Q3 counts of each chain, and
+whether all groups of a chain have a group property (e.g. group name or chem
+comp type) in a set of values. The chain-level filters (e.g.
+SecondaryStructure, PolymerComposition, ContainsPolymerChainType) are
+evaluated on a chain summary.
+
+An IndexChainSummary provides the same summary from a row of a metadata
+index (see :mod:`metadataIndex <mmtfPyspark.datasets.metadataIndex>`), so
+that the chain-level filters can be evaluated without decoding a structure.
+
+Examples
+--------
+>>> summary = ChainSummary(structure)
+>>> summary.polymer
+array([ True,  True, False])
+>>> summary.get_q3_fractions()[:, 0]
+array([0.45, 0.61, 0.  ])
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import numpy as np
+from mmtfPyspark.utils.dsspSecondaryStructure import DsspSecondaryStructure
+
+
+class ChainSummary(object):
+    '''Per-chain summary of the first model of a structure
+
+    Attributes
+    ----------
+    structure : MmtfStructure
+       structure or chain
+    num_chains : int
+       number of chains in the first model
+    polymer : array
+       true for polymer chains
+    groups_per_chain : array
+       number of groups per chain
+    '''
+
+    def __init__(self, structure):
+        self.structure = structure
+        self.num_chains = int(structure.chains_per_model[0]) if len(structure.chains_per_model) > 0 else 0
+
+        groups_per_chain = np.asarray(structure.groups_per_chain[:self.num_chains], dtype=np.int64)
+        self.groups_per_chain = groups_per_chain
+        self.num_groups = int(groups_per_chain.sum())
+
+        # entity type of each chain, chains without an entity are not polymers
+        self.polymer = np.zeros(self.num_chains, dtype=bool)
+        assigned = np.zeros(self.num_chains, dtype=bool)
+        for entity in structure.entity_list:
+            indices = np.asarray(entity['chainIndexList'], dtype=np.int64)
+            indices = indices[indices < self.num_chains]
+            indices = indices[~assigned[indices]]
+            self.polymer[indices] = entity['type'] == 'polymer'
+            assigned[indices] = True
+
+        self._chain_of_group = None
+        self._group_types = None
+        self._q3_counts = None
+
+    @property
+    def chain_of_group(self):
+        '''Chain index of each group'''
+        if self._chain_of_group is None:
+            self._chain_of_group = np.repeat(np.arange(self.num_chains), self.groups_per_chain)
+
+        return self._chain_of_group
+
+    @property
+    def group_types(self):
+        '''Group type (index into group_list) of each group'''
+        if self._group_types is None:
+            self._group_types = np.asarray(self.structure.group_type_list[:self.num_groups], dtype=np.int64)
+
+        return self._group_types
+
+    @property
+    def q3_counts(self):
+        '''Number of helix, sheet, and coil groups (DSSP Q3) per chain'''
+        if self._q3_counts is None:
+            q3 = DsspSecondaryStructure.get_q3_codes(self.structure.sec_struct_list[:self.num_groups])
+            self._q3_counts = np.zeros((self.num_chains, 3))
+            for i, code in enumerate((b'H', b'E', b'C')):
+                self._q3_counts[:, i] = np.bincount(self.chain_of_group, weights=(q3 == code),
+                                                    minlength=self.num_chains)
+
+        return self._q3_counts
+
+    def get_group_type_counts(self):
+        '''Returns the number of groups of each group type per chain
+
+        Returns
+        -------
+        tuple
+           arrays of chain indices, group types (index into group_list), and
+           counts, sorted by chain index and group type
+        '''
+        num_types = len(self.structure.group_list)
+        pairs, counts = np.unique(self.chain_of_group * num_types + self.group_types, return_counts=True)
+
+        return pairs // num_types, pairs % num_types, counts
+
+    def get_q3_fractions(self):
+        '''Returns the fractions of helix, sheet, and coil groups (DSSP Q3)
+        per chain. The fractions of chains without groups are NaN.
+
+        Returns
+        -------
+        array
+           num_chains x 3 array of helix, sheet, and coil fractions
+        '''
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.q3_counts / self.groups_per_chain[:, np.newaxis]
+
+    def all_groups_in(self, group_property, values):
+        '''Returns true for the chains that only contain groups with a group
+        property in a set of values, e.g., all groups are standard amino
+        acids. Chains without groups are true.
+
+        Parameters
+        ----------
+        group_property : str
+           key of the group_list entries, e.g., 'groupName' or 'chemCompType'
+        values : list
+           allowed values
+
+        Returns
+        -------
+        array
+           true for the chains that only contain matching groups
+        '''
+        values = set(values)
+        matching_types = np.array([group[group_property] in values for group in self.structure.group_list],
+                                  dtype=bool)
+
+        match = np.ones(self.num_chains, dtype=bool)
+        match[self.chain_of_group[~matching_types[self.group_types]]] = False
+
+        return match
+
+    def any_polymer_chain(self, match, exclusive=False):
+        '''Returns true if a polymer chain matches. If exclusive is true, all
+        polymer chains must match. Structures without polymer chains do not
+        match.
+
+        Parameters
+        ----------
+        match : array
+           true for matching chains
+        exclusive : bool
+           if true, all polymer chains must match
+
+        Returns
+        -------
+        bool
+           true if the structure matches
+        '''
+        polymer_match = match[self.polymer]
+
+        if exclusive:
+            return polymer_match.size > 0 and bool(polymer_match.all())
+        else:
+            return bool(polymer_match.any())
+
+
+class IndexChainSummary(ChainSummary):
+    '''Per-chain summary of the first model of a structure from a row of a
+    metadata index
+
+    Attributes
+    ----------
+    row : Row
+       metadata index row
+    '''
+
+    # index columns of the group properties
+    GROUP_PROPERTY_COLUMNS = {'chemCompType': 'chainChemCompTypes',
+                              'groupName': 'chainGroupNames'}
+
+    # index columns read by a summary
+    INDEX_COLUMNS = ['chainTypes', 'chainHelix', 'chainSheet', 'chainCoil'] + \
+                    list(GROUP_PROPERTY_COLUMNS.values())
+
+    def __init__(self, row):
+        self.row = row
+        self.num_chains = len(row.chainTypes)
+        self.polymer = np.array([chain_type == 'polymer' for chain_type in row.chainTypes], dtype=bool)
+
+    def get_q3_fractions(self):
+        '''Returns the fractions of helix, sheet, and coil groups (DSSP Q3)
+        per chain. The fractions of chains without groups are NaN.
+
+        Returns
+        -------
+        array
+           num_chains x 3 array of helix, sheet, and coil fractions
+        '''
+        return np.array([self.row.chainHelix, self.row.chainSheet, self.row.chainCoil],
+                        dtype=np.float64).reshape(3, self.num_chains).T
+
+    def all_groups_in(self, group_property, values):
+        '''Returns true for the chains that only contain groups with a group
+        property in a set of values. Only the group properties in
+        GROUP_PROPERTY_COLUMNS are indexed.
+
+        Parameters
+        ----------
+        group_property : str
+           'groupName' or 'chemCompType'
+        values : list
+           allowed values
+
+        Returns
+        -------
+        array
+           true for the chains that only contain matching groups
+        '''
+        values = set(values)
+        chain_values = self.row[self.GROUP_PROPERTY_COLUMNS[group_property]]
+
+        return np.array([set(v).issubset(values) for v in chain_values], dtype=bool)
@@ -147,6 +147,33 @@ class ColumnarStructure(object):
         self.get_indices()
         return self.numModels
 
+    def get_model_to_atom_indices(self):
+        '''Returns an array that maps a model index to the index of its first
+        atom. The last element is the total number of atoms.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           index that maps model index to an atom index
+        '''
+        chain_offsets = np.zeros(self.get_num_models() + 1, dtype=np.int64)
+        chain_offsets[1:] = np.cumsum(self.structure.chains_per_model[:self.get_num_models()])
+        return self.get_chain_to_atom_indices()[chain_offsets]
+
+    def get_model_coordinates(self):
+        '''Returns the coordinates of each model. Models can have different
+        numbers of atoms, e.g., in NMR ensembles with alternative locations.
+
+        Returns
+        -------
+        list
+           list of atoms x 3 arrays of coordinates, one per model
+        '''
+        model_to_atom = self.get_model_to_atom_indices()
+        coords = np.stack((self.get_x_coords(), self.get_y_coords(), self.get_z_coords()), axis=-1)
+
+        return np.split(coords, model_to_atom[1:-1])
+
     def get_x_coords(self):
         if self.structure.x_coord_list.shape[0] != self.get_num_atoms():
             return self.structure.x_coord_list[:self.get_num_atoms()]
@@ -379,7 +406,7 @@ class ColumnarStructure(object):
                 index = self.entityChainIndex[i]
                 start = self.chainToAtomIndices[i]
                 end = self.chainToAtomIndices[i + 1]
-                poly = self.structure.entity_list[index]['type'] == 'polymer'
+                poly = index >= 0 and self.structure.entity_list[index]['type'] == 'polymer'
 
                 self.polymer[start:end] = poly
 
@@ -438,13 +465,15 @@ class ColumnarStructure(object):
         Returns
         -------
         :obj:`array <numpy.ndarray>`
-           index that maps chain index to an entity index
+           index that maps chain index to an entity index, or -1 if a chain
+           is not part of an entity
         '''
 
         if self.entityChainIndex is None:
 
             #self.entityChainIndex = np.empty(self.structure.num_chains, dtype='>i4')
-            self.entityChainIndex = np.empty(self.structure.num_chains, dtype=np.int32)
+            # chains that are not listed in any entity are mapped to -1
+            self.entityChainIndex = np.full(self.structure.num_chains, -1, dtype=np.int32)
 
             for i, entity in enumerate(self.structure.entity_list):
 
@@ -8,8 +8,14 @@ __version__ = "0.2.0"
 __status__ = "Done"
 
 
+import numpy as np
 from enum import Enum
 
+# one-letter DSSP (Q8) and 3-state (Q3) codes indexed by the numeric DSSP code,
+# the last entry is used for undefined codes (coil)
+_Q8_CODES = np.frombuffer(b'5SHEGBTCC', dtype='S1')
+_Q3_CODES = np.frombuffer(b'HCHEHECCC', dtype='S1')
+
 
 class DsspSecondaryStructure(Enum):
 
@@ -55,3 +61,42 @@ class DsspSecondaryStructure(Enum):
             if x.value == numericCode:
                 return x
         return DsspSecondaryStructure.COIL
+
+    def get_q8_codes(numericCodes):
+        '''Returns the one-letter DSSP codes of an array of numeric DSSP codes.
+        Undefined codes are mapped to coil (C).
+
+        Parameters
+        ----------
+        numericCodes : array
+           numeric DSSP codes, e.g., sec_struct_list
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           array of one-letter codes (dtype S1)
+        '''
+        return _Q8_CODES[_lookup_index(numericCodes)]
+
+    def get_q3_codes(numericCodes):
+        '''Returns the one-letter 3-state codes (H: alpha helix, E: extended,
+        C: coil) of an array of numeric DSSP codes. Undefined codes are mapped
+        to coil (C).
+
+        Parameters
+        ----------
+        numericCodes : array
+           numeric DSSP codes, e.g., sec_struct_list
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           array of one-letter codes (dtype S1)
+        '''
+        return _Q3_CODES[_lookup_index(numericCodes)]
+
+
+def _lookup_index(numericCodes):
+    '''Returns indices into the code lookup arrays'''
+    codes = np.asarray(numericCodes, dtype=np.int64)
+    return np.where((codes >= 0) & (codes < 8), codes, 8)
@@ -0,0 +1,346 @@
+#!/user/bin/env python
+'''mmtfBioassembly.py
+
+A biological assembly of a structure, represented by the parent structure
+and the list of transformation operators of the assembly. The chain, group,
+and atom bookkeeping of the assembly is calculated with index arrays from
+the atom and group ranges of the chains. The MMTF list interface (coordinates,
+group types, chain names, etc.) is calculated on first access, so that
+consumers that only need the operators never materialize the copies of the
+chains.
+
+The chains of the assembly are ordered by model, chain, and transformation.
+Inter-group bonds are not included.
+
+Examples
+--------
+>>> assembly = MmtfBioassembly(structure, 0)
+>>> for transform_index, chain_indices, rotation, translation in assembly.get_operators():
+...     coords = assembly.get_transformed_coords(chain_indices[0], transform_index)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import numpy as np
+from mmtfPyspark.utils.mmtfEncoder import encode_data
+
+
+class MmtfBioassembly(object):
+    '''Biological assembly view of a structure
+
+    Attributes
+    ----------
+    structure : MmtfStructure
+       parent structure
+    assembly_index : int
+       zero-based index into the bioassembly list of the structure
+    '''
+
+    def __init__(self, structure, assembly_index):
+        self.assembly_index = assembly_index
+        self._setup(structure, structure.bio_assembly[assembly_index])
+
+    def __getstate__(self):
+        '''Returns the state for pickling, e.g., when Spark ships, caches, or
+        collects an assembly. Instead of the parent structure and the
+        coordinates of the copies, the encoded data of the chains of the
+        parent structure that are used by the transformations are pickled,
+        with the operators of the assembly. The chain indices of the
+        operators refer to these chains.
+        '''
+        # chains of the models that are used by the transformations
+        used = np.unique(np.concatenate([chain_indices for _, chain_indices, _, _ in self.operators]
+                                        + [np.zeros(0, dtype=np.int64)]))
+        new_index = np.zeros(used.max() + 1 if len(used) > 0 else 0, dtype=np.int64)
+        new_index[used] = np.arange(len(used))
+
+        identity = np.identity(4).flatten().tolist()
+        base = MmtfBioassembly.__new__(MmtfBioassembly)
+        base._setup(self.structure, {'name': self.name,
+                                     'transformList': [{'chainIndexList': used.tolist(), 'matrix': identity}]})
+
+        transforms = []
+        for _, chain_indices, rotation, translation in self.operators:
+            m = np.identity(4)
+            m[0:3, 0:3] = rotation
+            m[3, 0:3] = translation
+            transforms.append({'chainIndexList': new_index[chain_indices].tolist(),
+                               'matrix': m.flatten().tolist()})
+
+        return {'input_data': encode_data(base, bio_assembly=[{'name': self.name, 'transformList': transforms}]),
+                'assembly_index': self.assembly_index,
+                'structure_id': self.structure_id}
+
+    def __setstate__(self, state):
+        '''Rebuilds the assembly as a view of a structure decoded from the
+        pickled chains'''
+        from mmtfPyspark.utils.mmtfStructure import MmtfStructure
+
+        structure = MmtfStructure(state['input_data'])
+        self.assembly_index = state['assembly_index']
+        self._setup(structure, structure.bio_assembly[0])
+        self.structure_id = state['structure_id']
+
+    def _setup(self, structure, assembly):
+        '''Sets up the assembly view of a structure'''
+        self.structure = structure
+        self.name = assembly['name']
+        self.structure_id = structure.structure_id + '-BioAssembly' + self.name
+
+        self.mmtf_version = structure.mmtf_version
+        self.mmtf_producer = structure.mmtf_producer
+        self.unit_cell = structure.unit_cell
+        self.space_group = structure.space_group
+        self.title = structure.title
+        self.deposition_date = structure.deposition_date
+        self.release_date = structure.release_date
+        self.ncs_operator_list = structure.ncs_operator_list
+        self.bio_assembly = []
+        self.experimental_methods = structure.experimental_methods
+        self.resolution = structure.resolution
+        self.r_free = structure.r_free
+        self.r_work = structure.r_work
+        self.group_list = structure.group_list
+        self.num_models = structure.num_models
+
+        # The 4x4 matrices are stored in column-major order, the transpose
+        # is applied to row vectors: xyz @ rotation + translation
+        self.operators = []
+        for transform_index, transform in enumerate(assembly['transformList']):
+            m = np.reshape(np.asarray(transform['matrix'], dtype=np.float64), (4, 4))
+            self.operators.append((transform_index,
+                                   np.asarray(transform['chainIndexList'], dtype=np.int64),
+                                   m[0:3, 0:3],
+                                   m[3, 0:3]))
+
+        self._calc_indices()
+
+        # lazily calculated data
+        self._coords = None
+        self._input_data = None
+
+    def _calc_indices(self):
+        '''Calculates the chains, groups, and atoms of the parent structure
+        that make up the copies of the chains in the assembly
+        '''
+        structure = self.structure
+
+        # atom and group ranges of the chains of the parent structure
+        group_list = structure.group_list
+        atoms_per_type = np.array([len(g['elementList']) for g in group_list], dtype=np.int64)
+        bonds_per_type = np.array([len(g['bondOrderList']) for g in group_list], dtype=np.int64)
+        group_types = np.asarray(structure.group_type_list)
+
+        chains_per_model = np.asarray(structure.chains_per_model[:self.num_models], dtype=np.int64)
+        num_chains = int(chains_per_model.sum())
+        groups_per_chain = np.asarray(structure.groups_per_chain[:num_chains], dtype=np.int64)
+
+        chain_to_group = np.zeros(num_chains + 1, dtype=np.int64)
+        chain_to_group[1:] = np.cumsum(groups_per_chain)
+        group_to_atom = np.zeros(chain_to_group[-1] + 1, dtype=np.int64)
+        group_to_atom[1:] = np.cumsum(atoms_per_type[group_types[:chain_to_group[-1]]])
+        self.chain_to_atom = group_to_atom[chain_to_group]
+
+        # chain indices of the transformations refer to the chains of a model
+        model_of_chain = np.repeat(np.arange(self.num_models), chains_per_model)
+        local_index = np.arange(num_chains) - np.repeat(np.cumsum(chains_per_model) - chains_per_model,
+                                                        chains_per_model)
+
+        member = np.zeros((len(self.operators), max(chains_per_model.max(), 1)), dtype=bool)
+        for transform_index, chain_indices, _, _ in self.operators:
+            chain_indices = chain_indices[chain_indices < member.shape[1]]
+            member[transform_index, chain_indices] = True
+
+        # copies of chains ordered by model, chain, and transformation
+        self.copy_chains, self.copy_transforms = np.nonzero(member[:, local_index].T)
+
+        self.num_chains = len(self.copy_chains)
+        self.chains_per_model = np.bincount(model_of_chain[self.copy_chains],
+                                            minlength=self.num_models).tolist()
+        self.groups_per_chain = groups_per_chain[self.copy_chains].tolist()
+
+        self.group_indices, _ = _expand_ranges(chain_to_group[self.copy_chains],
+                                               chain_to_group[self.copy_chains + 1])
+        self.atom_indices, self.copy_of_atom = _expand_ranges(self.chain_to_atom[self.copy_chains],
+                                                              self.chain_to_atom[self.copy_chains + 1])
+
+        self.num_groups = len(self.group_indices)
+        self.num_atoms = len(self.atom_indices)
+        self.num_bonds = int(bonds_per_type[group_types[self.group_indices]].sum())
+
+        # entities are identified by their description
+        chain_to_entity = np.zeros(num_chains, dtype=np.int64)
+        for i, entity in enumerate(structure.entity_list):
+            chain_index_list = np.asarray(entity['chainIndexList'], dtype=np.int64)
+            chain_to_entity[chain_index_list[chain_index_list < num_chains]] = i
+
+        copy_entities = chain_to_entity[self.copy_chains]
+        descriptions = np.array([e['description'] for e in structure.entity_list], dtype=object)
+        _, first, inverse = np.unique(descriptions[copy_entities].astype(str),
+                                      return_index=True, return_inverse=True)
+
+        self.entity_list = []
+        for u in np.argsort(first):
+            entity = structure.entity_list[copy_entities[first[u]]]
+            self.entity_list.append({'chainIndexList': np.flatnonzero(inverse == u).tolist(),
+                                     'sequence': entity['sequence'],
+                                     'description': entity['description'],
+                                     'type': entity['type']})
+
+    def get_operators(self):
+        '''Returns the transformation operators of the assembly.
+
+        Returns
+        -------
+        list
+           list of (transform index, chain indices, 3x3 rotation, translation)
+           tuples, where the rotation is applied to row vectors
+        '''
+        return self.operators
+
+    def get_transformed_coords(self, chain_index, transform_index):
+        '''Returns the coordinates of a chain of the parent structure after
+        applying a transformation, without materializing the assembly.
+
+        Parameters
+        ----------
+        chain_index : int
+           index of a chain in the parent structure
+        transform_index : int
+           index of the transformation
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           nx3 array of coordinates
+        '''
+        structure = self.structure
+        start, end = self.chain_to_atom[chain_index], self.chain_to_atom[chain_index + 1]
+        _, _, rotation, translation = self.operators[transform_index]
+        xyz = np.column_stack((structure.x_coord_list[start:end],
+                               structure.y_coord_list[start:end],
+                               structure.z_coord_list[start:end]))
+        return xyz @ rotation + translation
+
+    def materialize(self):
+        '''Calculates the coordinates of all copies of the chains'''
+        self._get_coords()
+        return self
+
+    def _get_coords(self):
+        if self._coords is None:
+            structure = self.structure
+            xyz = np.column_stack((structure.x_coord_list,
+                                   structure.y_coord_list,
+                                   structure.z_coord_list)).astype(np.float64)
+
+            # one matrix multiplication per transformation for all of its chain copies
+            self._coords = np.empty((self.num_atoms, 3), dtype=np.float32)
+            transform_of_atom = self.copy_transforms[self.copy_of_atom]
+            for transform_index, _, rotation, translation in self.operators:
+                atoms = np.flatnonzero(transform_of_atom == transform_index)
+                if len(atoms) > 0:
+                    self._coords[atoms] = xyz[self.atom_indices[atoms]] @ rotation + translation
+
+        return self._coords
+
+    @property
+    def x_coord_list(self):
+        """Return x coordinates"""
+        return self._get_coords()[:, 0]
+
+    @property
+    def y_coord_list(self):
+        """Return y coordinates"""
+        return self._get_coords()[:, 1]
+
+    @property
+    def z_coord_list(self):
+        """Return z coordinates"""
+        return self._get_coords()[:, 2]
+
+    @property
+    def b_factor_list(self):
+        """Return b factors"""
+        return np.asarray(self.structure.b_factor_list)[self.atom_indices]
+
+    @property
+    def occupancy_list(self):
+        """Return occupancies"""
+        return np.asarray(self.structure.occupancy_list)[self.atom_indices]
+
+    @property
+    def atom_id_list(self):
+        """Return atom ids"""
+        return np.asarray(self.structure.atom_id_list)[self.atom_indices]
+
+    @property
+    def alt_loc_list(self):
+        """Return alternative location codes"""
+        return np.asarray(self.structure.alt_loc_list)[self.atom_indices]
+
+    @property
+    def group_type_list(self):
+        """Return group types (indices into group_list)"""
+        return np.asarray(self.structure.group_type_list)[self.group_indices]
+
+    @property
+    def group_id_list(self):
+        """Return group ids"""
+        return np.asarray(self.structure.group_id_list)[self.group_indices]
+
+    @property
+    def ins_code_list(self):
+        """Return insertion codes"""
+        return np.asarray(self.structure.ins_code_list)[self.group_indices]
+
+    @property
+    def sec_struct_list(self):
+        """Return secondary structure codes"""
+        return np.asarray(self.structure.sec_struct_list)[self.group_indices]
+
+    @property
+    def sequence_index_list(self):
+        """Return sequence indices"""
+        return np.asarray(self.structure.sequence_index_list)[self.group_indices]
+
+    @property
+    def chain_name_list(self):
+        """Return chain names"""
+        return np.asarray(self.structure.chain_name_list)[self.copy_chains]
+
+    @property
+    def chain_id_list(self):
+        """Return chain ids"""
+        return np.asarray(self.structure.chain_id_list)[self.copy_chains]
+
+    @property
+    def bond_atom_list(self):
+        """Return inter-group bonds (not included in assemblies)"""
+        return np.empty(0, dtype=np.int32)
+
+    @property
+    def bond_order_list(self):
+        """Return inter-group bond orders (not included in assemblies)"""
+        return np.empty(0, dtype=np.int8)
+
+    @property
+    def input_data(self):
+        """Return the assembly as a dictionary of MMTF encoded data. The data
+        are only encoded when requested, e.g., by mmtfWriter."""
+        if self._input_data is None:
+            self._input_data = encode_data(self)
+        return self._input_data
+
+
+def _expand_ranges(starts, ends):
+    '''Returns the concatenated indices of a list of [start, end) ranges and
+    the range index of each index
+    '''
+    lengths = ends - starts
+    range_index = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    indices = starts[range_index] + np.arange(lengths.sum()) - offsets[range_index]
+    return indices, range_index
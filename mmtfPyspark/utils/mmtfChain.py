@@ -11,34 +11,50 @@ __status__ = "Experimental"
 
 import numpy as np
 import pandas as pd
+from mmtfPyspark.utils.mmtfEncoder import encode_data
 
 
 class MmtfChain(object):
 
-    def __init__(self, structure, chain_name):
-        """Extracts the specified polymer chain from a structure"""
+    def __init__(self, structure, chain_name, chain_index=None):
+        """Extracts the specified polymer chain from a structure. The chain is a
+        view that slices the arrays of the structure without copying them.
+        If a chain_index is specified, the chain at this index is used instead
+        of the first polymer chain with the specified chain name."""
         self.structure = structure
         self.chain_name = chain_name
+        self.chain_index = chain_index
         self.start = None
         self.end = None
+        self.group_start = None
+        self.group_end = None
         self.num_atoms = 0
         self.num_groups = 0
         self.num_chains = 1
         self.num_models = 1
 
-        indices = np.where(structure.chain_name_list == chain_name)
-        if indices[0].size == 0:
-            raise ValueError("Structure " + structure.structure_id + " does not contain chain: " + chain_name)
-
-        # find start and end of the first polymer chain
-        for i in indices[0]:
-            ind = structure.entityChainIndex[i]
-            if structure.entity_list[ind]['type'] == 'polymer':
-                self.start = structure.chainToAtomIndices[i]
-                self.end = structure.chainToAtomIndices[i+1]
-                self.num_atoms = self.end - self.start
-                self.num_groups = structure.chainToGroupIndices[i+1] - structure.chainToGroupIndices[i]
-                break
+        if chain_index is None:
+            indices = np.where(structure.chain_name_list == chain_name)
+            if indices[0].size == 0:
+                raise ValueError("Structure " + structure.structure_id + " does not contain chain: " + chain_name)
+
+            # find start and end of the first polymer chain
+            for i in indices[0]:
+                ind = structure.entityChainIndex[i]
+                if structure.entity_list[ind]['type'] == 'polymer':
+                    self.chain_index = i
+                    break
+
+        entity = None
+        if self.chain_index is not None:
+            i = self.chain_index
+            self.start = structure.chainToAtomIndices[i]
+            self.end = structure.chainToAtomIndices[i+1]
+            self.group_start = structure.chainToGroupIndices[i]
+            self.group_end = structure.chainToGroupIndices[i+1]
+            self.num_atoms = self.end - self.start
+            self.num_groups = self.group_end - self.group_start
+            entity = structure.entity_list[structure.entityChainIndex[i]]
 
         self.mmtf_version = structure.mmtf_version
         self.mmtf_producer = structure.mmtf_producer
@@ -52,6 +68,10 @@ class MmtfChain(object):
         # TODO
         self.bio_assembly = None
         self.entity_list = structure.entity_list
+        self.entity = entity
+        self.group_list = structure.group_list
+        self.groups_per_chain = [self.num_groups]
+        self.chains_per_model = [1]
 
         self.experimental_methods = structure.experimental_methods
         self.resolution = structure.resolution
@@ -59,6 +79,89 @@ class MmtfChain(object):
         self.r_work = structure.r_work
         # dataframes
         self.df = None
+        # encoded data
+        self._input_data = None
+
+    def __getstate__(self):
+        """Return the state for pickling, e.g., when Spark ships, caches, or
+        collects a chain. Only the encoded data of the chain are pickled, not
+        the parent structure."""
+        return {'input_data': self.input_data,
+                'chain_name': self.chain_name,
+                'structure_id': self.structure_id,
+                'entity_list': self.entity_list,
+                'entity': self.entity}
+
+    def __setstate__(self, state):
+        """Rebuild the chain as a view of a structure decoded from the
+        encoded data of the chain"""
+        from mmtfPyspark.utils.mmtfStructure import MmtfStructure
+
+        input_data = state['input_data']
+        self.__init__(MmtfStructure(input_data), state['chain_name'], chain_index=0)
+        self.structure_id = state['structure_id']
+        self.entity_list = state['entity_list']
+        self.entity = state['entity']
+        self._input_data = input_data
+
+    @property
+    def chain_name_list(self):
+        """Return chain names"""
+        return self.structure.chain_name_list[self.chain_index:self.chain_index+1]
+
+    @property
+    def chain_id_list(self):
+        """Return chain ids"""
+        return self.structure.chain_id_list[self.chain_index:self.chain_index+1]
+
+    @property
+    def group_type_list(self):
+        """Return group types (indices into group_list)"""
+        return self.structure.group_type_list[self.group_start:self.group_end]
+
+    @property
+    def group_id_list(self):
+        """Return group ids"""
+        return self.structure.group_id_list[self.group_start:self.group_end]
+
+    @property
+    def ins_code_list(self):
+        """Return insertion codes"""
+        return self.structure.ins_code_list[self.group_start:self.group_end]
+
+    @property
+    def sec_struct_list(self):
+        """Return secondary structure codes"""
+        return self.structure.sec_struct_list[self.group_start:self.group_end]
+
+    @property
+    def sequence_index_list(self):
+        """Return sequence indices"""
+        return self.structure.sequence_index_list[self.group_start:self.group_end]
+
+    @property
+    def bond_atom_list(self):
+        """Return inter-group bonds (not included in chain views)"""
+        return np.empty(0, dtype=np.int32)
+
+    @property
+    def bond_order_list(self):
+        """Return inter-group bond orders (not included in chain views)"""
+        return np.empty(0, dtype=np.int8)
+
+    @property
+    def num_bonds(self):
+        """Return number of intra-group bonds"""
+        bonds_per_type = np.array([len(group['bondOrderList']) for group in self.group_list], dtype=np.int32)
+        return int(bonds_per_type[self.group_type_list].sum())
+
+    @property
+    def input_data(self):
+        """Return the chain as a dictionary of MMTF encoded data. The data are
+        only encoded when requested, e.g., by mmtfWriter."""
+        if self._input_data is None:
+            self._input_data = encode_data(self, entity_list=self.get_chain_entity_list(), bio_assembly=[])
+        return self._input_data
 
     @property
     def atom_id_list(self):
@@ -157,6 +260,10 @@ class MmtfChain(object):
         """Return sequence_positions"""
         return self.structure.sequence_positions[self.start:self.end]
 
+    def get_chain_entity_list(self):
+        """Return an entity list that only contains the entity of this chain"""
+        return [dict(self.entity, chainIndexList=[0])]
+
     def to_pandas(self, add_cols=None, multi_index=False):
         if self.df is None:
             self.df = pd.DataFrame({'chain_name': self.chain_names,
@@ -0,0 +1,80 @@
+#!/user/bin/env python
+'''mmtfEncoder.py
+
+Encodes structures that provide the MMTF list interface (e.g., chain and
+bioassembly views) into a dictionary of MMTF encoded data, which can be
+serialized with msgpack, e.g., by mmtfWriter.
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+from mmtf.codecs import encode_array
+
+
+def encode_data(structure, entity_list=None, bio_assembly=None):
+    '''Returns a dictionary of MMTF encoded data. Inter-group bonds are
+    encoded from the bond_atom_list and bond_order_list of the structure.
+
+    Parameters
+    ----------
+    structure : object
+       structure with the MMTF list interface
+    entity_list : list
+       entity list to be encoded instead of the entity list of the structure
+    bio_assembly : list
+       bioassembly list to be encoded instead of the bioassemblies of the structure
+
+    Returns
+    -------
+    dict
+       MMTF encoded data
+    '''
+
+    if entity_list is None:
+        entity_list = structure.entity_list
+    if bio_assembly is None:
+        bio_assembly = structure.bio_assembly if structure.bio_assembly is not None else []
+
+    return {"mmtfVersion": structure.mmtf_version,
+            "mmtfProducer": structure.mmtf_producer,
+            "unitCell": structure.unit_cell,
+            "spaceGroup": structure.space_group,
+            "structureId": structure.structure_id,
+            "title": structure.title,
+            "depositionDate": structure.deposition_date,
+            "releaseDate": structure.release_date,
+            "ncsOperatorList": structure.ncs_operator_list,
+            "bioAssemblyList": bio_assembly,
+            "entityList": entity_list,
+            "experimentalMethods": structure.experimental_methods,
+            "resolution": structure.resolution,
+            "rFree": structure.r_free,
+            "rWork": structure.r_work,
+            "numBonds": int(structure.num_bonds),
+            "numAtoms": int(structure.num_atoms),
+            "numGroups": int(structure.num_groups),
+            "numChains": int(structure.num_chains),
+            "numModels": int(structure.num_models),
+            "groupList": structure.group_list,
+            "xCoordList": encode_array(structure.x_coord_list, 10, 1000),
+            "yCoordList": encode_array(structure.y_coord_list, 10, 1000),
+            "zCoordList": encode_array(structure.z_coord_list, 10, 1000),
+            "bFactorList": encode_array(structure.b_factor_list, 10, 100),
+            "occupancyList": encode_array(structure.occupancy_list, 9, 100),
+            "atomIdList": encode_array(structure.atom_id_list, 8, 0),
+            # decoded empty codes are '', MMTF encodes them as null characters
+            "altLocList": encode_array([c or '\x00' for c in structure.alt_loc_list], 6, 0),
+            "insCodeList": encode_array([c or '\x00' for c in structure.ins_code_list], 6, 0),
+            "groupIdList": encode_array(structure.group_id_list, 8, 0),
+            "groupTypeList": encode_array(structure.group_type_list, 4, 0),
+            "secStructList": encode_array(structure.sec_struct_list, 2, 0),
+            "sequenceIndexList": encode_array(structure.sequence_index_list, 8, 0),
+            "chainIdList": encode_array(structure.chain_id_list, 5, 4),
+            "chainNameList": encode_array(structure.chain_name_list, 5, 4),
+            "groupsPerChain": [int(n) for n in structure.groups_per_chain],
+            "chainsPerModel": [int(n) for n in structure.chains_per_model],
+            "bondAtomList": encode_array(structure.bond_atom_list, 4, 0),
+            "bondOrderList": encode_array(structure.bond_order_list, 2, 0),
+            }
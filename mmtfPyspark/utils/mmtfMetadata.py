@@ -0,0 +1,72 @@
+#!/user/bin/env python
+'''mmtfMetadata.py
+
+A partially decoded structure that only provides the requested metadata
+fields of an MMTF record, e.g., resolution or release date. It is used to
+evaluate filters that declare the fields they read, before a record is
+fully decoded into an MmtfStructure.
+
+Examples
+--------
+>>> metadata = MmtfMetadata(input_data, ['resolution', 'r_free'])
+>>> metadata.resolution
+1.9
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+from mmtfPyspark.utils import mmtfDecoder
+
+# MmtfStructure attribute names of the metadata fields and their MMTF keys
+METADATA_FIELDS = {'structure_id': 'structureId',
+                   'title': 'title',
+                   'deposition_date': 'depositionDate',
+                   'release_date': 'releaseDate',
+                   'experimental_methods': 'experimentalMethods',
+                   'resolution': 'resolution',
+                   'r_free': 'rFree',
+                   'r_work': 'rWork',
+                   'unit_cell': 'unitCell',
+                   'space_group': 'spaceGroup',
+                   'mmtf_version': 'mmtfVersion',
+                   'mmtf_producer': 'mmtfProducer'}
+
+
+class MmtfMetadata(object):
+    '''Partially decoded structure with the requested metadata fields
+
+    Attributes
+    ----------
+    input_data : dict
+       msgpack unpacked MMTF data
+    fields : list
+       MmtfStructure attribute names of the metadata fields to decode
+    '''
+
+    def __init__(self, input_data, fields):
+        for field in fields:
+            if field not in METADATA_FIELDS:
+                raise ValueError("Not a metadata field: " + field)
+
+            setattr(self, field, mmtfDecoder.get_value(input_data, METADATA_FIELDS[field]))
+
+
+def is_metadata_filter(filter_function):
+    '''Returns true if a filter declares the fields it reads and all of them
+    are metadata fields.
+
+    Parameters
+    ----------
+    filter_function : filter
+       filter with an optional fields attribute
+
+    Returns
+    -------
+    bool
+       true if the filter can be evaluated on an MmtfMetadata record
+    '''
+    fields = getattr(filter_function, 'fields', None)
+
+    return fields is not None and all(field in METADATA_FIELDS for field in fields)
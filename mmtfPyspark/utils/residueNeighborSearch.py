@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+'''residueNeighborSearch.py
+
+Finds groups (residues) that are within a cutoff distance of a set of query
+groups. All atoms of the first model are indexed once in a KD-tree and the
+neighbors of all query groups are found in a single batched query. Results
+are returned as index arrays, which are mapped onto rows by the caller.
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class ResidueNeighborSearch(object):
+    '''Indexes the atoms of the first model of a structure for rapid lookup
+    of neighboring groups (residues)
+
+    Attributes
+    ----------
+    structure : MmtfStructure
+       structure to be indexed
+    '''
+
+    def __init__(self, structure):
+        self.structure = structure
+
+        # only the first model is considered
+        self.num_groups = int(structure.modelToGroupIndices[1])
+        self.group_to_atom_indices = structure.groupToAtomIndices[:self.num_groups + 1]
+        self.num_atoms = int(self.group_to_atom_indices[-1])
+
+        atoms_per_group = np.diff(self.group_to_atom_indices)
+        self.atom_to_group_indices = np.repeat(np.arange(self.num_groups, dtype=np.int32),
+                                               atoms_per_group)
+
+        # group names are looked up once per group type in the group list
+        group_types = structure.group_type_list[:self.num_groups]
+        type_names = np.array([group['groupName'] for group in structure.group_list], dtype=np.object_)
+        self.group_names = type_names[group_types]
+
+        self.coords = np.column_stack((structure.x_coord_list[:self.num_atoms],
+                                       structure.y_coord_list[:self.num_atoms],
+                                       structure.z_coord_list[:self.num_atoms]))
+        self._tree = None
+
+    @property
+    def tree(self):
+        '''KD-tree over all atoms, built on first use'''
+        if self._tree is None:
+            self._tree = cKDTree(self.coords)
+        return self._tree
+
+    def get_group_indices(self, group_name):
+        '''Returns the indices of all groups with the specified name
+
+        Parameters
+        ----------
+        group_name : str
+           group name, e.g., "ZN", "ATP"
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           group indices in ascending order
+        '''
+        return np.flatnonzero(self.group_names == group_name)
+
+    def get_atom_contacts(self, query_groups, cutoff_distance):
+        '''Returns all pairs of atoms within the cutoff distance, where the
+        first atom belongs to one of the query groups and the second atom
+        belongs to any other group.
+
+        Parameters
+        ----------
+        query_groups : :obj:`array <numpy.ndarray>`
+           indices of the query groups
+        cutoff_distance : float
+           maximum distance between atoms
+
+        Returns
+        -------
+        tuple
+           query atom indices, neighbor atom indices, distances. Pairs are
+           sorted by query group, neighbor group, neighbor atom, query atom.
+        '''
+        query_groups = np.asarray(query_groups, dtype=np.int32)
+        if query_groups.size == 0 or self.num_atoms == 0:
+            empty = np.empty(0, dtype=np.int32)
+            return empty, empty, np.empty(0, dtype=np.float64)
+
+        query_atoms = np.concatenate([np.arange(self.group_to_atom_indices[g],
+                                                self.group_to_atom_indices[g + 1])
+                                      for g in query_groups]).astype(np.int32)
+
+        # batched query for all query atoms at once
+        query_tree = cKDTree(self.coords[query_atoms])
+        pairs = query_tree.sparse_distance_matrix(self.tree, max_distance=cutoff_distance,
+                                                  output_type='ndarray')
+
+        qa = query_atoms[pairs['i']]
+        na = pairs['j'].astype(np.int32)
+        d = pairs['v']
+
+        # exclude atoms within the same group
+        qg = self.atom_to_group_indices[qa]
+        ng = self.atom_to_group_indices[na]
+        keep = qg != ng
+        qa, na, d, qg, ng = qa[keep], na[keep], d[keep], qg[keep], ng[keep]
+
+        order = np.lexsort((qa, na, ng, qg))
+        return qa[order], na[order], d[order]
+
+    def get_group_contacts(self, query_groups, cutoff_distance):
+        '''Returns all pairs of groups within the cutoff distance and the
+        minimum atom-atom distance for each pair.
+
+        Parameters
+        ----------
+        query_groups : :obj:`array <numpy.ndarray>`
+           indices of the query groups
+        cutoff_distance : float
+           maximum distance between atoms
+
+        Returns
+        -------
+        tuple
+           query group indices, neighbor group indices, minimum distances.
+           Pairs are sorted by query group and neighbor group.
+        '''
+        qa, na, d = self.get_atom_contacts(query_groups, cutoff_distance)
+        qg = self.atom_to_group_indices[qa]
+        ng = self.atom_to_group_indices[na]
+
+        if d.size == 0:
+            return qg, ng, d
+
+        # sort by group pair and distance, then keep the first entry of each pair
+        order = np.lexsort((d, ng, qg))
+        qg, ng, d = qg[order], ng[order], d[order]
+        first = np.ones(d.size, dtype=bool)
+        first[1:] = (qg[1:] != qg[:-1]) | (ng[1:] != ng[:-1])
+
+        return qg[first], ng[first], d[first]
+
+    def get_atom_names(self, atom_indices):
+        '''Returns the atom names for the specified atoms
+
+        Parameters
+        ----------
+        atom_indices : :obj:`array <numpy.ndarray>`
+           atom indices
+        '''
+        return self._get_atom_property(atom_indices, 'atomNameList')
+
+    def get_elements(self, atom_indices):
+        '''Returns the element symbols for the specified atoms
+
+        Parameters
+        ----------
+        atom_indices : :obj:`array <numpy.ndarray>`
+           atom indices
+        '''
+        return self._get_atom_property(atom_indices, 'elementList')
+
+    def _get_atom_property(self, atom_indices, key):
+        groups = self.atom_to_group_indices[atom_indices]
+        slots = atom_indices - self.group_to_atom_indices[groups]
+        group_types = self.structure.group_type_list[groups]
+        group_list = self.structure.group_list
+
+        return [group_list[t][key][s] for t, s in zip(group_types, slots)]
@@ -0,0 +1,434 @@
+#!/user/bin/env python
+'''sequenceAlignment.py
+
+Pairwise sequence comparison used for sequence clustering and similarity
+searches. The edit distance is calculated with the bit-parallel algorithm
+of Myers (1999): a column of the dynamic programming matrix is encoded in
+the bits of an integer and updated with a constant number of bit operations
+per residue. The calculation stops as soon as the distance is known to
+exceed a maximum distance.
+
+Local alignments are calculated with the Smith-Waterman algorithm, the
+BLOSUM62 substitution matrix (see ProteinSequenceEncoder), and affine gap
+costs. The scores of a query sequence against many target sequences are
+calculated together: each row of the dynamic programming matrices is updated
+for all targets and positions with a few numpy operations, and the
+horizontal gaps of a row are resolved with a cumulative maximum (Farrar
+2007). Statistical significance is estimated with the Karlin-Altschul
+parameters of gapped BLAST for BLOSUM62 with the default gap costs.
+
+References
+----------
+- G. Myers. A fast bit-vector algorithm for approximate string matching based
+  on dynamic programming. J. ACM 46, 395-415 (1999).
+- H. Hyyro. A bit-vector algorithm for computing Levenshtein and Damerau edit
+  distances. Nordic Journal of Computing 10, 29-39 (2003).
+- T. F. Smith, M. S. Waterman. Identification of common molecular
+  subsequences. J. Mol. Biol. 147, 195-197 (1981).
+- M. Farrar. Striped Smith-Waterman speeds database searches six times over
+  other SIMD implementations. Bioinformatics 23, 156-161 (2007).
+
+Examples
+--------
+>>> get_edit_distance("VLSPADKTNV", "VLSAADKTNVK", 3)
+2
+>>> get_sequence_identity("VLSPADKTNV", "VLSAADKTNVK", 0.8)
+0.8181818181818181
+>>> get_local_alignment_scores("VLSPADKTNV", ["VLSAADKTNVK", "GGGG"])
+array([41,  0], dtype=int32)
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import numpy as np
+
+# default gap costs, a gap of length n costs GAP_OPEN + n * GAP_EXTEND
+GAP_OPEN = 11
+GAP_EXTEND = 1
+
+# Karlin-Altschul parameters of gapped BLAST for BLOSUM62 with gap costs 11/1
+LAMBDA = 0.267
+K = 0.041
+
+# one-letter codes of the substitution matrix, other residues are scored as X
+_RESIDUES = 'ARNDCQEGHILKMFPSTWYV'
+_UNKNOWN = len(_RESIDUES)
+_PADDING = _UNKNOWN + 1
+
+_ENCODING = np.full(256, _UNKNOWN, dtype=np.intp)
+_ENCODING[[ord(residue) for residue in _RESIDUES]] = np.arange(len(_RESIDUES))
+
+_NEGATIVE = -(1 << 24)
+_scoring_matrix = None
+
+# maximum number of cells of the matrices of a traceback calculation
+_MAX_CELLS = 1 << 24
+
+
+def get_edit_distance(sequence1, sequence2, max_distance):
+    '''Returns the edit distance (number of insertions, deletions, and
+    substitutions) between two sequences if it does not exceed max_distance.
+
+    Parameters
+    ----------
+    sequence1 : str
+       first sequence
+    sequence2 : str
+       second sequence
+    max_distance : int
+       maximum edit distance
+
+    Returns
+    -------
+    int
+       edit distance, or None if the edit distance exceeds max_distance
+    '''
+    a, b = sequence1, sequence2
+    if len(a) > len(b):
+        a, b = b, a
+
+    m, n = len(a), len(b)
+    if n - m > max_distance:
+        return None
+    if m == 0:
+        return n
+
+    # bit masks of the positions of each residue in the shorter sequence
+    peq = {}
+    bit = 1
+    for c in a:
+        peq[c] = peq.get(c, 0) | bit
+        bit <<= 1
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+
+    # positive and negative vertical differences of the current column
+    pv, mv = full, 0
+    distance = m
+
+    for j, c in enumerate(b, 1):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (full & ~(xh | pv))
+        mh = pv & xh
+
+        if ph & last:
+            distance += 1
+        elif mh & last:
+            distance -= 1
+
+        # global alignment: the first row increases by one per column
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (full & ~(xv | ph))
+        mv = ph & xv
+
+        # the distance decreases by at most one per remaining column
+        if distance - (n - j) > max_distance:
+            return None
+
+    return distance if distance <= max_distance else None
+
+
+def get_sequence_identity(sequence1, sequence2, min_identity=0.0):
+    '''Returns the sequence identity of two sequences, defined as
+    1 - edit distance / length of the longer sequence, if it is at least
+    min_identity. This identity is a lower bound of the fraction of
+    identical residues in an optimal global alignment, relative to the
+    length of the longer sequence, and therefore also requires a high
+    coverage of both sequences.
+
+    Parameters
+    ----------
+    sequence1 : str
+       first sequence
+    sequence2 : str
+       second sequence
+    min_identity : float
+       minimum sequence identity (0.0 - 1.0)
+
+    Returns
+    -------
+    float
+       sequence identity, or None if it is below min_identity
+    '''
+    length = max(len(sequence1), len(sequence2))
+    if length == 0:
+        return None
+
+    max_distance = int(np.floor((1.0 - min_identity) * length + 1e-9))
+    distance = get_edit_distance(sequence1, sequence2, max_distance)
+    if distance is None:
+        return None
+
+    return 1.0 - distance / length
+
+
+def get_local_alignment_scores(query, targets, gap_open=GAP_OPEN, gap_extend=GAP_EXTEND):
+    '''Returns the Smith-Waterman scores of the local alignments of a query
+    sequence with a list of target sequences. The targets are aligned
+    together, one row of the dynamic programming matrices at a time.
+
+    Parameters
+    ----------
+    query : str
+       query sequence
+    targets : list
+       target sequences
+    gap_open : int
+       gap opening cost
+    gap_extend : int
+       gap extension cost
+
+    Returns
+    -------
+    ndarray
+       alignment score of each target
+    '''
+    if len(targets) == 0 or len(query) == 0:
+        return np.zeros(len(targets), dtype=np.int32)
+
+    # targets padded to the same length with a residue that never aligns
+    length = max(max(len(target) for target in targets), 1)
+    codes = np.full((len(targets), length), _PADDING, dtype=np.intp)
+    for i, target in enumerate(targets):
+        codes[i, :len(target)] = encode(target)
+
+    best = np.zeros(len(targets), dtype=np.int32)
+    for h, _, _ in _get_rows(encode(query), codes, gap_open, gap_extend):
+        np.maximum(best, h.max(axis=1), out=best)
+
+    return best
+
+
+def get_local_alignment(sequence1, sequence2, gap_open=GAP_OPEN, gap_extend=GAP_EXTEND):
+    '''Returns the optimal local alignment of two sequences (Smith-Waterman)
+
+    Parameters
+    ----------
+    sequence1 : str
+       first sequence
+    sequence2 : str
+       second sequence
+    gap_open : int
+       gap opening cost
+    gap_extend : int
+       gap extension cost
+
+    Returns
+    -------
+    tuple
+       (score, identity, length, start1, end1, start2, end2), where
+       identity is the fraction of identical residues in the alignment
+       columns, length is the number of alignment columns including gaps,
+       and start and end are the 0-based start and end (exclusive) of the
+       aligned regions of the sequences
+    '''
+    return get_local_alignments(sequence1, [sequence2], gap_open, gap_extend)[0]
+
+
+def get_local_alignments(query, targets, gap_open=GAP_OPEN, gap_extend=GAP_EXTEND):
+    '''Returns the optimal local alignments of a query sequence with a list
+    of target sequences. The dynamic programming matrices of many targets are
+    calculated together, and the alignments are traced back one by one.
+
+    Parameters
+    ----------
+    query : str
+       query sequence
+    targets : list
+       target sequences
+    gap_open : int
+       gap opening cost
+    gap_extend : int
+       gap extension cost
+
+    Returns
+    -------
+    list
+       alignment of each target, see :func:`get_local_alignment`
+    '''
+    codes1 = encode(query)
+    alignments = []
+    if len(codes1) == 0:
+        return [(0, 0.0, 0, 0, 0, 0, 0)] * len(targets)
+
+    # number of targets per calculation, limited by the size of the matrices
+    length = max([len(target) for target in targets] + [1])
+    chunk_size = max(1, _MAX_CELLS // ((len(codes1) + 1) * (length + 1)))
+
+    for start in range(0, len(targets), chunk_size):
+        chunk = [encode(target) for target in targets[start:start + chunk_size]]
+        length = max(max(len(codes2) for codes2 in chunk), 1)
+
+        codes = np.full((len(chunk), length), _PADDING, dtype=np.intp)
+        for t, codes2 in enumerate(chunk):
+            codes[t, :len(codes2)] = codes2
+
+        # matrices with a leading row and column of the empty prefixes
+        h = np.zeros((len(chunk), len(codes1) + 1, length + 1), dtype=np.int32)
+        for i, (h_row, _, _) in enumerate(_get_rows(codes1, codes, gap_open, gap_extend), 1):
+            h[:, i, 1:] = h_row
+
+        for t, codes2 in enumerate(chunk):
+            alignments.append(_traceback(h[t, :, :len(codes2) + 1], codes1, codes2,
+                                         gap_open, gap_extend))
+
+    return alignments
+
+
+def get_bit_score(score):
+    '''Returns the bit score of an alignment score
+
+    Parameters
+    ----------
+    score : int
+       alignment score
+
+    Returns
+    -------
+    float
+       bit score
+    '''
+    return (LAMBDA * score - np.log(K)) / np.log(2)
+
+
+def get_e_value(score, query_length, database_size):
+    '''Returns the expect value (E-value) of an alignment score, the number
+    of alignments with at least this score that are expected by chance when
+    a query is searched against a database of unrelated sequences. Edge
+    effects of the sequence lengths are not corrected.
+
+    Parameters
+    ----------
+    score : int
+       alignment score
+    query_length : int
+       length of the query sequence
+    database_size : int
+       total number of residues of the database sequences
+
+    Returns
+    -------
+    float
+       E-value
+    '''
+    return K * query_length * database_size * np.exp(-LAMBDA * score)
+
+
+def encode(sequence):
+    '''Returns the indices of the residues of a sequence in the substitution
+    matrix
+
+    Parameters
+    ----------
+    sequence : str
+       sequence (one-letter codes)
+
+    Returns
+    -------
+    ndarray
+       residue indices
+    '''
+    return _ENCODING[np.frombuffer(sequence.upper().encode('ascii', 'replace'), dtype=np.uint8)]
+
+
+def get_scoring_matrix():
+    '''Returns the BLOSUM62 substitution matrix indexed by the residue indices
+    of :func:`encode`, including the scores of unknown residues (X)
+
+    Returns
+    -------
+    ndarray
+       substitution matrix
+    '''
+    global _scoring_matrix
+
+    if _scoring_matrix is None:
+        from mmtfPyspark.ml.proteinSequenceEncoder import ProteinSequenceEncoder
+        blosum62 = ProteinSequenceEncoder.blosum62
+
+        size = len(_RESIDUES) + 2
+        matrix = np.full((size, size), _NEGATIVE, dtype=np.int32)
+        for i, residue in enumerate(_RESIDUES + 'X'):
+            matrix[i, :_UNKNOWN] = blosum62[residue]
+            matrix[:_UNKNOWN, i] = blosum62[residue]
+        matrix[_UNKNOWN, _UNKNOWN] = blosum62['X'][0]
+
+        _scoring_matrix = matrix
+
+    return _scoring_matrix
+
+
+def _traceback(h, codes1, codes2, gap_open, gap_extend):
+    '''Returns the local alignment of two encoded sequences traced back
+    through the Smith-Waterman matrix H. A gap of length n that ends in a
+    cell of H starts in a cell with a score that is higher by
+    gap_open + n * gap_extend.'''
+    i, j = np.unravel_index(np.argmax(h), h.shape)
+    score = int(h[i, j])
+    if score == 0:
+        return 0, 0.0, 0, 0, 0, 0, 0
+
+    end1, end2 = int(i), int(j)
+    matrix = get_scoring_matrix()
+
+    identical = length = 0
+    while h[i, j] > 0:
+        value = h[i, j]
+        if value == h[i - 1, j - 1] + matrix[codes1[i - 1], codes2[j - 1]]:
+            identical += codes1[i - 1] == codes2[j - 1] and codes1[i - 1] != _UNKNOWN
+            i, j = i - 1, j - 1
+            length += 1
+            continue
+
+        # gap in sequence2 (vertical), the shortest matching gap
+        gaps = np.arange(i, 0, -1)
+        match = np.nonzero(h[:i, j] - gap_open - gap_extend * gaps == value)[0]
+        if len(match) > 0:
+            length += i - match[-1]
+            i = match[-1]
+            continue
+
+        # gap in sequence1 (horizontal)
+        gaps = np.arange(j, 0, -1)
+        match = np.nonzero(h[i, :j] - gap_open - gap_extend * gaps == value)[0]
+        length += j - match[-1]
+        j = match[-1]
+
+    return score, identical / length, length, int(i), end1, int(j), end2
+
+
+def _get_rows(query, targets, gap_open, gap_extend):
+    '''Yields the rows (H, E, F) of the Smith-Waterman matrices of an
+    encoded query and a 2D array of encoded targets, without the leading
+    column. E are the scores of alignments that end with a gap in a target,
+    F with a gap in the query, and H the maximum of all alignments.'''
+    matrix = get_scoring_matrix()
+    num_targets, length = targets.shape
+    opening = gap_open + gap_extend
+
+    # gap_extend * column, used to resolve the horizontal gaps of a row
+    columns = gap_extend * np.arange(length, dtype=np.int32)
+
+    h = np.zeros((num_targets, length + 1), dtype=np.int32)
+    e = np.full((num_targets, length), _NEGATIVE, dtype=np.int32)
+    f = np.full((num_targets, length), _NEGATIVE, dtype=np.int32)
+
+    for residue in query:
+        diagonal = h[:, :-1] + matrix[residue][targets]
+        e = np.maximum(h[:, 1:] - opening, e - gap_extend)
+        h0 = np.maximum(np.maximum(diagonal, e), 0)
+
+        # F[j] = max over k < j of H0[k] - gap_open - gap_extend * (j - k),
+        # gaps that extend a horizontal gap never score higher
+        g = np.maximum.accumulate(h0 + columns, axis=1)
+        f[:, 1:] = g[:, :-1] - columns[1:] - gap_open
+        f[:, 0] = _NEGATIVE
+
+        h[:, 1:] = np.maximum(h0, f)
+        yield h[:, 1:], e, f
@@ -0,0 +1,240 @@
+#!/user/bin/env python
+'''solventAccessibleSurface.py
+
+Calculates the solvent accessible surface area (SASA) of the atoms in a
+structure with the Shrake-Rupley algorithm. A fixed set of points is placed
+on a sphere with the van der Waals radius plus the probe radius around each
+atom. The points that are not inside the sphere of a neighbor atom are
+solvent accessible.
+
+The neighbor atoms that can occlude the points of an atom are found in a
+single KD-tree query for all atoms. The occlusion tests run in a compiled
+loop that checks the last occluding neighbor first.
+
+References
+----------
+- A. Shrake & J. A. Rupley (1973) Environment and exposure to solvent of
+  protein atoms. Lysozyme and insulin, J Mol Biol 79, 351-371.
+  https://doi.org/10.1016/0022-2836(73)90011-9
+
+Examples
+--------
+>>> sasa = SolventAccessibleSurface(structure)
+>>> sasa.get_group_sasa()
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import math
+import numpy as np
+from numba import njit
+from scipy.spatial import cKDTree
+from mmtfPyspark.utils import ColumnarStructure
+
+# van der Waals radii (A. Bondi (1964) J Phys Chem 68, 441-451)
+VDW_RADII = {'H': 1.20, 'D': 1.20, 'C': 1.70, 'N': 1.55, 'O': 1.52, 'F': 1.47,
+             'Na': 2.27, 'Mg': 1.73, 'Si': 2.10, 'P': 1.80, 'S': 1.80, 'Cl': 1.75,
+             'K': 2.75, 'Ni': 1.63, 'Cu': 1.40, 'Zn': 1.39, 'Ga': 1.87, 'As': 1.85,
+             'Se': 1.90, 'Br': 1.85, 'Pd': 1.63, 'Ag': 1.72, 'Cd': 1.58, 'In': 1.93,
+             'Sn': 2.17, 'Te': 2.06, 'I': 1.98, 'Xe': 2.16, 'Pt': 1.75, 'Au': 1.66,
+             'Hg': 1.55, 'Tl': 1.96, 'Pb': 2.02, 'U': 1.86}
+DEFAULT_RADIUS = 1.80
+
+_sphere_points = dict()
+
+
+def get_sphere_points(num_points):
+    '''Returns approximately evenly distributed points on a unit sphere
+    (golden section spiral). The point sets are cached.
+
+    Parameters
+    ----------
+    num_points : int
+       number of points
+
+    Returns
+    -------
+    :obj:`array <numpy.ndarray>`
+       num_points x 3 array of points on the unit sphere
+    '''
+
+    if num_points not in _sphere_points:
+        k = np.arange(num_points) + 0.5
+        z = 1.0 - 2.0 * k / num_points
+        r = np.sqrt(1.0 - z * z)
+        phi = k * math.pi * (3.0 - math.sqrt(5.0))
+        _sphere_points[num_points] = np.stack((r * np.cos(phi), r * np.sin(phi), z), axis=-1)
+
+    return _sphere_points[num_points]
+
+
+class SolventAccessibleSurface(object):
+    '''Solvent accessible surface area of the atoms, groups, and chains of a
+    structure. Excluded atoms (hydrogens and water by default) neither
+    occlude other atoms nor have a surface area.
+
+    Attributes
+    ----------
+    structure : mmtfStructure
+       mmtf structure
+    probe_radius : float
+       radius of the solvent probe in Angstroms [1.4]
+    num_points : int
+       number of sphere points per atom [100]
+    include_hydrogens : bool
+       include hydrogen atoms in the calculation [False]
+    include_water : bool
+       include water molecules in the calculation [False]
+    first_model_only : bool
+       use only the first model of the structure [True]
+    '''
+
+    def __init__(self, structure, probe_radius=1.4, num_points=100, include_hydrogens=False,
+                 include_water=False, first_model_only=True):
+
+        self.arrays = ColumnarStructure(structure, first_model_only)
+        self.probe_radius = probe_radius
+        self.num_points = num_points
+
+        elements = self.arrays.get_elements()
+        self.included = np.ones(self.arrays.get_num_atoms(), dtype=bool)
+        if not include_hydrogens:
+            self.included &= (elements != 'H') & (elements != 'D')
+        if not include_water:
+            self.included &= self.arrays.get_group_names() != 'HOH'
+
+        self.atom_sasa = None
+
+    def get_atom_sasa(self):
+        '''Returns the solvent accessible surface area of each atom.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           surface area in square Angstroms, 0 for excluded atoms
+        '''
+
+        if self.atom_sasa is None:
+            self.atom_sasa = np.zeros(self.arrays.get_num_atoms())
+
+            atoms = np.flatnonzero(self.included)
+            if len(atoms) > 0:
+                self.atom_sasa[atoms] = self._calc_sasa(atoms)
+
+        return self.atom_sasa
+
+    def get_group_sasa(self):
+        '''Returns the solvent accessible surface area of each group.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           surface area in square Angstroms
+        '''
+
+        return np.bincount(self.arrays.get_atom_to_group_indices(), weights=self.get_atom_sasa(),
+                           minlength=self.arrays.get_num_groups())
+
+    def get_chain_sasa(self):
+        '''Returns the solvent accessible surface area of each chain.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           surface area in square Angstroms
+        '''
+
+        return np.bincount(self.arrays.get_atom_to_chain_indices(), weights=self.get_atom_sasa(),
+                           minlength=self.arrays.get_num_chains())
+
+    def get_included_atoms(self):
+        '''Returns a mask of the atoms included in the calculation.
+
+        Returns
+        -------
+        :obj:`array <numpy.ndarray>`
+           boolean mask of included atoms
+        '''
+
+        return self.included
+
+    def _calc_sasa(self, atoms):
+        '''Returns the surface area of the specified atoms
+        '''
+
+        arrays = self.arrays
+        coords = np.stack((arrays.get_x_coords()[atoms],
+                           arrays.get_y_coords()[atoms],
+                           arrays.get_z_coords()[atoms]), axis=-1).astype(np.float64)
+
+        elements = arrays.get_elements()[atoms]
+        radii = np.array([VDW_RADII.get(e.capitalize(), DEFAULT_RADIUS) for e in elements]) \
+            + self.probe_radius
+
+        # neighbors whose expanded spheres overlap, sorted by distance
+        tree = cKDTree(coords)
+        pairs = tree.query_pairs(2.0 * radii.max(), output_type='ndarray')
+        i = np.concatenate((pairs[:, 0], pairs[:, 1]))
+        j = np.concatenate((pairs[:, 1], pairs[:, 0]))
+        d = np.linalg.norm(coords[i] - coords[j], axis=1)
+
+        overlap = d < radii[i] + radii[j]
+        i, j, d = i[overlap], j[overlap], d[overlap]
+        order = np.lexsort((d, i))
+        neighbors = j[order].astype(np.int64)
+        offsets = np.zeros(len(atoms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(i, minlength=len(atoms)))
+
+        return _shrake_rupley(coords, radii, get_sphere_points(self.num_points), offsets, neighbors)
+
+
+@njit
+def _shrake_rupley(coords, radii, sphere, offsets, neighbors):
+    '''Returns the accessible surface area of each atom given the neighbor
+    lists in compressed sparse row format
+    '''
+
+    num_atoms = coords.shape[0]
+    num_points = sphere.shape[0]
+    sasa = np.zeros(num_atoms)
+
+    for i in range(num_atoms):
+        start = offsets[i]
+        end = offsets[i + 1]
+        r = radii[i]
+        last = start
+        accessible = 0
+
+        for k in range(num_points):
+            px = coords[i, 0] + r * sphere[k, 0]
+            py = coords[i, 1] + r * sphere[k, 1]
+            pz = coords[i, 2] + r * sphere[k, 2]
+
+            # check the last occluding neighbor first
+            occluded = False
+            if start < end:
+                j = neighbors[last]
+                dx = px - coords[j, 0]
+                dy = py - coords[j, 1]
+                dz = pz - coords[j, 2]
+                occluded = dx * dx + dy * dy + dz * dz < radii[j] * radii[j]
+
+            if not occluded:
+                for n in range(start, end):
+                    j = neighbors[n]
+                    dx = px - coords[j, 0]
+                    dy = py - coords[j, 1]
+                    dz = pz - coords[j, 2]
+                    if dx * dx + dy * dy + dz * dz < radii[j] * radii[j]:
+                        occluded = True
+                        last = n
+                        break
+
+            if not occluded:
+                accessible += 1
+
+        sasa[i] = 4.0 * math.pi * r * r * accessible / num_points
+
+    return sasa
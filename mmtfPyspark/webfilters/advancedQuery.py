@@ -27,9 +27,11 @@ __version__ = "0.2.0"
 __status__ = "Done"
 
 from mmtfPyspark.webservices.advancedQueryService import post_query
+from mmtfPyspark.filters.filterPipeline import METADATA, ENTITY_SCAN
+from mmtfPyspark.webfilters.broadcastIdSet import BroadcastIdSet, BroadcastIdFilter
 
 
-class AdvancedQuery(object):
+class AdvancedQuery(BroadcastIdFilter):
     '''Filters using the RCSB PDB Advanced Search web service
 
     Attributes
@@ -38,16 +40,32 @@ class AdvancedQuery(object):
        query in RCSB PDB XML format
     '''
 
+    # entity ids are matched with the chains of a decoded structure
+    fields = None
+    cost = ENTITY_SCAN
+
     def __init__(self, xmlQuery):
 
         results = post_query(xmlQuery)
 
         self.entityLevel = (len(results) > 0) and (":" in results[0])
-        self.structureIds = list(set(results))
         self.exclusive = False
 
+        # structure or entity ids, shipped once per executor
+        self.idSet = BroadcastIdSet(results)
+
+        if not self.entityLevel:
+            # structure ids only depend on the key of an entry
+            self.fields = []
+            self.cost = METADATA
+
     def __call__(self, t):
 
+        structureIds = self.idSet.ids
+
+        if not self.entityLevel:
+            return t[0] in structureIds
+
         structure = t[1]
 
         globalMatch = False
@@ -62,7 +80,7 @@ class AdvancedQuery(object):
                 ID = self._get_structure_entity_id(
                     structure, ID, entityChainIndex[i])
 
-            match = ID in self.structureIds
+            match = ID in structureIds
 
             if match and not self.exclusive:
                 return True
@@ -23,10 +23,12 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
-import urllib.request
+import io
+from mmtfPyspark.webservices import httpCache
+from mmtfPyspark.webfilters.broadcastIdSet import BroadcastIdSet, BroadcastIdFilter
 
 
-class BlastCluster(object):
+class BlastCluster(BroadcastIdFilter):
 	'''Filters blast clusters
 
 	Attributes
@@ -34,19 +36,13 @@ class BlastCluster(object):
 	sequenceIdentity : int
 	   sequence indentity for blast
 	'''
+
 	def __init__(self, sequenceIdentity):
 
 		clusters = self.get_blast_cluster(sequenceIdentity)
 
-		self.pdbIds = set()
-
-		for protein in clusters:
-			self.pdbIds.add(protein)
-			self.pdbIds.add(protein[:4])
-
-
-	def __call__(self, t):
-		return t[0] in self.pdbIds
+		# chain ids, shipped once per executor
+		self.idSet = BroadcastIdSet(clusters)
 
 
 	def get_blast_cluster(self, sequenceIdentity):
@@ -59,7 +55,7 @@ class BlastCluster(object):
 
 		coreUrl = "https://cdn.rcsb.org/sequence/clusters/"
 		clusters = []
-		inputStream = urllib.request.urlopen(f"{coreUrl}bc-{sequenceIdentity}.out")
+		inputStream = io.BytesIO(httpCache.get(f"{coreUrl}bc-{sequenceIdentity}.out"))
 
 		for line in inputStream:
 			line = str(line)[2:-3].replace("_",".").strip("\\n")
@@ -0,0 +1,133 @@
+#!/user/bin/env python
+'''broadcastIdSet.py
+
+A set of structure, chain, or entity ids (e.g. "4HHB", "4HHB.A", "4HHB:1")
+returned by a web service, which is shipped once per executor as a Spark
+broadcast variable instead of with every task. The webfilters (e.g. Pisces,
+BlastCluster) test their keys against an id set with hashed lookups.
+
+The set of the structure ids (e.g. "4HHB") of the ids can be used to read
+only the selected entries of an MMTF-Hadoop sequence file (indexed read),
+instead of filtering all decoded structures.
+
+BroadcastIdFilter is the base class of the filters that select entries by
+the ids in a BroadcastIdSet (e.g. Pisces, BlastCluster, RepresentativeChains).
+
+Examples
+--------
+>>> ids = BroadcastIdSet(["4HHB.A", "1STP.A"])
+>>> "4HHB.A" in ids.ids
+True
+>>> sorted(ids.structure_ids)
+['1STP', '4HHB']
+>>> pdb = ids.read_sequence_file(mmtfReader.get_mmtf_full_path())
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import re
+from pyspark import SparkContext
+from mmtfPyspark.io import mmtfReader
+from mmtfPyspark.filters.filterPipeline import METADATA
+
+
+class BroadcastIdSet(object):
+    '''Broadcast set of ids and of their structure ids
+
+    Attributes
+    ----------
+    ids : iterable
+       structure, chain (structureId.chainName), or entity (structureId:entityId) ids
+    '''
+
+    def __init__(self, ids):
+        ids = frozenset(ids)
+        structure_ids = frozenset(get_structure_id(i) for i in ids)
+
+        sc = SparkContext.getOrCreate()
+        self._ids = sc.broadcast(ids)
+        self._structure_ids = sc.broadcast(structure_ids)
+
+    @property
+    def ids(self):
+        '''Set of ids'''
+        return self._ids.value
+
+    @property
+    def structure_ids(self):
+        '''Set of the structure ids of the ids'''
+        return self._structure_ids.value
+
+    def read_sequence_file(self, path, first_model=False):
+        '''Reads the structures of the ids from an MMTF-Hadoop sequence file
+
+        Parameters
+        ----------
+        path : str
+           path to the MMTF-Hadoop sequence file
+        first_model : bool
+           if true, only read the first model
+
+        Returns
+        -------
+        PythonRDD
+           (structureId, structure) pairs of the selected entries
+        '''
+        return mmtfReader.read_sequence_file(path, pdbId=sorted(self.structure_ids),
+                                             first_model=first_model)
+
+
+class BroadcastIdFilter(object):
+    '''Base class of filters that select structures and chains by the ids
+    in a BroadcastIdSet. Subclasses create the id set in their constructor.
+
+    Attributes
+    ----------
+    idSet : BroadcastIdSet
+       ids of the selected structures or chains
+    '''
+
+    # the filter only reads the key of an entry (see FilterPipeline)
+    fields = []
+    cost = METADATA
+
+    def __call__(self, t):
+        return t[0] in self.idSet.ids or t[0] in self.idSet.structure_ids
+
+    def read_sequence_file(self, path, first_model=False):
+        '''Reads the entries that pass this filter from an MMTF-Hadoop
+        sequence file (indexed read), instead of filtering decoded structures.
+        Chains still need to be filtered after a structure is split into chains.
+
+        Parameters
+        ----------
+        path : str
+           path to the MMTF-Hadoop sequence file
+        first_model : bool
+           if true, only read the first model
+
+        Returns
+        -------
+        PythonRDD
+           (structureId, structure) pairs of the selected entries
+        '''
+        return self.idSet.read_sequence_file(path, first_model)
+
+
+def get_structure_id(key):
+    '''Returns the structure id of a structure, chain, or entity id, e.g.,
+    "4HHB" for "4HHB.A" or "4HHB:1"
+
+    Parameters
+    ----------
+    key : str
+       structure, chain, or entity id
+
+    Returns
+    -------
+    str
+       structure id
+    '''
+    return re.split('[.:]', key, maxsplit=1)[0]
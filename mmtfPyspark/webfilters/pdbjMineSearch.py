@@ -23,11 +23,12 @@ import urllib
 import tempfile
 from pyspark.sql import SparkSession
 from mmtfPyspark.datasets import pdbjMineDataset
+from mmtfPyspark.webfilters.broadcastIdSet import BroadcastIdSet, BroadcastIdFilter, get_structure_id
 from urllib.request import urlretrieve
 import requests
 
 
-class PdbjMineSearch(object):
+class PdbjMineSearch(BroadcastIdFilter):
     '''Fetch data using the PDBj Mine 2 SQL service
 
     Attributes
@@ -41,7 +42,7 @@ class PdbjMineSearch(object):
     def __init__(self, sqlQuery):
 
         self.chainLevel = False
-        self.pdbIds = []
+        ids = []
 
         dataset = pdbjMineDataset.get_dataset(sqlQuery)
 
@@ -52,20 +53,19 @@ class PdbjMineSearch(object):
         # Check if there is a pdbID file
         if 'structureId' in dataset.columns:
             self.chainLevel = False
-            self.pdbIds = [a[0] for a in dataset.select('structureId').collect()]
+            ids = [a[0] for a in dataset.select('structureId').collect()]
 
         if 'structureChainId' in dataset.columns:
             self.chainLevel = True
             ids = [a[0] for a in dataset.select('structureChainId').collect()]
-            ids_sub = [i[:4] for i in ids]
-            self.pdbIds = ids + ids_sub
+
+        # structure or chain ids, shipped once per executor
+        self.idSet = BroadcastIdSet(ids)
 
     def __call__(self, t):
-        match = t[0] in self.pdbIds
+        if self.chainLevel:
+            return t[0] in self.idSet.ids or t[0] in self.idSet.structure_ids
 
         # If results are PDB IDs. but the keys contains chain names,
         # then trucate the chain name before matching (eg. 4HHB.A -> 4HHB)
-        if not match and not self.chainLevel and len(t[0]) > 4:
-            match = t[0][:4] in self.pdbIds
-
-        return match
+        return get_structure_id(t[0]) in self.idSet.structure_ids
@@ -21,9 +21,10 @@ __version__ = "0.2.0"
 __status__ = "Done"
 
 from mmtfPyspark.webservices import PiscesDownloader
+from mmtfPyspark.webfilters.broadcastIdSet import BroadcastIdSet, BroadcastIdFilter
 
 
-class Pisces(object):
+class Pisces(BroadcastIdFilter):
     '''Filters representative PDB structures and polymer chains based
     on the specified criteria using PISCES CulledPDB sets.
 
@@ -39,13 +40,7 @@ class Pisces(object):
     '''
 
     def __init__(self, sequenceIdentity, resolution):
-        self.pdbIds = set()
-
         pD = PiscesDownloader(sequenceIdentity, resolution)
 
-        for pdbId in pD.get_structure_chain_ids():
-            self.pdbIds.add(pdbId)
-            self.pdbIds.add(pdbId[:4])
-
-    def __call__(self, t):
-        return t[0] in self.pdbIds
+        # chain ids, shipped once per executor
+        self.idSet = BroadcastIdSet(pD.get_structure_chain_ids())
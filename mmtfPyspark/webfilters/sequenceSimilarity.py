@@ -21,6 +21,9 @@ similarity. The cutoff value is a percentage value between 0 to 100.
 Note: sequences must be at least 12 residues long. For shorter sequences try
 the Sequence Motif Search.
 
+For a search without a web service, see the LocalSequenceSimilarity filter
+and the sequenceSimilaritySearch dataset.
+
 References
 ----------
 - BLAST: BLAST: Sequence searching using NCBI's BLAST (Basic Local Alignment
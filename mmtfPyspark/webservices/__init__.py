@@ -1,2 +1,2 @@
 from .piscesDownloader import PiscesDownloader
-from . import advancedQueryService
+from . import advancedQueryService, httpCache
@@ -10,7 +10,9 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
+import io
 import urllib
+from mmtfPyspark.webservices import httpCache
 
 SERVICELOCATION = "http://www.rcsb.org/pdb/rest/search"
 
@@ -27,9 +29,7 @@ def post_query(xml):
 
     encodedXML = urllib.parse.quote(xml).encode('utf-8')
 
-    url = urllib.request.Request(SERVICELOCATION)
-
-    with urllib.request.urlopen(url, data=encodedXML) as f:
+    with io.BytesIO(httpCache.get(SERVICELOCATION, data=encodedXML)) as f:
 
         pdbIds = [str(l)[2:-3] for l in f.readlines()]
 
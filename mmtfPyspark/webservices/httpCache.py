@@ -0,0 +1,268 @@
+#!/user/bin/env python
+'''httpCache.py
+
+Caches the responses of the web services used by the webfilters and
+datasets (e.g. PISCES, BlastClust, RCSB PDB Advanced Search and Custom
+Reports, PDBj Mine) in a local cache directory, so that they are not
+downloaded again on every job start. A cached response is used until it is
+older than its time-to-live (TTL). If a response cannot be refreshed, e.g.
+because of a network failure, the expired response is used instead.
+
+Each response is stored with the SHA-256 hash of its content. A response
+whose content does not match its hash, e.g. a partially written or
+corrupted file, is not used and is downloaded again.
+
+In offline mode, responses are only read from the cache directory or from a
+pre-seeded local mirror directory, and a response that is not available
+locally raises an IOError. A mirror directory contains either a copy of a
+cache directory, or files in the layout <host>/<path> of the URLs (e.g.
+cdn.rcsb.org/sequence/clusters/bc-30.out).
+
+The cache is configured with :func:`configure` or with the environmental
+variables MMTF_HTTP_CACHE (cache directory), MMTF_HTTP_TTL (time-to-live in
+seconds), MMTF_HTTP_OFFLINE (offline mode if set to 1 or true), and
+MMTF_HTTP_MIRROR (mirror directory).
+
+Examples
+--------
+run a job without network access:
+
+>>> httpCache.configure(offline=True, mirror_dir="/data/mirror")
+>>> pdb = pdb.filter(Pisces(sequenceIdentity=30, resolution=2.5))
+
+'''
+__author__ = "Peter W Rose"
+__version__ = "0.3.7"
+__status__ = "experimental"
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+# default time-to-live of cached responses in seconds
+DEFAULT_TTL = 24 * 60 * 60
+
+# default of the configure arguments for settings that are not changed
+_UNCHANGED = object()
+
+
+def _get_default_config():
+    '''Returns the configuration from the environmental variables'''
+    return {'cache_dir': os.environ.get('MMTF_HTTP_CACHE',
+                                        os.path.join(os.path.expanduser('~'), '.cache', 'mmtfPyspark', 'http')),
+            'ttl': float(os.environ.get('MMTF_HTTP_TTL', DEFAULT_TTL)),
+            'offline': os.environ.get('MMTF_HTTP_OFFLINE', '').lower() in ('1', 'true'),
+            'mirror_dir': os.environ.get('MMTF_HTTP_MIRROR')}
+
+
+_config = _get_default_config()
+
+
+def configure(cache_dir=_UNCHANGED, ttl=_UNCHANGED, offline=_UNCHANGED, mirror_dir=_UNCHANGED):
+    '''Sets the cache configuration. Only the specified settings are changed,
+    e.g., configure(mirror_dir=None) removes the mirror directory.
+
+    Parameters
+    ----------
+    cache_dir : str
+       cache directory
+    ttl : float
+       time-to-live of cached responses in seconds, 0 to always download
+    offline : bool
+       if true, only read responses from the cache or mirror directory
+    mirror_dir : str
+       pre-seeded mirror directory, None for no mirror directory
+    '''
+    for key, value in (('cache_dir', cache_dir), ('ttl', ttl),
+                       ('offline', offline), ('mirror_dir', mirror_dir)):
+        if value is not _UNCHANGED:
+            _config[key] = value
+
+
+def reset():
+    '''Resets the cache configuration to the defaults and the environmental
+    variables
+    '''
+    _config.clear()
+    _config.update(_get_default_config())
+
+
+def get_config():
+    '''Returns a copy of the cache configuration
+
+    Returns
+    -------
+    dict
+       cache_dir, ttl, offline, and mirror_dir settings
+    '''
+    return dict(_config)
+
+
+def get(url, data=None, ttl=None, context=None):
+    '''Returns the response of a GET request, or of a POST request if data
+    are specified, from the cache or from the web service.
+
+    Parameters
+    ----------
+    url : str
+       URL of the request
+    data : bytes
+       data of a POST request
+    ttl : float
+       time-to-live in seconds, overrides the configured time-to-live
+    context : SSLContext
+       SSL context of the request
+
+    Returns
+    -------
+    bytes
+       content of the response
+
+    Raises
+    ------
+    IOError
+       if the response is not available in offline mode
+    '''
+    with open(get_path(url, data, ttl, context), 'rb') as f:
+        return f.read()
+
+
+def get_path(url, data=None, ttl=None, context=None):
+    '''Returns the path of a cached response. The file name ends with the
+    file name of the URL, e.g., "protmod.tsv.gz", so that compressed
+    files are recognized by their extension.
+
+    Parameters
+    ----------
+    url : str
+       URL of the request
+    data : bytes
+       data of a POST request
+    ttl : float
+       time-to-live in seconds, overrides the configured time-to-live
+    context : SSLContext
+       SSL context of the request
+
+    Returns
+    -------
+    str
+       path of the cached response
+
+    Raises
+    ------
+    IOError
+       if the response is not available in offline mode
+    '''
+    if ttl is None:
+        ttl = _config['ttl']
+
+    file_name = get_cache_file_name(url, data)
+    path = os.path.join(_config['cache_dir'], file_name)
+    cached = _is_valid(path)
+
+    if _config['offline']:
+        if cached:
+            return path
+
+        mirror_path = _get_mirror_path(url, data, file_name)
+        if mirror_path is None:
+            raise IOError("Response not available offline: " + url)
+
+        return mirror_path
+
+    if cached and time.time() - os.path.getmtime(path) < ttl:
+        return path
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url), data=data, context=context) as f:
+            content = f.read()
+    except IOError:
+        # an expired response is better than a failed job
+        if cached:
+            return path
+        raise
+
+    _write(path, url, content)
+
+    return path
+
+
+def clear():
+    '''Removes all cached responses'''
+    cache_dir = _config['cache_dir']
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            os.remove(os.path.join(cache_dir, name))
+
+
+def get_cache_file_name(url, data=None):
+    '''Returns the file name of a cached response
+
+    Parameters
+    ----------
+    url : str
+       URL of the request
+    data : bytes
+       data of a POST request
+
+    Returns
+    -------
+    str
+       file name
+    '''
+    key = hashlib.sha256(url.encode('utf-8'))
+    if data is not None:
+        key.update(b'\0' + data)
+
+    name = os.path.basename(urllib.parse.urlparse(url).path)
+
+    return key.hexdigest() + ('-' + name if name else '')
+
+
+def _get_mirror_path(url, data, file_name):
+    '''Returns the path of a response in the mirror directory, or None'''
+    mirror_dir = _config['mirror_dir']
+    if mirror_dir is None:
+        return None
+
+    path = os.path.join(mirror_dir, file_name)
+    if _is_valid(path):
+        return path
+
+    # files of GET requests in the <host>/<path> layout
+    parsed = urllib.parse.urlparse(url)
+    if data is None and not parsed.query:
+        path = os.path.join(mirror_dir, parsed.netloc, *parsed.path.strip('/').split('/'))
+        if os.path.isfile(path):
+            return path
+
+    return None
+
+
+def _is_valid(path):
+    '''Returns true if a response exists and its content matches its hash'''
+    try:
+        with open(path + '.json') as f:
+            metadata = json.load(f)
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest() == metadata['sha256']
+    except (IOError, ValueError, KeyError):
+        return False
+
+
+def _write(path, url, content):
+    '''Writes a response and its hash, the files are replaced atomically'''
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    metadata = {'url': url, 'sha256': hashlib.sha256(content).hexdigest(), 'time': time.time()}
+
+    for file_path, data in ((path, content), (path + '.json', json.dumps(metadata).encode('utf-8'))):
+        fd, tmp = tempfile.mkstemp(dir=cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, file_path)
@@ -21,8 +21,9 @@ __email__ = "marshuang80@gmail.com"
 __version__ = "0.2.0"
 __status__ = "Done"
 
-from urllib.request import urlopen
 import gzip
+import io
+from mmtfPyspark.webservices import httpCache
 
 
 class PiscesDownloader(object):
@@ -57,14 +58,14 @@ class PiscesDownloader(object):
 
     def get_structure_chain_ids(self):
         fileURL = self.URL + '/' + self._get_file_name()
-        u = urlopen(fileURL)
+        u = io.BytesIO(httpCache.get(fileURL))
         line = str(gzip.GzipFile(fileobj=u).read()).split('\\n')
         structureChainId = [l.split()[0][:4] + '.' + l.split()[0][4] for l in line if
                             len(l.split()) > 1]
         return structureChainId
 
     def _get_file_name(self):
-        u = urlopen(self.URL)
+        u = io.BytesIO(httpCache.get(self.URL))
         fileName = ""
         cs = "pc" + str(self.sequenceIdentity) + "_res" + str(self.resolution)
 